@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.async_driver import AsyncEmulator
+
+# Draws random sprites forever: A050 C03F C11F D015 7201 1202
+DEFAULT_ROM = bytes.fromhex("a050c03fc11fd01572011202")
+
+
+async def press_keys(session, seconds):
+    # Random key presses delivered through the session's asyncio.Queue
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        key = random.randrange(16)
+        await session.keys.put((key, 1))
+        await asyncio.sleep(0.05)
+        await session.keys.put((key, 0))
+        await asyncio.sleep(0.05)
+
+
+async def measure_loop_lag(seconds, lags):
+    # How late a 10 ms timer fires tells whether the sessions are blocking the event loop
+    loop = asyncio.get_running_loop()
+    end = loop.time() + seconds
+    while loop.time() < end:
+        start = loop.time()
+        await asyncio.sleep(0.01)
+        lags.append(loop.time() - start - 0.01)
+
+
+async def run_session(session, seconds):
+    loop = asyncio.get_running_loop()
+    end = loop.time() + seconds
+    async for _ in session.frames():
+        if loop.time() >= end:
+            session.stop()
+
+
+async def main_async(rom, sessions, seconds, fps):
+    emulators = []
+    for _ in range(sessions):
+        session = AsyncEmulator(fps=fps)
+        session.load_rom_bytes(rom)
+        emulators.append(session)
+
+    lags = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        measure_loop_lag(seconds, lags),
+        *(run_session(session, seconds) for session in emulators),
+        *(press_keys(session, seconds) for session in emulators[:10]),
+    )
+    elapsed = time.perf_counter() - start
+
+    rates = sorted(session.frame_count / elapsed for session in emulators)
+    total_instructions = sum(session.emu.cycle_count for session in emulators)
+    print(f"sessions            : {sessions}")
+    print(f"target fps          : {fps or 'unpaced'}")
+    print(f"fps min/median/max  : {rates[0]:.1f} / {rates[len(rates) // 2]:.1f} / {rates[-1]:.1f}")
+    print(f"fairness (min/max)  : {rates[0] / rates[-1]:.3f}")
+    print(f"total instr/s       : {total_instructions / elapsed:,.0f}")
+    print(f"loop lag p50/max    : {sorted(lags)[len(lags) // 2] * 1000:.2f} ms / {max(lags) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Many AsyncEmulator sessions on one event loop")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run (default: built-in sprite loop)')
+    parser.add_argument('--sessions', '-n', type=int, default=300)
+    parser.add_argument('--seconds', '-s', type=float, default=5.0)
+    parser.add_argument('--fps', type=int, default=60, help='per-session pacing, 0 = unpaced')
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+    asyncio.run(main_async(rom, args.sessions, args.seconds, args.fps))
+
+
+if __name__ == "__main__":
+    main()
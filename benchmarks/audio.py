@@ -0,0 +1,119 @@
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.audio import AudioPlayer, WavSink
+from emulator.emulator import Emulator
+
+# Beeps for 5 frames out of every 20, waiting on the delay timer in between
+BEEP_ROM = bytes.fromhex("6005f0186114f115f207320012081200")
+
+
+class SlowSink(WavSink):
+    # A sink that stalls every `every` frames, like a device driver or disk hiccup
+    def __init__(self, target, every, stall):
+        super().__init__(target)
+        self.every = every
+        self.stall = stall
+
+    def write(self, view):
+        super().write(view)
+        if self.every and self.frames_written % self.every == 0:
+            time.sleep(self.stall)
+
+
+def make_emulator(rom):
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    return emu
+
+
+def offline(rom, frames):
+    # Frames per second with and without the beeper, and bytes allocated per steady-state frame
+    plain = make_emulator(rom)
+    start = time.perf_counter()
+    for _ in range(frames):
+        plain.step_frame()
+    plain_time = time.perf_counter() - start
+
+    emu = make_emulator(rom)
+    beeper = emu.enable_audio()
+    sink = WavSink(io.BytesIO())
+    start = time.perf_counter()
+    for _ in range(frames):
+        emu.step_frame()
+        beeper.drain(sink)
+    audio_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(frames):
+        beeper.frame(True)
+        view = beeper.pull()
+        beeper.release(view)
+    growth = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return frames / plain_time, frames / audio_time, growth / frames
+
+
+def realtime(rom, seconds, emulator_stall, sink_every, sink_stall):
+    # Emulator paced at 60 Hz (pausing `emulator_stall` s once a second) feeding a player thread
+    emu = make_emulator(rom)
+    beeper = emu.enable_audio()
+    player = AudioPlayer(beeper, SlowSink(io.BytesIO(), sink_every, sink_stall))
+    player.start()
+    worst_step = 0.0
+    next_frame = time.perf_counter()
+    for frame in range(int(seconds * 60)):
+        start = time.perf_counter()
+        emu.step_frame()
+        worst_step = max(worst_step, time.perf_counter() - start)
+        if emulator_stall and frame % 60 == 59:
+            time.sleep(emulator_stall)
+        next_frame += emu.clock_hz
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_frame = time.perf_counter()
+    player.stop()
+    player.sink.close()
+    return beeper.stats(), worst_step
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Beeper cost, allocations, underruns and latency")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run (default: built-in beeper loop)')
+    parser.add_argument('--frames', '-n', type=int, default=6000, help='Frames for the offline case')
+    parser.add_argument('--seconds', '-s', type=float, default=3.0, help='Real-time play per scenario')
+    args = parser.parse_args()
+
+    rom = BEEP_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    plain_fps, audio_fps, growth = offline(rom, args.frames)
+    print(f"offline: {plain_fps:.0f} frames/s plain, {audio_fps:.0f} frames/s rendering audio, "
+          f"{growth:.2f} bytes allocated per beeper frame")
+
+    print(f"{'scenario':<26}{'underruns':>10}{'dropped':>9}{'avg ms':>8}{'max ms':>8}{'worst step ms':>15}")
+    scenarios = (
+        ("steady", 0.0, 0, 0.0),
+        ("emulator stalls 50 ms/s", 0.05, 0, 0.0),
+        ("sink stalls 200 ms/s", 0.0, 60, 0.2),
+    )
+    for name, emulator_stall, sink_every, sink_stall in scenarios:
+        stats, worst_step = realtime(rom, args.seconds, emulator_stall, sink_every, sink_stall)
+        print(f"{name:<26}{stats['underruns']:>10}{stats['dropped']:>9}{stats['average_latency_ms']:>8.1f}"
+              f"{stats['max_latency_ms']:>8.1f}{worst_step * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
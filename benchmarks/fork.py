@@ -0,0 +1,66 @@
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+
+# Counts on screen with a delay timer wait loop
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def deep_copy(emu):
+    # What search tooling did before fork(): deepcopy, with the lock kept out of the copy
+    return copy.deepcopy(emu, {id(emu.lock): emu.lock})
+
+
+def explore(root, branches, depth, clone):
+    # Every branch starts from the root, presses one random key and runs `depth` frames
+    rng = random.Random(1)
+    clone_time = 0.0
+    start = time.perf_counter()
+    for _ in range(branches):
+        clone_start = time.perf_counter()
+        branch = clone(root)
+        clone_time += time.perf_counter() - clone_start
+        branch.set_key(rng.randrange(16), 1)
+        for _ in range(depth):
+            branch.step_frame()
+    return time.perf_counter() - start, clone_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Branch exploration cost: fork() vs deepcopy")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to explore (default: built-in counter)')
+    parser.add_argument('--branches', '-n', type=int, default=100000)
+    parser.add_argument('--depth', '-d', type=int, default=1, help='Frames advanced per branch')
+    parser.add_argument('--warmup', type=int, default=120, help='Frames run before the root is taken')
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    root = Emulator(verbose=False)
+    root.load_rom_bytes(rom)
+    root.reset()
+    root.seed(1)
+    for _ in range(args.warmup):
+        root.step_frame()
+
+    print(f"{'clone':<10}{'branches':>10}{'total s':>10}{'clone us':>10}{'branch us':>11}")
+    for name, clone, branches in (("fork", Emulator.fork, args.branches),
+                                  ("deepcopy", deep_copy, max(1, args.branches // 10))):
+        total, clone_time = explore(root, branches, args.depth, clone)
+        print(f"{name:<10}{branches:>10}{total:>10.2f}{clone_time * 1e6 / branches:>10.2f}"
+              f"{total * 1e6 / branches:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+
+# Counts on screen with a delay timer wait loop
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def run(rom, frames, with_metrics):
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    if with_metrics:
+        emu.enable_metrics()
+    start = time.perf_counter()
+    for _ in range(frames):
+        emu.step_frame()
+        emu.acquire_lock()
+        emu.lock.release()
+    return time.perf_counter() - start, emu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of runtime metrics collection in the core")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run (default: built-in counter)')
+    parser.add_argument('--frames', '-n', type=int, default=100000)
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    print(f"{'metrics':<9}{'frames':>9}{'total s':>9}{'us/frame':>10}")
+    for with_metrics in (False, True):
+        elapsed, emu = run(rom, args.frames, with_metrics)
+        print(f"{'on' if with_metrics else 'off':<9}{args.frames:>9}{elapsed:>9.2f}"
+              f"{elapsed * 1e6 / args.frames:>10.2f}")
+    print(f"frame interval mean {emu.metrics.frame_interval.sum / emu.metrics.frame_interval.count() * 1e6:.2f} us, "
+          f"{emu.metrics.instructions_per_second.value:,.0f} instructions/s unthrottled")
+
+
+if __name__ == "__main__":
+    main()
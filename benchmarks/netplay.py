@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.netplay import run_loopback
+
+# Counts on screen with a delay timer wait loop
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollback netplay cost across network latencies")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run (default: built-in counter)')
+    parser.add_argument('--seconds', '-s', type=float, default=5.0, help='Real-time play per latency')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--loss', type=float, default=0.02)
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    print(f"{'latency ms':>10}{'rollbacks/s':>12}{'frames each':>12}{'resim us/frame':>15}"
+          f"{'worst ms':>9}{'save us':>8}{'stalls':>7}{'in sync':>8}")
+    for latency in (0.0, 0.016, 0.05, 0.1, 0.15):
+        stats, identical = run_loopback(rom, args.seconds, latency, args.jitter, args.loss)
+        for side in stats:
+            print(f"{latency * 1000:>10.0f}{side['rollbacks_per_second']:>12.1f}"
+                  f"{side['average_rollback_frames']:>12.1f}{side['resimulation_us_per_frame']:>15.0f}"
+                  f"{side['worst_rollback_ms']:>9.2f}{side['save_state_us']:>8.1f}{side['stalls']:>7}"
+                  f"{'yes' if identical else 'NO':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+from emulator.pacing import FramePacer
+
+# Counts on screen with a delay timer wait loop
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run(rom, seconds, render_ms, panel_ms):
+    # A stand-in GUI thread: one refresh per 1/60 s that paints new frames and refreshes panels,
+    # each burning the given number of milliseconds like a slow host would
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    pacer = FramePacer(emu)
+    shown = pacer.presented_generation
+    pacer.start()
+    levels = set()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        refresh = time.perf_counter()
+        if pacer.presented_generation != shown:
+            shown = pacer.presented_generation
+            start = time.perf_counter()
+            busy(render_ms / 1000)
+            pacer.report_render(time.perf_counter() - start)
+        if pacer.panel_refresh_due():
+            start = time.perf_counter()
+            busy(panel_ms / 1000)
+            pacer.report_panels(time.perf_counter() - start)
+        levels.add(pacer.level)
+        time.sleep(max(0.0, 1 / 60 - (time.perf_counter() - refresh)))
+    emu.running = False
+    pacer.stop()
+    return pacer, levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive pacing under simulated host load")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run (default: built-in counter)')
+    parser.add_argument('--seconds', '-s', type=float, default=3.0, help='Run time per load setting')
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    print(f"{'render ms':>10}{'panel ms':>9}{'level':>6}{'levels seen':>13}{'emulated fps':>14}"
+          f"{'presented fps':>15}{'load':>6}")
+    for render_ms, panel_ms in ((0, 0), (10, 0), (14, 0), (10, 10), (10, 40), (10, 80)):
+        pacer, levels = run(rom, args.seconds, render_ms, panel_ms)
+        print(f"{render_ms:>10}{panel_ms:>9}{pacer.level:>6}{','.join(map(str, sorted(levels))):>13}"
+              f"{pacer.frame_count / args.seconds:>14.1f}{pacer.frames_presented / args.seconds:>15.1f}"
+              f"{pacer.load():>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
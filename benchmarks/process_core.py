@@ -0,0 +1,84 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import pack_display
+from emulator.process_core import ProcessEmulator
+
+# Draws random sprites forever: A050 C03F C11F D015 7201 1202
+DEFAULT_ROM = bytes.fromhex("a050c03fc11fd01572011202")
+
+
+def busy_gui(emu, stop, counter):
+    # Stands in for Qt painting and the debug panels: pure Python work holding the GIL
+    while not stop.is_set():
+        pack_display(emu.display)
+        emu.snapshot()
+        sum(range(2000))
+        counter[0] += 1
+
+
+def run_in_process(rom, seconds, busy):
+    emu = Emulator(verbose=False)
+    emu.instruction_hz = 0  # unthrottled
+    emu.load_rom_bytes(rom)
+    emu.copytomem()
+    emu.load_fontset()
+
+    stop = threading.Event()
+    gui_frames = [0]
+    gui = threading.Thread(target=busy_gui, args=(emu, stop, gui_frames), daemon=True)
+    emu.start()
+    if busy:
+        gui.start()
+    time.sleep(seconds)
+    emu.running = False
+    stop.set()
+    return emu.cycle_count / seconds, gui_frames[0] / seconds
+
+
+def run_out_of_process(rom, seconds, busy):
+    emu = ProcessEmulator(throttled=False)
+    try:
+        emu.load_rom_bytes(rom)
+        emu.copytomem()
+
+        stop = threading.Event()
+        gui_frames = [0]
+        gui = threading.Thread(target=busy_gui, args=(emu, stop, gui_frames), daemon=True)
+        emu.start()
+        if busy:
+            gui.start()
+        time.sleep(seconds)
+        stats = emu.stats()
+        stop.set()
+        return stats["cycles"] / stats["elapsed"], gui_frames[0] / seconds
+    finally:
+        emu.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process vs out-of-process core throughput")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run (default: built-in sprite loop)')
+    parser.add_argument('--seconds', '-s', type=float, default=3.0)
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    print(f"{'mode':<22}{'GUI load':<10}{'instr/s':>12}{'GUI frames/s':>14}")
+    for name, runner in (("in-process threads", run_in_process), ("core process", run_out_of_process)):
+        for busy in (False, True):
+            ips, gui_fps = runner(rom, args.seconds, busy)
+            print(f"{name:<22}{'busy' if busy else 'idle':<10}{ips:>12,.0f}{gui_fps:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+from emulator.recorder import FrameRecorder, make_encoder
+
+# Counts on screen with a delay timer wait loop: mostly repeated frames, like real games
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless recording throughput")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to record (default: built-in counter)')
+    parser.add_argument('--minutes', '-m', type=float, default=10.0, help='Gameplay minutes to record')
+    parser.add_argument('--scale', '-s', type=int, default=4)
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+    frames = int(args.minutes * 60 * 60)
+
+    print(f"{'format':<8}{'frames':>8}{'distinct':>10}{'emulate s':>11}{'total s':>9}{'size KiB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, name in (("raw", "out.raw"), ("gif", "out.gif"), ("png", "png")):
+            output = os.path.join(directory, name)
+            emu = Emulator(verbose=False)
+            emu.load_rom_bytes(rom)
+            emu.copytomem()
+            emu.load_fontset()
+
+            recorder = FrameRecorder(make_encoder(output, fmt, args.scale))
+            start = time.perf_counter()
+            for _ in range(frames):
+                emu.step_frame()
+                recorder.capture(emu.display)
+            emulated = time.perf_counter() - start
+            recorder.close()
+            total = time.perf_counter() - start
+
+            if os.path.isdir(output):
+                size = sum(os.path.getsize(os.path.join(output, f)) for f in os.listdir(output))
+            else:
+                size = os.path.getsize(output)
+            print(f"{fmt:<8}{frames:>8}{recorder.frames_encoded:>10}{emulated:>11.2f}{total:>9.2f}{size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+
+# Counts on screen with a delay timer wait loop
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def fresh(rom, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        emu = Emulator(verbose=False)
+        emu.load_rom_bytes(rom)
+        emu.copytomem()
+        emu.load_fontset()
+    return time.perf_counter() - start
+
+
+def in_place(rom, runs):
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    start = time.perf_counter()
+    for _ in range(runs):
+        emu.reset()
+    return time.perf_counter() - start
+
+
+def new_rom(rom, runs):
+    # Fuzzer pattern: a different ROM every run, so the boot image is rebuilt each time
+    emu = Emulator(verbose=False)
+    roms = [rom + bytes((i & 0xFF,)) for i in range(256)]
+    start = time.perf_counter()
+    for i in range(runs):
+        emu.load_rom_bytes(roms[i & 0xFF])
+        emu.reset()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulator construction vs in-place reset cost")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to load (default: built-in counter)')
+    parser.add_argument('--runs', '-n', type=int, default=100000)
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    print(f"{'method':<24}{'runs':>10}{'total s':>10}{'us/run':>10}")
+    for name, method in (("Emulator() + load", fresh), ("reset() same ROM", in_place),
+                         ("reset() new ROM", new_rom)):
+        elapsed = method(rom, args.runs)
+        print(f"{name:<24}{args.runs:>10}{elapsed:>10.2f}{elapsed * 1e6 / args.runs:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
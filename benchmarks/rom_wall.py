@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.framebuffer import pack_display
+from emulator.scheduler import WallScheduler
+
+# Counts on screen with a delay timer wait loop
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def run(sessions, seconds, paint_ms, rom):
+    # Drives the scheduler the way RomWall's QTimer does, with packing plus a fixed
+    # per-repaint cost standing in for the Qt paint pass
+    scheduler = WallScheduler()
+    for index in range(sessions):
+        session = scheduler.add_rom(rom, f"rom{index}")
+        session.emu.seed(index + 1)
+
+    repaints = 0
+    start = time.perf_counter()
+    next_tick = start
+    while time.perf_counter() - start < seconds:
+        if scheduler.tick():
+            paint_start = time.perf_counter()
+            for session in scheduler.sessions:
+                pack_display(session.emu.display)
+            while time.perf_counter() - paint_start < paint_ms / 1000:
+                pass
+            scheduler.report_paint(time.perf_counter() - paint_start)
+            repaints += 1
+        next_tick += scheduler.frame_period
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_tick = time.perf_counter()
+    elapsed = time.perf_counter() - start
+    return scheduler, repaints / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ROM wall scheduler: many emulators on one thread")
+    parser.add_argument('--rom', '-r', type=str, help='ROM for every instance (default: built-in counter)')
+    parser.add_argument('--sessions', '-n', type=int, nargs='+', default=[1, 16, 32, 64, 96])
+    parser.add_argument('--seconds', '-s', type=float, default=3.0)
+    parser.add_argument('--paint-ms', type=float, default=4.0, help='Simulated cost of one repaint')
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    print(f"{'sessions':>8}{'load':>7}{'thumb fps':>11}{'speed':>8}{'fairness':>10}{'frames/s':>10}")
+    for sessions in args.sessions:
+        scheduler, paint_rate = run(sessions, args.seconds, args.paint_ms, rom)
+        print(f"{sessions:>8}{scheduler.load():>7.0%}{paint_rate:>11.1f}{scheduler.emulation_speed():>8.0%}"
+              f"{scheduler.fairness():>10.2f}{scheduler.frames_run / args.seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+# Counts on screen with a delay timer wait loop
+DEFAULT_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+# Each case runs in a fresh interpreter, the way CI launches short-lived emulators
+IMPORT_CASES = (
+    ("interpreter", "pass"),
+    ("core", "import emulator.emulator"),
+    ("core + one frame", "from emulator.emulator import Emulator; e = Emulator(verbose=False); "
+                         "e.load_rom_bytes(b'\\x12\\x00'); e.reset(); e.step_frame()"),
+    ("golden harness", "import emulator.golden"),
+    ("frame cache", "import emulator.memo"),
+    ("metrics", "import emulator.metrics"),
+    ("netplay", "import emulator.netplay"),
+    ("terminal frontend", "import runtime.terminal"),
+    ("GUI module", "import runtime.dev_mode"),
+)
+
+
+def time_command(args, runs, env=None):
+    # Best wall time over `runs` launches, the least noisy figure for a cold start
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def gui_child(rom_path):
+    # Runs inside the child: milestones from interpreter start to the first emulated frame on screen
+    start = time.perf_counter()
+    from PyQt6.QtWidgets import QApplication
+    from runtime.dev_mode import DevModeGUI
+    imported = time.perf_counter()
+    app = QApplication(sys.argv)
+    window = DevModeGUI()
+    built = time.perf_counter()
+    window.emu.loadrom(rom_path)
+    window.emu.readrom()
+    window.emu.copytomem()
+    window.emu.load_fontset()
+    window.show()
+    window.start_emulator()
+
+    milestones = {}
+    paint = window.display_widget.paintEvent
+
+    def first_paint(event):
+        paint(event)
+        if window.emu.cycle_count and "frame" not in milestones:
+            milestones["frame"] = time.perf_counter()
+            app.quit()
+    window.display_widget.paintEvent = first_paint
+    app.exec()
+    window.stop_emulator()
+    print(f"{(imported - start) * 1000:.1f} {(built - imported) * 1000:.1f} "
+          f"{(milestones['frame'] - built) * 1000:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import and GUI startup times")
+    parser.add_argument('--runs', '-n', type=int, default=10, help='Launches per case, best is kept')
+    parser.add_argument('--rom', '-r', type=str, help='ROM for the GUI case (default: built-in counter)')
+    parser.add_argument('--no-gui', action='store_true', help='Skip the cases that need PyQt6')
+    parser.add_argument('--gui-child', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.gui_child:
+        gui_child(args.gui_child)
+        return
+
+    print(f"{'case':<20}{'ms':>8}{'over interpreter':>18}")
+    baseline = None
+    for name, code in IMPORT_CASES:
+        if args.no_gui and "dev_mode" in code:
+            continue
+        elapsed = time_command([sys.executable, "-c", code], args.runs) * 1000
+        baseline = elapsed if baseline is None else baseline
+        print(f"{name:<20}{elapsed:>8.1f}{elapsed - baseline:>18.1f}")
+    elapsed = time_command([sys.executable, "main.py", "--help"], args.runs) * 1000
+    print(f"{'main.py --help':<20}{elapsed:>8.1f}{elapsed - baseline:>18.1f}")
+
+    if args.no_gui:
+        return
+    rom_path = args.rom
+    if rom_path is None:
+        with tempfile.NamedTemporaryFile(suffix=".ch8", delete=False) as romfile:
+            romfile.write(DEFAULT_ROM)
+        rom_path = romfile.name
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    samples = []
+    for _ in range(max(1, args.runs // 2)):
+        result = subprocess.run([sys.executable, __file__, "--gui-child", rom_path], cwd=ROOT, env=env,
+                                check=True, capture_output=True, text=True)
+        samples.append([float(value) for value in result.stdout.split()[-3:]])
+    if args.rom is None:
+        os.unlink(rom_path)
+    imported, built, frame = (min(column) for column in zip(*samples))
+    print(f"GUI: Qt + module import {imported:.1f} ms, window construction {built:.1f} ms, "
+          f"show to first emulated frame {frame:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import pack_display
+from emulator.streaming import FrameBroadcaster, FrameClient
+
+# Draws random sprites forever: A050 C03F C11F D015 7201 1202
+DEFAULT_ROM = bytes.fromhex("a050c03fc11fd01572011202")
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def run_clients(port, count, seconds, slow, results):
+    # Runs in its own process so client parsing does not count against the server's CPU time
+    raise_fd_limit(count + 256)
+
+    async def slow_client():
+        # Connects and never reads, so its socket buffers fill up
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await asyncio.sleep(seconds + 1)
+        writer.close()
+
+    async def main():
+        clients = [FrameClient() for _ in range(count)]
+        tasks = [asyncio.ensure_future(client.run("127.0.0.1", port)) for client in clients]
+        tasks += [asyncio.ensure_future(slow_client()) for _ in range(slow)]
+        await asyncio.sleep(seconds + 1)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        results.put((
+            sum(client.frames_received for client in clients),
+            sum(client.bytes_received for client in clients),
+            min(client.frames_received for client in clients),
+            sum(client.keyframes_received for client in clients),
+            [bytes(client.frame) for client in clients[:5]],
+        ))
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spectator stream fan-out load test")
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run (default: built-in sprite loop)')
+    parser.add_argument('--clients', '-n', type=int, default=1000)
+    parser.add_argument('--slow', type=int, default=10, help='clients that never read')
+    parser.add_argument('--seconds', '-s', type=float, default=5.0)
+    parser.add_argument('--fps', type=int, default=60)
+    args = parser.parse_args()
+
+    rom = DEFAULT_ROM
+    if args.rom:
+        with open(args.rom, 'rb') as romfile:
+            rom = romfile.read()
+
+    raise_fd_limit(args.clients + args.slow + 256)
+    broadcaster = FrameBroadcaster(port=0)
+    broadcaster.start()
+
+    results = multiprocessing.Queue()
+    client_process = multiprocessing.Process(
+        target=run_clients, args=(broadcaster.port, args.clients, args.seconds, args.slow, results)
+    )
+    client_process.start()
+    while len(broadcaster.clients) < args.clients + args.slow:
+        time.sleep(0.05)
+
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.copytomem()
+    emu.load_fontset()
+
+    late_frames = 0
+    frames = int(args.seconds * args.fps)
+    start = time.perf_counter()
+    next_frame = start
+    for _ in range(frames):
+        emu.step_frame()
+        broadcaster.publish(emu.display)
+        next_frame += 1 / args.fps
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            late_frames += 1
+    elapsed = time.perf_counter() - start
+    final_frame = pack_display(emu.display)
+
+    received, received_bytes, min_frames, keyframes, samples = results.get()
+    client_process.join()
+    broadcaster.stop()
+
+    published = broadcaster.frames_published
+    print(f"clients (+slow)        : {args.clients} (+{args.slow})")
+    print(f"frames emulated/late   : {frames} / {late_frames} in {elapsed:.2f} s")
+    print(f"frames published/dup   : {published} / {broadcaster.frames_unchanged}")
+    print(f"deltas/keyframes sent  : {broadcaster.deltas_sent} / {broadcaster.keyframes_sent}")
+    print(f"bandwidth total        : {broadcaster.bytes_sent / elapsed / 1024:,.1f} KiB/s")
+    print(f"bandwidth per client   : {received_bytes / args.clients / elapsed:,.1f} B/s "
+          f"(raw frames: {256 * published / elapsed:,.1f} B/s)")
+    print(f"fan-out CPU per frame  : {broadcaster.fanout_cpu / max(1, published) * 1000:.3f} ms")
+    print(f"fan-out CPU per client : {broadcaster.fanout_cpu / max(1, published * args.clients) * 1e6:.2f} us")
+    print(f"client frames min/avg  : {min_frames} / {received / args.clients:.1f}")
+    print(f"keyframes received     : {keyframes}")
+    print(f"clients in sync        : {all(sample == final_frame for sample in samples)}")
+
+
+if __name__ == "__main__":
+    main()
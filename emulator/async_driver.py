@@ -0,0 +1,92 @@
+import asyncio
+
+from emulator.emulator import Emulator
+
+DEFAULT_SLICE_BUDGET = 64    # max instructions run before yielding back to the event loop
+MAX_BACKLOG_FRAMES = 15      # a session this far behind its schedule resyncs instead of bursting
+
+
+class AsyncEmulator:
+    # asyncio driver around the synchronous core. Every await yields at a frame boundary (or
+    # inside long frames after slice_budget instructions), so one event loop can host many
+    # sessions; sessions take turns in the loop's FIFO ready queue.
+
+    def __init__(self, emu=None, fps=60, slice_budget=DEFAULT_SLICE_BUDGET):
+        self.emu = emu if emu is not None else Emulator(verbose=False)
+        self.frame_period = 1 / fps if fps else 0.0     # 0 = unpaced, still yields every slice
+        self.slice_budget = slice_budget
+        self.keys = asyncio.Queue()     # (key, pressed) tuples, applied at the next frame boundary
+        self.frame_count = 0
+        self.running = False
+        self._next_frame = None
+
+    def load_rom_bytes(self, data, path=None):
+        self.emu.load_rom_bytes(data, path)
+        self.emu.copytomem()
+        self.emu.load_fontset()
+
+    def load_rom(self, path):
+        with open(path, 'rb') as romfile:
+            self.load_rom_bytes(romfile.read(), path)
+
+    def _apply_keys(self):
+        while not self.keys.empty():
+            key, pressed = self.keys.get_nowait()
+            self.emu.set_key(key, pressed)
+
+    async def step_frame(self):
+        self._apply_keys()
+
+        emu = self.emu
+        remaining = emu.instructions_per_frame
+        while remaining > self.slice_budget:
+            emu.run_instructions(self.slice_budget)
+            remaining -= self.slice_budget
+            await asyncio.sleep(0)
+        emu.run_instructions(remaining)
+        emu.tick_timers()
+        self.frame_count += 1
+
+        await self._pace()
+
+    async def _pace(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._next_frame is None or not self.frame_period:
+            self._next_frame = now
+        self._next_frame += self.frame_period
+
+        delay = self._next_frame - now
+        if delay < -MAX_BACKLOG_FRAMES * self.frame_period:
+            self._next_frame = now
+            delay = 0
+        # sleep(0) still yields, which keeps unpaced and late sessions fair to their neighbours
+        await asyncio.sleep(max(0, delay))
+
+    async def run_frames(self, count):
+        self.running = True
+        if self.emu.metrics is not None:
+            self.emu.metrics.resume()
+        try:
+            for _ in range(count):
+                await self.step_frame()
+        finally:
+            self.running = False
+        return self.emu.display
+
+    async def frames(self, limit=None):
+        # Yields the live framebuffer after every frame; copy it if it has to outlive the next await
+        self.running = True
+        if self.emu.metrics is not None:
+            self.emu.metrics.resume()
+        try:
+            while self.running and (limit is None or limit > 0):
+                await self.step_frame()
+                if limit is not None:
+                    limit -= 1
+                yield self.emu.display
+        finally:
+            self.running = False
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,281 @@
+import argparse
+import sys
+import threading
+import time
+import wave
+from array import array
+
+from emulator.emulator import Emulator
+from emulator.golden import load_input, parse_input_script
+
+SAMPLE_RATE = 44100
+FRAME_RATE = 60
+FRAME_SAMPLES = SAMPLE_RATE // FRAME_RATE   # 735 samples per 60 Hz frame
+SAMPLE_BYTES = 2                            # signed 16-bit mono, little-endian as WAV wants it
+FRAME_BYTES = FRAME_SAMPLES * SAMPLE_BYTES
+TONE_HZ = 440
+VOLUME = 0.25       # share of full scale
+RAMP_SAMPLES = 64   # ~1.5 ms fade at tone edges so the beeper does not click
+RING_FRAMES = 8     # ~133 ms of queued audio between the emulator and the sink
+PREFILL_FRAMES = 2  # frames queued before the player starts pulling, absorbs emulator jitter
+
+# Kinds of pre-rendered frame; a frame's kind follows from the tone being on before and during it
+SILENT, ATTACK, TONE, RELEASE = range(4)
+
+
+def render_tables(frequency=TONE_HZ, volume=VOLUME):
+    # One second of square wave holds exactly `frequency` periods for any integer frequency, so it
+    # wraps without a seam and splits into FRAME_RATE frames whose phases line up back to back.
+    # Each kind gets its own one-second table; frame n of a table is the n-th frame-sized slice.
+    amplitude = int(32767 * volume)
+    wave_samples = [amplitude if (n * frequency * 2 // SAMPLE_RATE) % 2 == 0 else -amplitude
+                    for n in range(SAMPLE_RATE)]
+    tables = []
+    for kind in (SILENT, ATTACK, TONE, RELEASE):
+        samples = array('h', bytes(SAMPLE_RATE * SAMPLE_BYTES))
+        if kind != SILENT:
+            for n in range(SAMPLE_RATE):
+                offset = n % FRAME_SAMPLES
+                gain = 1.0
+                if kind == ATTACK and offset < RAMP_SAMPLES:
+                    gain = offset / RAMP_SAMPLES
+                elif kind == RELEASE:
+                    gain = max(0.0, 1 - offset / RAMP_SAMPLES)
+                samples[n] = int(wave_samples[n] * gain)
+        if sys.byteorder == 'big':
+            samples.byteswap()
+        data = memoryview(samples.tobytes())
+        tables.append([data[frame * FRAME_BYTES:(frame + 1) * FRAME_BYTES] for frame in range(FRAME_RATE)])
+    return tables
+
+
+class Beeper:
+    # Turns sound_timer into samples at frame granularity. The emulator calls frame() once per
+    # timer tick; it copies one pre-rendered frame into a fixed ring of frame-sized slots, so the
+    # steady state allocates no sample buffers. The phase advances every frame whether the tone is
+    # on or not, which keeps consecutive beeps on the same continuous wave.
+    #
+    # The ring is single-producer single-consumer: only frame() moves `written` and only
+    # pull()/release() move `consumed`, so neither side takes a lock. When the ring is full the
+    # frame is dropped and counted; the emulator never waits on the sink.
+
+    def __init__(self, frequency=TONE_HZ, volume=VOLUME, ring_frames=RING_FRAMES, clock=time.perf_counter):
+        self.tables = render_tables(frequency, volume)
+        self.silence = self.tables[SILENT][0]
+        self.slots = ring_frames
+        self.ring = bytearray(ring_frames * FRAME_BYTES)
+        ring = memoryview(self.ring)
+        self.slot_views = [ring[slot * FRAME_BYTES:(slot + 1) * FRAME_BYTES] for slot in range(ring_frames)]
+        self.changed_at = array('d', bytes(8 * ring_frames))    # clock of the timer change a slot carries, or 0
+        self.clock = clock
+        self.phase = 0
+        self.tone_on = False
+        self.written = 0
+        self.consumed = 0
+
+        self.frames = 0
+        self.beep_frames = 0
+        self.dropped = 0            # frames lost to a full ring (sink too slow or stalled)
+        self.underruns = 0          # frames the sink needed but the emulator had not produced
+        self.changes = 0            # tone on/off transitions
+        self.latency_count = 0      # transitions whose samples reached the sink
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last = 0.0
+
+    def frame(self, on):
+        # Emulator thread, once per timer tick with the pre-decrement sound_timer > 0
+        was_on = self.tone_on
+        if on:
+            kind = TONE if was_on else ATTACK
+        else:
+            kind = RELEASE if was_on else SILENT
+        self.tone_on = on
+        self.frames += 1
+        self.beep_frames += on
+        changed = on != was_on
+        if changed:
+            self.changes += 1
+        phase = self.phase
+        self.phase = phase + 1 if phase + 1 < FRAME_RATE else 0
+
+        written = self.written
+        if written - self.consumed >= self.slots:
+            self.dropped += 1
+            return
+        slot = written % self.slots
+        self.slot_views[slot][:] = self.tables[kind][phase]
+        self.changed_at[slot] = self.clock() if changed else 0.0
+        self.written = written + 1     # published last, the slot is complete once it is visible
+
+    def queued(self):
+        return self.written - self.consumed
+
+    def pull(self):
+        # Sink side: the next frame of samples, or silence (counted as an underrun) when none is
+        # queued. A queued slot stays reserved until release(), so hand it to the sink first.
+        if self.written == self.consumed:
+            self.underruns += 1
+            return self.silence
+        return self.slot_views[self.consumed % self.slots]
+
+    def release(self, view):
+        # Frees the slot returned by pull() and records the change-to-output latency it carried
+        if view is self.silence:
+            return
+        slot = self.consumed % self.slots
+        changed_at = self.changed_at[slot]
+        if changed_at:
+            latency = self.clock() - changed_at
+            self.latency_count += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.latency_last = latency
+        self.consumed += 1
+
+    def drain(self, sink):
+        # Offline rendering: hands every queued frame to the sink without pacing
+        while self.written != self.consumed:
+            view = self.pull()
+            sink.write(view)
+            self.release(view)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "beep_frames": self.beep_frames,
+            "changes": self.changes,
+            "dropped": self.dropped,
+            "underruns": self.underruns,
+            "queued": self.queued(),
+            "average_latency_ms": self.latency_total / self.latency_count * 1000 if self.latency_count else 0.0,
+            "max_latency_ms": self.latency_max * 1000,
+        }
+
+
+class WavSink:
+    # Headless sink: mono 16-bit WAV at SAMPLE_RATE, to a path or an open binary file
+    def __init__(self, target):
+        self.file = wave.open(target, 'wb')
+        self.file.setnchannels(1)
+        self.file.setsampwidth(SAMPLE_BYTES)
+        self.file.setframerate(SAMPLE_RATE)
+        self.frames_written = 0
+
+    def write(self, view):
+        self.file.writeframesraw(view)
+        self.frames_written += 1
+
+    def close(self):
+        self.file.close()
+
+
+class AudioPlayer:
+    # Stands in for a sound device: a thread pulling one frame per 1/60 s of sample clock from the
+    # beeper and writing it to the sink, so underruns and latency show up as they would on hardware
+    def __init__(self, beeper, sink, prefill=PREFILL_FRAMES):
+        self.beeper = beeper
+        self.sink = sink
+        self.prefill = prefill
+        self.running = False
+        self.thread = None
+
+    def run(self):
+        beeper = self.beeper
+        while self.running and beeper.queued() < self.prefill:
+            time.sleep(0.001)
+        period = FRAME_SAMPLES / SAMPLE_RATE
+        next_frame = time.perf_counter()
+        while self.running:
+            view = beeper.pull()
+            self.sink.write(view)
+            beeper.release(view)
+            next_frame += period
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        # Plays out what is still queued, then stops the thread
+        while self.running and self.beeper.queued():
+            time.sleep(0.001)
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+
+def render_rom(rom, output, frames, input_events=None, realtime=False, instructions_per_frame=None):
+    # Runs a ROM headless and writes its beeper to a WAV file. Offline (the default) frames are
+    # emulated as fast as possible and drained straight to the sink; with `realtime` the emulator
+    # is paced at 60 Hz and a player thread consumes the ring like a sound device would.
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    if instructions_per_frame:
+        emu.instructions_per_frame = instructions_per_frame
+    beeper = emu.enable_audio()
+    sink = WavSink(output)
+    player = AudioPlayer(beeper, sink) if realtime else None
+    if player is not None:
+        player.start()
+    input_events = input_events or {}
+    error = None
+    next_frame = time.perf_counter()
+    try:
+        for frame in range(frames):
+            for key, pressed in input_events.get(frame, ()):
+                emu.set_key(key, pressed)
+            try:
+                emu.step_frame()
+            except Exception as e:
+                error = str(e)
+                break
+            if player is None:
+                beeper.drain(sink)
+                continue
+            next_frame += emu.clock_hz
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()
+    finally:
+        if player is not None:
+            player.stop()
+        sink.close()
+    return beeper, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a ROM's beeper to a WAV file without a sound device")
+    parser.add_argument('rom', type=str, help='Path to the CHIP-8 ROM file (with an optional .input script)')
+    parser.add_argument('output', type=str, help='WAV file to write')
+    parser.add_argument('--frames', '-n', type=int, default=600, help='Frames to emulate (60 per second)')
+    parser.add_argument('--ipf', type=int, default=None, help='Instructions per frame')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Pace at 60 Hz with a player thread, measuring underruns and latency')
+    args = parser.parse_args()
+
+    with open(args.rom, 'rb') as romfile:
+        rom = romfile.read()
+    beeper, error = render_rom(rom, args.output, args.frames, parse_input_script(load_input(args.rom)),
+                               args.realtime, args.ipf)
+    if error:
+        print(f"[WARN] ROM stopped after {beeper.frames} frames: {error}")
+    stats = beeper.stats()
+    print(f"[INFO] {stats['frames']} frames, {stats['beep_frames']} beeping, {stats['changes']} tone changes "
+          f"written to {args.output}")
+    print(f"[INFO] {stats['underruns']} underruns, {stats['dropped']} dropped frames, timer change to sample "
+          f"output {stats['average_latency_ms']:.1f} ms average, {stats['max_latency_ms']:.1f} ms worst")
+    return 1 if error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
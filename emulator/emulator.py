@@ -1,25 +1,63 @@
 import threading
 import time
 
+FONTSET = bytes([
+    0xF0, 0x90, 0x90, 0x90, 0xF0,  # 0
+    0x20, 0x60, 0x20, 0x20, 0x70,  # 1
+    0xF0, 0x10, 0xF0, 0x80, 0xF0,  # 2
+    0xF0, 0x10, 0xF0, 0x10, 0xF0,  # 3
+    0x90, 0x90, 0xF0, 0x10, 0x10,  # 4
+    0xF0, 0x80, 0xF0, 0x10, 0xF0,  # 5
+    0xF0, 0x80, 0xF0, 0x90, 0xF0,  # 6
+    0xF0, 0x10, 0x20, 0x40, 0x40,  # 7
+    0xF0, 0x90, 0xF0, 0x90, 0xF0,  # 8
+    0xF0, 0x90, 0xF0, 0x10, 0xF0,  # 9
+    0xF0, 0x90, 0xF0, 0x90, 0x90,  # A
+    0xE0, 0x90, 0xE0, 0x90, 0xE0,  # B
+    0xF0, 0x80, 0x80, 0x80, 0xF0,  # C
+    0xE0, 0x90, 0x90, 0x90, 0xE0,  # D
+    0xF0, 0x80, 0xF0, 0x80, 0xF0,  # E
+    0xF0, 0x80, 0xF0, 0x80, 0x80   # F
+])
+FONTSET_START = 0x50
+MEMORY_SIZE = 4096
+ROM_START = 0x200
+
+# Zero templates for the in-place clears in CLS and reset()
+BLANK_ROW = bytes(64)
+BLANK_REGISTERS = bytes(16)
+# pc, I, sp, delay timer, sound timer, cycle count at power-on
+BOOT_REGISTERS = (ROM_START, 0, 0, 0, 0, 0)
+
+def _quiet(*args, **kwargs):
+    pass
+
 class Emulator:
 
-    def __init__(self):
+    def __init__(self, verbose=True):
+
+        # Logging (headless runs pass verbose=False to skip per-opcode tracing)
+        self.verbose = verbose
+        self.log = print if verbose else _quiet
         
         # State management
         self.running = False
         self.cycle_count = 0
-        self.lock = threading.Lock()
+        self.lock = threading.RLock()
 
         # Timers
         self.instruction_hz = 1/500
         self.clock_hz = 1/60
+        self.instructions_per_frame = round(self.clock_hz / self.instruction_hz)
 
         # ROM
         self.rompath = None
         self.romdata = None
+        self.boot_image = None      # memory image with font + ROM blitted, rebuilt when romdata changes
+        self.boot_rom = None
 
         # Memory
-        self.memory = [0] * 4096
+        self.memory = bytearray(MEMORY_SIZE)
 
         # Registers
 
@@ -41,61 +79,182 @@ class Emulator:
         # keypad
 
         self.keypad = [0] * 16
+
+        # random number generator (xorshift32, part of the machine state so runs can be replayed)
+
+        self.rng_seed = (time.time_ns() & 0xFFFFFFFF) or 1     # reset() restarts the sequence here
+        self.rng_state = self.rng_seed
         
         # display
 
-        self.display = [[0] * 64 for _ in range(32)]
+        self.display = [bytearray(64) for _ in range(32)]
+        self.display_generation = 0     # bumped whenever the framebuffer may have changed
+        self.display_shared = False     # rows shared with a fork(), copied before the next write
+        self.blank_generation = None    # display_generation at which reset() last cleared the rows
+
+        # optional per-address profiling counters (see emulator.heatmap)
+
+        self.heatmap = None
+
+        # optional runtime metrics (see emulator.metrics)
 
-        print("[INFO] CHIP-8 Emulator initialized")
+        self.metrics = None
+
+        # optional beeper fed from sound_timer once per frame (see emulator.audio)
+
+        self.audio = None
+
+        self.log("[INFO] CHIP-8 Emulator initialized")
 
     def loadrom(self,path):
         self.rompath = path
-        print("[INFO] ROM path set")
+        self.log("[INFO] ROM path set")
     
     def readrom(self):
         try:
             with open(self.rompath, 'rb') as romfile:
                 self.romdata = romfile.read()
-                print("[INFO] ROM data read")
+                self.log("[INFO] ROM data read")
         except Exception as e:
-            print(f"[ERROR] Failed to read ROM: {e}")
+            self.log(f"[ERROR] Failed to read ROM: {e}")
         
-    def copytomem(self,start=0x200):
+    def load_rom_bytes(self, data, path=None):
+        # Accepts ROM bytes that were already read elsewhere (e.g. the ROM library cache)
+        self.rompath = path
+        self.romdata = bytes(data)
+        self.log("[INFO] ROM data set")
+
+    def copytomem(self,start=ROM_START):
         if self.romdata:
             if len(self.romdata) < len(self.memory)-start:
-                for address in range(len(self.romdata)):
-                    self.memory[start+address] = self.romdata[address]
-                print("[INFO] ROM copied to memory")
+                self.memory[start:start + len(self.romdata)] = self.romdata
+                self.log("[INFO] ROM copied to memory")
             else:
-                print("[ERROR] ROM too large to be copied into memory")
+                self.log("[ERROR] ROM too large to be copied into memory")
         else:
-             print("[ERROR] No Data in ROM to copy")
+             self.log("[ERROR] No Data in ROM to copy")
 
     def load_fontset(self):
-        fontset = [
-            0xF0, 0x90, 0x90, 0x90, 0xF0,  # 0
-            0x20, 0x60, 0x20, 0x20, 0x70,  # 1
-            0xF0, 0x10, 0xF0, 0x80, 0xF0,  # 2
-            0xF0, 0x10, 0xF0, 0x10, 0xF0,  # 3
-            0x90, 0x90, 0xF0, 0x10, 0x10,  # 4
-            0xF0, 0x80, 0xF0, 0x10, 0xF0,  # 5
-            0xF0, 0x80, 0xF0, 0x90, 0xF0,  # 6
-            0xF0, 0x10, 0x20, 0x40, 0x40,  # 7
-            0xF0, 0x90, 0xF0, 0x90, 0xF0,  # 8
-            0xF0, 0x90, 0xF0, 0x10, 0xF0,  # 9
-            0xF0, 0x90, 0xF0, 0x90, 0x90,  # A
-            0xE0, 0x90, 0xE0, 0x90, 0xE0,  # B
-            0xF0, 0x80, 0x80, 0x80, 0xF0,  # C
-            0xE0, 0x90, 0x90, 0x90, 0xE0,  # D
-            0xF0, 0x80, 0xF0, 0x80, 0xF0,  # E
-            0xF0, 0x80, 0xF0, 0x80, 0x80   # F
-        ]
-        
-        for i in range(0,len(fontset)):
-            self.memory[i + 0x50] = fontset[i]
-
-        print("[INFO] Font set loaded into memory")
+        self.memory[FONTSET_START:FONTSET_START + len(FONTSET)] = FONTSET
+        self.log("[INFO] Font set loaded into memory")
     
+    def reset(self, keep_rom=True):
+        # Back to power-on state without reallocating: memory, display rows, v, stack and keypad
+        # keep their identity, so views holding references to them stay valid.
+        # The RNG restarts from the last seed() so runs after a reset replay exactly;
+        # instructions_per_frame is left alone.
+        with self.lock:
+            if not keep_rom:
+                self.rompath = None
+                self.romdata = None
+            if self.boot_rom is not self.romdata or self.boot_image is None:
+                self.boot_image = self.build_boot_image()
+                self.boot_rom = self.romdata
+            self.memory[:] = self.boot_image
+            (self.program_counter, self.index_register, self.stack_pointer,
+             self.delay_timer, self.sound_timer, self.cycle_count) = BOOT_REGISTERS
+            self.rng_state = self.rng_seed
+            self.v[:] = BLANK_REGISTERS
+            self.stack.clear()
+            self.keypad[:] = BLANK_REGISTERS
+
+            # Every framebuffer write bumps display_generation, so an unchanged generation means
+            # the rows are still blank from the last reset and clearing them again is skipped
+            if self.display_generation != self.blank_generation:
+                if self.display_shared:
+                    self.own_display()
+                for row in self.display:
+                    row[:] = BLANK_ROW
+                self.display_generation += 1
+                self.blank_generation = self.display_generation
+
+            if self.heatmap is not None:
+                self.heatmap.reset()
+            if self.metrics is not None:
+                self.metrics.resume()
+        self.log("[INFO] Emulator reset")
+
+    def fork(self):
+        # Independent copy for search: shares the immutable ROM bytes and boot image, copies
+        # memory, registers, stack, keypad and RNG state. Framebuffer rows are copy-on-write:
+        # both sides keep the same rows until one of them draws, clears or resets.
+        # Scalar attributes come along through __dict__, so new ones never need listing here.
+        with self.lock:
+            clone = object.__new__(Emulator)
+            clone.__dict__.update(self.__dict__)
+            clone.memory = self.memory[:]
+            clone.display = self.display[:]
+            self.display_shared = clone.display_shared = True
+            clone.v = self.v[:]
+            clone.stack = self.stack[:]
+            clone.keypad = self.keypad[:]
+        clone.lock = threading.RLock()
+        clone.running = False
+        clone.heatmap = None
+        clone.metrics = None
+        clone.audio = None
+        return clone
+
+    def save_state(self):
+        # Compact immutable copy of the machine for rollback; the keypad is input, not state
+        with self.lock:
+            return (
+                bytes(self.memory),
+                b''.join(self.display),
+                tuple(self.v),
+                self.program_counter,
+                self.index_register,
+                tuple(self.stack),
+                self.stack_pointer,
+                self.delay_timer,
+                self.sound_timer,
+                self.rng_state,
+                self.cycle_count,
+            )
+
+    def load_state(self, state):
+        # Restores a save_state() tuple in place, so buffer identities survive a rollback
+        with self.lock:
+            (memory, display, v, self.program_counter, self.index_register, stack, self.stack_pointer,
+             self.delay_timer, self.sound_timer, self.rng_state, self.cycle_count) = state
+            self.memory[:] = memory
+            if b''.join(self.display) != display:
+                # Row-by-row restores are the slow part, most rollbacks leave the screen untouched
+                if self.display_shared:
+                    self.own_display()
+                for y, row in enumerate(self.display):
+                    row[:] = display[y * 64:(y + 1) * 64]
+                self.display_generation += 1
+            self.v[:] = v
+            self.stack[:] = stack
+
+    def own_display(self):
+        # Ends row sharing with forks by copying the rows into the same list, so holders of
+        # self.display keep seeing the live framebuffer
+        self.display[:] = [row[:] for row in self.display]
+        self.display_shared = False
+
+    def build_boot_image(self):
+        image = bytearray(MEMORY_SIZE)
+        image[FONTSET_START:FONTSET_START + len(FONTSET)] = FONTSET
+        if self.romdata:
+            if len(self.romdata) < MEMORY_SIZE - ROM_START:
+                image[ROM_START:ROM_START + len(self.romdata)] = self.romdata
+            else:
+                self.log("[ERROR] ROM too large to be copied into memory")
+        return bytes(image)
+
+    def seed(self, value):
+        self.rng_seed = self.rng_state = (value & 0xFFFFFFFF) or 1
+
+    def next_random(self):
+        x = self.rng_state
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        self.rng_state = x
+        return x >> 24
+
     def set_key(self,key,ispressed):
         try:
             if ((key >= 0) and (key <= 15)):
@@ -103,7 +262,7 @@ class Emulator:
             else:
                 raise ValueError("Key out of bound")
         except Exception as e:
-            print(f"[ERROR] keypad exception : {e}")
+            self.log(f"[ERROR] keypad exception : {e}")
 
     def execute_opcode(self,opcode):
         x   = (opcode & 0x0F00) >> 8    # Fx15
@@ -119,150 +278,188 @@ class Emulator:
 
         if (opcode & 0xF000) == 0x0000: # 0nnn - SYS addr
             if opcode == 0x00E0:  # 00E0 - CLS
-                self.display = [[0] * 64 for _ in range(32)]
-                print("[EXEC] 0x00E0: Cleared screen")
+                if self.display_shared:
+                    self.own_display()
+                for row in self.display:
+                    row[:] = BLANK_ROW
+                self.display_generation += 1
+                if self.verbose:
+                    self.log("[EXEC] 0x00E0: Cleared screen")
             elif opcode == 0x00EE:  # 00EE - RET
                 if self.stack:
                     self.program_counter = self.stack.pop()
                     self.stack_pointer -= 1
-                    print("[EXEC] 0x00EE: Return from subroutine")
+                    if self.verbose:
+                        self.log("[EXEC] 0x00EE: Return from subroutine")
                 else:
-                    print("[ERROR] 0x00EE: Stack underflow")
+                    if self.verbose:
+                        self.log("[ERROR] 0x00EE: Stack underflow")
             else:
-                print(f"[EXEC] 0nnn: SYS Address {hex(nnn)} - Ignored")
+                if self.verbose:
+                    self.log(f"[EXEC] 0nnn: SYS Address {hex(nnn)} - Ignored")
         
         elif (opcode & 0xF000) == 0x1000: # 1nnn - JP addr
             self.program_counter = nnn
-            print("[EXEC] 1nnn : Jumped Program counter to "+ hex(nnn))
+            if self.verbose:
+                self.log("[EXEC] 1nnn : Jumped Program counter to "+ hex(nnn))
         
         elif (opcode & 0xF000) == 0x2000: # 2nnn - CALL addr
             if len(self.stack) >= self.MAX_STACK_DEPTH :
-                print("[ERROR] 2nnn : Stack overflow")
+                if self.verbose:
+                    self.log("[ERROR] 2nnn : Stack overflow")
             else:
                 self.stack.append(self.program_counter)
                 self.stack_pointer += 1
                 self.program_counter = nnn
-                print("[EXEC] 2nnn : Call subroutine at "+hex(nnn))
+                if self.verbose:
+                    self.log("[EXEC] 2nnn : Call subroutine at "+hex(nnn))
         
         elif (opcode & 0xF000) == 0x3000: # 3xkk - SE Vx, byte
             if self.v[x] == nn:
                 self.program_counter += 2
-                print("[EXEC] 3xkk : Skip next instruction")
+                if self.verbose:
+                    self.log("[EXEC] 3xkk : Skip next instruction")
         
         elif (opcode & 0xF000) == 0x4000: # 4xkk - SNE Vx, byte
             if self.v[x] !=  nn:
                 self.program_counter += 2
-                print("[EXEC] 4xkk : Skip next instruction")
+                if self.verbose:
+                    self.log("[EXEC] 4xkk : Skip next instruction")
         
         elif (opcode & 0xF000) == 0x5000: # 5xy0 - SE Vx, Vy
             if self.v[x] == self.v[y]:
                 self.program_counter += 2
-                print("[EXEC] 5xy0 : Skip next instruction")
+                if self.verbose:
+                    self.log("[EXEC] 5xy0 : Skip next instruction")
 
         elif (opcode & 0xF000) == 0x6000: # 6xkk - LD Vx, byte
             self.v[x] = nn
-            print(f"[EXEC] 6xkk : Set v[{x}] to {hex(nn)}")
+            if self.verbose:
+                self.log(f"[EXEC] 6xkk : Set v[{x}] to {hex(nn)}")
         
         elif (opcode & 0xF000) == 0x7000: # 7xkk - ADD Vx, byte
             self.v[x] = (self.v[x] + nn) & 0xFF
-            print(f"[EXEC] 7xkk : Add {nn} to V[{x}], result: {self.v[x]}")
+            if self.verbose:
+                self.log(f"[EXEC] 7xkk : Add {nn} to V[{x}], result: {self.v[x]}")
 
         elif (opcode & 0xF00F) == 0x8000: # 8xy0 - LD Vx, Vy
             self.v[x] = self.v[y]
-            print(f"[EXEC] 8xy0 : Set v[{x}] to {self.v[x]}")
+            if self.verbose:
+                self.log(f"[EXEC] 8xy0 : Set v[{x}] to {self.v[x]}")
 
         elif (opcode & 0xF00F) == 0x8001: # 8xy1 - OR Vx, Vy
             self.v[x] |= self.v[y]
-            print(f"[EXEC] 8xy1 : Set v[{x}] to {self.v[x]}")
+            if self.verbose:
+                self.log(f"[EXEC] 8xy1 : Set v[{x}] to {self.v[x]}")
 
         elif (opcode & 0xF00F) == 0x8002: # 8xy2 - AND Vx, Vy
             self.v[x] &= self.v[y]
-            print(f"[EXEC] 8xy2 : Set v[{x}] to {self.v[x]}")
+            if self.verbose:
+                self.log(f"[EXEC] 8xy2 : Set v[{x}] to {self.v[x]}")
         
         elif (opcode & 0xF00F) == 0x8003: # 8xy3 - XOR Vx, Vy
             self.v[x] ^= self.v[y]
-            print(f"[EXEC] 8xy3 : Set v[{x}] to {self.v[x]}")
+            if self.verbose:
+                self.log(f"[EXEC] 8xy3 : Set v[{x}] to {self.v[x]}")
 
         elif (opcode & 0xF00F) == 0x8004: # 8xy4 - ADD Vx, Vy
             result = self.v[x] + self.v[y]
             if result > 255:    
                 self.v[0xF] = 1
                 self.v[x] = result & 0xFF
-                print(f"[EXEC] 8xy4 : Set v[{x}] to {self.v[x]} and v[F] to 1")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy4 : Set v[{x}] to {self.v[x]} and v[F] to 1")
             
             else:
                 self.v[0xF] = 0
                 self.v[x] = result & 0xFF
-                print(f"[EXEC] 8xy4 : Set v[{x}] to {self.v[x]} and v[F] to 0")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy4 : Set v[{x}] to {self.v[x]} and v[F] to 0")
 
         elif (opcode & 0xF00F) == 0x8005: # 8xy5 - SUB Vx, Vy
             if self.v[x] > self.v[y]:
                 self.v[0xF] = 1
                 self.v[x] = (self.v[x] - self.v[y]) & 0xFF
-                print(f"[EXEC] 8xy5: Set v[{x}] to {self.v[x]} and v[F] to {self.v[0xF]}")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy5: Set v[{x}] to {self.v[x]} and v[F] to {self.v[0xF]}")
             else:
                 self.v[0xF] = 0
                 self.v[x] = (self.v[x] - self.v[y]) & 0xFF
-                print(f"[EXEC] 8xy5: Set v[{x}] to {self.v[x]} and v[F] to {self.v[0xF]}")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy5: Set v[{x}] to {self.v[x]} and v[F] to {self.v[0xF]}")
             
         
         elif (opcode & 0xF00F) == 0x8006: # 8xy6 - SHR Vx
             if (self.v[x] & 0x1) == 1:
                 self.v[0xF] = 1
                 self.v[x] = self.v[x] >> 1
-                print(f"[EXEC] 8xy6 : Set v[{x}] to {self.v[x]} and v[F] to 1")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy6 : Set v[{x}] to {self.v[x]} and v[F] to 1")
             else:
                 self.v[0xF] = 0
                 self.v[x] = self.v[x] >> 1
-                print(f"[EXEC] 8xy6 : Set v[{x}] to {self.v[x]} and v[F] to 0")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy6 : Set v[{x}] to {self.v[x]} and v[F] to 0")
         
         elif (opcode & 0xF00F) == 0x8007:  # 8xy7 - SUBN Vx, Vy
             if self.v[y] > self.v[x]:
                 self.v[0xF] = 1
                 self.v[x] = (self.v[y] - self.v[x]) & 0xFF
-                print(f"[EXEC] 8xy7 : Set v[{x}] to {self.v[x]} and v[F] to 1")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy7 : Set v[{x}] to {self.v[x]} and v[F] to 1")
             else:
                 self.v[0xF] = 0
                 self.v[x] = (self.v[y] - self.v[x]) & 0xFF
-                print(f"[EXEC] 8xy7 : Set v[{x}] to {self.v[x]} and v[F] to 0")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xy7 : Set v[{x}] to {self.v[x]} and v[F] to 0")
 
         elif (opcode & 0xF00F) == 0x800E: # 8xyE - SHL Vx
             msb = self.v[x] >> 7
             if msb:
                 self.v[0xF] = 1
                 self.v[x] = (self.v[x] << 1) & 0xFF
-                print(f"[EXEC] 8xyE : Set v[{x}] to {self.v[x]} and v[F] to 1")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xyE : Set v[{x}] to {self.v[x]} and v[F] to 1")
             else:
                 self.v[0xF] = 0
                 self.v[x] = (self.v[x] << 1) & 0xFF
-                print(f"[EXEC] 8xyE : Set v[{x}] to {self.v[x]} and v[F] to 0")
+                if self.verbose:
+                    self.log(f"[EXEC] 8xyE : Set v[{x}] to {self.v[x]} and v[F] to 0")
 
         elif (opcode & 0xF00F) == 0x9000: # 9xy0 - SNE Vx, Vy
             if self.v[x] != self.v[y]:
                 self.program_counter += 2
-                print("[EXEC] 9xy0 : Skip next instruction")
+                if self.verbose:
+                    self.log("[EXEC] 9xy0 : Skip next instruction")
 
         elif (opcode & 0xF000) == 0xA000: # Annn - LD I, addr
             self.index_register = nnn
-            print(f"[EXEC] Annn : Set index register to {self.index_register}")
+            if self.verbose:
+                self.log(f"[EXEC] Annn : Set index register to {self.index_register}")
         
         elif (opcode & 0xF000) == 0xB000: # Bnnn - JP V0, addr
             self.program_counter = self.v[0] + nnn
-            print(f"[EXEC] Bnnn : Set program counter to {self.program_counter}")
+            if self.verbose:
+                self.log(f"[EXEC] Bnnn : Set program counter to {self.program_counter}")
 
         elif (opcode & 0xF000) == 0xC000: # Cxkk - RND Vx, byte
-            import random
-            rand_number = random.randint(0,255)
+            rand_number = self.next_random()
             self.v[x] = rand_number & nn
-            print(f"[EXEC] Cxkk : Set v[x] to {self.v[x]}")
+            if self.verbose:
+                self.log(f"[EXEC] Cxkk : Set v[x] to {self.v[x]}")
 
         elif (opcode & 0xF000) == 0xD000: # Dxyn - DRW Vx, Vy, nibble
             vx = self.v[x]
             vy = self.v[y]
             height = n
             self.v[0xF] = 0
+            if self.display_shared:
+                self.own_display()
 
+            heatmap = self.heatmap
             for row in range(height):
+                if heatmap is not None:
+                    heatmap.reads[(self.index_register + row) & 0xFFF] += 1
                 sprite_data = self.memory[self.index_register + row]
                 for col in range(8):
                     pixel = (sprite_data >> (7 - col)) & 1
@@ -275,35 +472,42 @@ class Emulator:
                     
                     self.display[y_coordinate][x_coordinate] ^= pixel
             
-            print(f"[EXEC] Dxyn : Drew Sprite on screen")
+            self.display_generation += 1
+            if self.verbose:
+                self.log(f"[EXEC] Dxyn : Drew Sprite on screen")
 
         elif (opcode & 0xF0FF) == 0xE09E: # Ex9E - SKP Vx
             vx = self.v[x]
             if self.keypad[vx] != 0:
                 self.program_counter += 2
-                print(f"[EXEC] Ex9E : Advanced the program counter [{x} is pressed]")
+                if self.verbose:
+                    self.log(f"[EXEC] Ex9E : Advanced the program counter [{x} is pressed]")
 
         elif (opcode & 0xF0FF) == 0xE0A1: # ExA1 - SKNP Vx
             vx = self.v[x]
             if self.keypad[vx] == 0:
                 self.program_counter += 2
-                print(f"[EXEC] ExA1 : Advanced the program counter [{x} is not pressed]")
+                if self.verbose:
+                    self.log(f"[EXEC] ExA1 : Advanced the program counter [{x} is not pressed]")
 
         elif (opcode & 0xF0FF) == 0xF007: # Fx07 - LD Vx, DT
             with self.lock:
                 self.v[x] = self.delay_timer
-                print(f"[EXEC] Fx07 : Set vx to {self.v[x]}")
+                if self.verbose:
+                    self.log(f"[EXEC] Fx07 : Set vx to {self.v[x]}")
         
         elif (opcode & 0xF0FF) == 0xF00A: # Fx0A - LD Vx, K
             
-            print(f"[EXEC] Fx0A : Waiting for Keypress")
+            if self.verbose:
+                self.log(f"[EXEC] Fx0A : Waiting for Keypress")
             is_key_pressed = False
 
             for key in range(16):  
                 if self.keypad[key] != 0:
                     self.v[x] = key
                     is_key_pressed = True
-                    print(f"[EXEC] Fx0A : Key Pressed {hex(key)}")
+                    if self.verbose:
+                        self.log(f"[EXEC] Fx0A : Key Pressed {hex(key)}")
                     break
             
             if not is_key_pressed:
@@ -312,43 +516,93 @@ class Emulator:
         elif (opcode & 0xF0FF) == 0xF015: # Fx15 - LD DT, Vx
             with self.lock:
                 self.delay_timer = self.v[x]
-                print(f"[EXEC] Fx15 : Delay Timer updated to {self.delay_timer}")
+                if self.verbose:
+                    self.log(f"[EXEC] Fx15 : Delay Timer updated to {self.delay_timer}")
         
         elif (opcode & 0xF0FF) == 0xF018: # Fx18 - LD ST, Vx
             with self.lock:
                 self.sound_timer = self.v[x]
-                print(f"[EXEC] Fx18 : Sound Timer updated to {self.sound_timer}")
+                if self.verbose:
+                    self.log(f"[EXEC] Fx18 : Sound Timer updated to {self.sound_timer}")
         
         elif (opcode & 0xF0FF) == 0xF01E: # Fx1E - ADD I, Vx
             self.index_register = (self.index_register + self.v[x] ) & 0xFFFF
-            print(f"[EXEC] Fx1E : Index Register updated to {hex(self.index_register)}")
+            if self.verbose:
+                self.log(f"[EXEC] Fx1E : Index Register updated to {hex(self.index_register)}")
 
         elif (opcode & 0xF0FF) == 0xF029: # LD F, Vx
             digit = self.v[x]
             self.index_register = 0x50 + (digit * 5)
-            print(f"[EXEC] Fx1E : Index Register updated to {hex(self.index_register)}")
+            if self.verbose:
+                self.log(f"[EXEC] Fx1E : Index Register updated to {hex(self.index_register)}")
         
         elif (opcode & 0xF0FF) == 0xF033: # Fx33 - LD B, Vx
             value = self.v[x]
+            if self.heatmap is not None:
+                writes = self.heatmap.writes
+                for i in range(3):
+                    writes[(self.index_register + i) & 0xFFF] += 1
             self.memory[self.index_register] = value // 100
             self.memory[self.index_register + 1] = (value // 10) % 10
             self.memory[self.index_register + 2] = value % 10
-            print(f"[EXEC] Fx33 : Updated memory from [{self.index_register} : {self.index_register + 2}] to {value}")
+            if self.verbose:
+                self.log(f"[EXEC] Fx33 : Updated memory from [{self.index_register} : {self.index_register + 2}] to {value}")
 
         elif (opcode & 0xF0FF) == 0xF055: # Fx55 - LD [I], Vx
+            heatmap = self.heatmap
             for i in range(0, x + 1):
+                if heatmap is not None:
+                    heatmap.writes[(self.index_register + i) & 0xFFF] += 1
                 self.memory[self.index_register + i] = self.v[i]
-            print(f"[EXEC] Fx55 : Updated memory from from {self.index_register} : {self.index_register + x + 1}")
+            if self.verbose:
+                self.log(f"[EXEC] Fx55 : Updated memory from from {self.index_register} : {self.index_register + x + 1}")
 
         elif (opcode & 0xF0FF) == 0xF065: # Fx65 - LD Vx, [I]
+            heatmap = self.heatmap
             for i in range(0, x + 1):
+                if heatmap is not None:
+                    heatmap.reads[(self.index_register + i) & 0xFFF] += 1
                 self.v[i] = self.memory[self.index_register + i]
-            print(f"[EXEC] Fx65 : Updated register from from {self.index_register} : {self.index_register + x + 1}")
+            if self.verbose:
+                self.log(f"[EXEC] Fx65 : Updated register from from {self.index_register} : {self.index_register + x + 1}")
 
         else:
-            print(f"[WARN] Unknown opcode: {hex(opcode)}")
+            if self.verbose:
+                self.log(f"[WARN] Unknown opcode: {hex(opcode)}")
+
+    def enable_heatmap(self):
+        if self.heatmap is None:
+            from emulator.heatmap import AccessHeatmap
+            self.heatmap = AccessHeatmap(len(self.memory))
+        return self.heatmap
+
+    def enable_metrics(self, registry=None):
+        if self.metrics is None:
+            from emulator.metrics import EmulatorMetrics
+            self.metrics = EmulatorMetrics(self, registry)
+        return self.metrics
+
+    def enable_audio(self, **options):
+        if self.audio is None:
+            from emulator.audio import Beeper
+            self.audio = Beeper(**options)
+        return self.audio
+
+    def acquire_lock(self):
+        # Takes the core lock; the wait is only timed when it was contended and metrics are on
+        if self.lock.acquire(False):
+            return
+        metrics = self.metrics
+        if metrics is None:
+            self.lock.acquire()
+            return
+        start = time.perf_counter()
+        self.lock.acquire()
+        metrics.lock_wait.observe(time.perf_counter() - start)
 
     def cycle(self):
+        if self.heatmap is not None:
+            self.heatmap.executions[self.program_counter & 0xFFF] += 1
         high_byte = self.memory[self.program_counter]
         low_byte = self.memory[self.program_counter + 1]
         shifted_high = high_byte << 8
@@ -357,27 +611,69 @@ class Emulator:
         self.program_counter += 2
         self.execute_opcode(opcode)
 
+    def run_instructions(self, count):
+        for _ in range(count):
+            self.cycle()
+        self.cycle_count += count
+
+    def tick_timers(self):
+        if self.audio is not None:
+            self.audio.frame(self.sound_timer > 0)
+        if self.delay_timer > 0:
+            self.delay_timer -= 1
+        if self.sound_timer > 0:
+            self.sound_timer -= 1
+        if self.metrics is not None:
+            self.metrics.frame()
+
+    def step_frame(self, instructions=None):
+        # Synchronous, thread-free stepping: one 60 Hz frame worth of instructions then a timer tick
+        self.run_instructions(self.instructions_per_frame if instructions is None else instructions)
+        self.tick_timers()
+
+    def snapshot(self):
+        # One consistent copy of everything the debug panels show, taken between two instructions
+        self.acquire_lock()
+        try:
+            return (
+                tuple(self.v),
+                self.program_counter,
+                self.index_register,
+                self.cycle_count,
+                self.delay_timer,
+                self.sound_timer,
+                self.stack_pointer,
+                self.display_generation,
+            )
+        finally:
+            self.lock.release()
+
     def cpu_thread(self):
-        print("[INFO] CPU Cycle Started")
+        self.log("[INFO] CPU Cycle Started")
         while self.running:
             start = time.time()
-            self.cycle()
+            self.acquire_lock()
+            try:
+                if not self.running:    # stopped (e.g. for a reset) while waiting for the lock
+                    break
+                self.cycle()
+                self.cycle_count += 1
+            finally:
+                self.lock.release()
             end   = time.time()
             elapsed = end - start
-            with self.lock:
-                self.cycle_count += 1
             time.sleep(max(0, self.instruction_hz - elapsed))
 
-        print(f"[INFO] {self.cycle_count} CPU cycles")
+        self.log(f"[INFO] {self.cycle_count} CPU cycles")
 
     def timer_thread(self):
-        print("[INFO] Timer Cycle Started")
+        self.log("[INFO] Timer Cycle Started")
         while(self.running):
-            with self.lock:
-                if self.delay_timer > 0:
-                    self.delay_timer -= 1
-                if self.sound_timer > 0:
-                    self.sound_timer -= 1
+            self.acquire_lock()
+            try:
+                self.tick_timers()
+            finally:
+                self.lock.release()
             time.sleep(self.clock_hz)
     
     def kill_emulator(self,max_cycle):
@@ -385,7 +681,7 @@ class Emulator:
             with self.lock:
                 if self.cycle_count > max_cycle:
                     self.running = False
-                    print(f"[INFO] Emulator halted")
+                    self.log(f"[INFO] Emulator halted")
             time.sleep(self.instruction_hz)
     
     def start(self,cycles=None):
@@ -395,12 +691,14 @@ class Emulator:
             kill_thread_object = threading.Thread(target=self.kill_emulator, daemon=True, args=[cycles])
 
         self.running = True
+        if self.metrics is not None:
+            self.metrics.resume()
         cpu_thread_object.start()
         timer_thread_object.start()
         if cycles:
             kill_thread_object.start()
-            print("[INFO] Kill thread object")
-        print(f"[INFO] CPU and Timer thread started")
+            self.log("[INFO] Kill thread object")
+        self.log(f"[INFO] CPU and Timer thread started")
                 
     
 # emu = Emulator()
@@ -0,0 +1,23 @@
+WIDTH = 64
+HEIGHT = 32
+PACKED_SIZE = WIDTH * HEIGHT // 8   # 256 bytes, one bit per pixel, rows of 8 bytes
+
+# Maps the 0/1 pixel bytes of a row onto ASCII '0'/'1' so int(..., 2) can pack a whole row at once
+_BIT_CHARS = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def pack_display(display):
+    # Packs a 32x64 framebuffer (rows of 0/1 values) into 256 bytes, MSB = leftmost pixel
+    return b''.join(
+        int(bytes(row).translate(_BIT_CHARS), 2).to_bytes(8, 'big')
+        for row in display
+    )
+
+
+def unpack_display(packed):
+    # Inverse of pack_display, returns a fresh list of rows
+    display = []
+    for y in range(HEIGHT):
+        bits = int.from_bytes(packed[y * 8:(y + 1) * 8], 'big')
+        display.append([(bits >> (63 - x)) & 1 for x in range(WIDTH)])
+    return display
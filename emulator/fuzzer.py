@@ -0,0 +1,260 @@
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+import traceback
+
+from emulator.emulator import FONTSET, FONTSET_START, Emulator
+from emulator.romlibrary import opcode_class
+
+DEFAULT_BUDGET = 2000       # instructions per ROM execution
+DEFAULT_BATCH = 200         # ROM executions per worker task
+MAX_ROM_SIZE = 4096 - 0x200
+INTERESTING_BYTES = (0x00, 0x01, 0x0F, 0x10, 0x7F, 0x80, 0xF0, 0xFE, 0xFF)
+
+# Opcode templates: fixed bits plus a mask of bits filled at random
+OPCODE_TEMPLATES = (
+    (0x00E0, 0x0000), (0x00EE, 0x0000), (0x1000, 0x0FFF), (0x2000, 0x0FFF), (0x3000, 0x0FFF),
+    (0x4000, 0x0FFF), (0x5000, 0x0FF0), (0x6000, 0x0FFF), (0x7000, 0x0FFF), (0x8000, 0x0FF7),
+    (0x800E, 0x0FF0), (0x9000, 0x0FF0), (0xA000, 0x0FFF), (0xB000, 0x0FFF), (0xC000, 0x0FFF),
+    (0xD000, 0x0FFF), (0xE09E, 0x0F00), (0xE0A1, 0x0F00), (0xF007, 0x0F00), (0xF00A, 0x0F00),
+    (0xF015, 0x0F00), (0xF018, 0x0F00), (0xF01E, 0x0F00), (0xF029, 0x0F00), (0xF033, 0x0F00),
+    (0xF055, 0x0F00), (0xF065, 0x0F00),
+)
+
+
+def random_opcode(rng):
+    fixed, mask = rng.choice(OPCODE_TEMPLATES)
+    value = rng.getrandbits(16) & mask
+    if rng.random() < 0.25:
+        # Push operands towards the edges (I near 0xFFF, Vx = 0xFF, ...)
+        value |= mask & rng.choice((0x0FFF, 0x0FF0, 0x00FF, 0x0F0F))
+    return fixed | value
+
+
+def generate_rom(rng):
+    if rng.random() < 0.2:
+        return rng.randbytes(rng.randint(2, 256))
+    words = [random_opcode(rng) for _ in range(rng.randint(1, 128))]
+    return b''.join(word.to_bytes(2, 'big') for word in words)
+
+
+def mutate(rom, rng, corpus=()):
+    data = bytearray(rom)
+    for _ in range(rng.randint(1, 4)):
+        choice = rng.randrange(7)
+        if not data:
+            data += rng.randbytes(2)
+        position = rng.randrange(len(data))
+        if choice == 0:
+            data[position] ^= 1 << rng.randrange(8)
+        elif choice == 1:
+            data[position] = rng.choice(INTERESTING_BYTES)
+        elif choice == 2:
+            data[position & ~1:position & ~1] = random_opcode(rng).to_bytes(2, 'big')
+        elif choice == 3:
+            del data[position:position + rng.randint(1, 16)]
+        elif choice == 4:
+            chunk = data[position:position + rng.randint(2, 16)]
+            data[position:position] = chunk
+        elif choice == 5 and corpus:
+            other = rng.choice(corpus)
+            cut = rng.randrange(len(other) + 1)
+            data = data[:position] + other[cut:]
+        else:
+            data[position] = rng.getrandbits(8)
+    return bytes(data[:MAX_ROM_SIZE])
+
+
+def run_rom(rom, budget, seed=0, keys=0, emu=None):
+    # Executes one ROM for at most `budget` instructions, on `emu` when given (reset in place).
+    # Returns None when it ran cleanly, else (signature, detail, instruction index).
+    if emu is None:
+        emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    emu.seed(seed)
+    for key in range(16):
+        emu.keypad[key] = (keys >> key) & 1
+
+    memory = emu.memory
+    ipf = emu.instructions_per_frame
+    opcode = 0
+    for step in range(budget):
+        pc = emu.program_counter
+        try:
+            opcode = (memory[pc] << 8) | memory[pc + 1]
+            emu.cycle()
+        except Exception as e:
+            frame = traceback.extract_tb(e.__traceback__)[-1]
+            signature = f"{type(e).__name__} at {os.path.basename(frame.filename)}:{frame.lineno} ({opcode_class(opcode)})"
+            return signature, f"PC 0x{pc:03X} opcode 0x{opcode:04X}: {e}", step
+
+        # Invariants the core should keep no matter what the ROM does
+        violation = None
+        if not 0 <= emu.program_counter <= 0xFFE:
+            violation = f"PC out of range (0x{emu.program_counter:X})"
+        elif len(emu.stack) > emu.MAX_STACK_DEPTH or emu.stack_pointer != len(emu.stack):
+            violation = f"stack bounds (sp {emu.stack_pointer}, depth {len(emu.stack)})"
+        elif not 0 <= emu.index_register <= 0xFFF:
+            violation = f"I out of range (0x{emu.index_register:X})"
+        elif (opcode & 0xF0FF) == 0xF029 and \
+                not FONTSET_START <= emu.index_register < FONTSET_START + len(FONTSET):
+            violation = f"I outside the font (0x{emu.index_register:X})"
+        elif any(value > 0xFF for value in emu.v):
+            violation = "register above 0xFF"
+        if violation:
+            signature = f"invariant: {violation.split(' (')[0]} ({opcode_class(opcode)})"
+            return signature, f"PC 0x{pc:03X} opcode 0x{opcode:04X}: {violation}", step
+
+        if step % ipf == ipf - 1:
+            emu.tick_timers()
+    return None
+
+
+def run_batch(task):
+    # Worker: generates or mutates `count` ROMs and runs each one
+    seed, count, budget, corpus = task
+    rng = random.Random(seed)
+    emu = Emulator(verbose=False)
+    crashes = []
+    start = time.perf_counter()
+    for _ in range(count):
+        if corpus and rng.random() < 0.7:
+            rom = mutate(rng.choice(corpus), rng, corpus)
+        else:
+            rom = generate_rom(rng)
+        run_seed = rng.getrandbits(32)
+        keys = rng.getrandbits(16)
+        result = run_rom(rom, budget, run_seed, keys, emu)
+        if result:
+            crashes.append((result[0], result[1], rom, run_seed, keys))
+    return count, crashes, time.perf_counter() - start
+
+
+def minimize(rom, signature, budget, seed, keys, max_attempts=2000):
+    # Delta debugging: drop chunks, then simplify bytes, as long as the same crash site reproduces
+    emu = Emulator(verbose=False)
+
+    def reproduces(candidate):
+        result = run_rom(candidate, budget, seed, keys, emu) if candidate else None
+        return result is not None and result[0] == signature
+
+    data = bytes(rom)
+    attempts = 0
+    chunk = max(2, len(data) // 2) & ~1
+    while chunk >= 2 and attempts < max_attempts:
+        position = 0
+        reduced = False
+        while position < len(data) and attempts < max_attempts:
+            candidate = data[:position] + data[position + chunk:]
+            attempts += 1
+            if reproduces(candidate):
+                data = candidate
+                reduced = True
+            else:
+                position += chunk
+        if not reduced:
+            chunk //= 2
+
+    for position in range(len(data)):
+        if attempts >= max_attempts or data[position] == 0:
+            continue
+        candidate = data[:position] + b'\x00' + data[position + 1:]
+        attempts += 1
+        if reproduces(candidate):
+            data = candidate
+    return data
+
+
+class Fuzzer:
+
+    def __init__(self, budget=DEFAULT_BUDGET, batch=DEFAULT_BATCH, workers=None, seed=None, corpus=()):
+        self.budget = budget
+        self.batch = batch
+        self.workers = workers or os.cpu_count()
+        self.rng = random.Random(seed)
+        self.corpus = list(corpus)
+        self.crashes = {}       # signature -> [count, detail, rom, seed, keys]
+        self.executions = 0
+        self.worker_time = 0.0
+
+    def run(self, seconds=None, executions=None):
+        from concurrent.futures import ProcessPoolExecutor    # multiprocessing is only paid for by campaigns
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = set()
+            while True:
+                done_enough = ((seconds is not None and time.perf_counter() - start >= seconds)
+                               or (executions is not None and self.executions >= executions))
+                while not done_enough and len(pending) < self.workers * 2:
+                    task = (self.rng.getrandbits(64), self.batch, self.budget, self.corpus)
+                    pending.add(pool.submit(run_batch, task))
+                if not pending:
+                    break
+                finished = next(iter(pending)) if done_enough else None
+                for future in list(pending):
+                    if future.done() or future is finished:
+                        pending.discard(future)
+                        self._collect(*future.result())
+                time.sleep(0.001)
+        return time.perf_counter() - start
+
+    def _collect(self, count, crashes, elapsed):
+        self.executions += count
+        self.worker_time += elapsed
+        for signature, detail, rom, seed, keys in crashes:
+            known = self.crashes.get(signature)
+            if known:
+                known[0] += 1
+                if len(rom) < len(known[2]):
+                    known[1:] = [detail, rom, seed, keys]
+            else:
+                self.crashes[signature] = [1, detail, rom, seed, keys]
+                print(f"[CRASH] new site: {signature}")
+
+    def minimized(self):
+        for signature, (count, detail, rom, seed, keys) in self.crashes.items():
+            yield signature, count, detail, minimize(rom, signature, self.budget, seed, keys), seed, keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CHIP-8 ROM fuzzer with crash triage")
+    parser.add_argument('--seconds', '-s', type=float, default=30.0)
+    parser.add_argument('--budget', '-b', type=int, default=DEFAULT_BUDGET, help='Instructions per ROM run')
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help='ROM runs per worker task')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--corpus', '-c', nargs='*', default=(), help='Seed ROMs to mutate')
+    parser.add_argument('--output', '-o', type=str, default=None, help='Directory for minimized crashing ROMs')
+    args = parser.parse_args()
+
+    corpus = []
+    for path in args.corpus:
+        with open(path, 'rb') as romfile:
+            corpus.append(romfile.read())
+
+    fuzzer = Fuzzer(args.budget, args.batch, args.jobs, args.seed, corpus)
+    elapsed = fuzzer.run(seconds=args.seconds)
+    print(f"[INFO] {fuzzer.executions} executions in {elapsed:.1f} s on {fuzzer.workers} workers: "
+          f"{fuzzer.executions / elapsed:,.0f} exec/s total, "
+          f"{fuzzer.executions / max(fuzzer.worker_time, 1e-9):,.0f} exec/s per core")
+    print(f"[INFO] {len(fuzzer.crashes)} unique crash sites")
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    for signature, count, detail, rom, seed, keys in fuzzer.minimized():
+        print(f"  {count:>7}x  {signature}")
+        print(f"           {detail}")
+        print(f"           minimized ROM ({len(rom)} bytes, seed {seed}, keys 0x{keys:04X}): {rom.hex()}")
+        if args.output:
+            name = hashlib.sha1(signature.encode()).hexdigest()[:12]
+            with open(os.path.join(args.output, f"crash-{name}.ch8"), 'wb') as romfile:
+                romfile.write(rom)
+    return 1 if fuzzer.crashes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
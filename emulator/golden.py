@@ -0,0 +1,236 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from emulator.emulator import Emulator
+from emulator.romlibrary import ROM_EXTENSIONS
+
+GOLDEN_EXTENSION = ".golden.json"
+INPUT_EXTENSION = ".input"
+DEFAULT_FRAMES = 600
+DEFAULT_SEED = 0xC8C8C8C8
+
+REGISTERS = struct.Struct("<HHBBBB")    # pc, I, sp, delay timer, sound timer, stack depth
+STEP = struct.Struct("<HHHBBB16s")      # pc, I, opcode, sp, delay timer, sound timer, V0-VF
+
+
+def parse_input_script(text):
+    # One event per line: "<frame> <key hex> <down|up>", '#' starts a comment
+    events = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        try:
+            frame, key, action = line.split()
+            pressed = {"down": 1, "up": 0}[action.lower()]
+            events.setdefault(int(frame), []).append((int(key, 16), pressed))
+        except (ValueError, KeyError):
+            raise ValueError(f"input script line {number}: expected '<frame> <key> down|up', got {line!r}")
+    return events
+
+
+def machine_state(emu):
+    # Everything that can influence later frames, as bytes
+    return b''.join((
+        REGISTERS.pack(emu.program_counter & 0xFFFF, emu.index_register & 0xFFFF, emu.stack_pointer & 0xFF,
+                       emu.delay_timer, emu.sound_timer, len(emu.stack)),
+        bytes(emu.v),
+        struct.pack(f"<{len(emu.stack)}H", *emu.stack),
+        struct.pack("<I", emu.rng_state),
+        bytes(emu.keypad),
+        b''.join(bytes(row) for row in emu.display),
+        bytes(emu.memory),
+    ))
+
+
+def step_crc(emu, opcode):
+    # Cheap per-instruction fingerprint used to pin a divergence down inside a frame
+    return zlib.crc32(STEP.pack(
+        emu.program_counter & 0xFFFF, emu.index_register & 0xFFFF, opcode, emu.stack_pointer & 0xFF,
+        emu.delay_timer, emu.sound_timer, bytes(emu.v)))
+
+
+def run_traced(rom, frames, input_events, seed=DEFAULT_SEED, instructions_per_frame=None, emu=None):
+    # Runs the synchronous core, returning the rolling per-frame hashes and per-instruction CRCs.
+    # A passed-in emulator is reset in place rather than rebuilt.
+    if emu is None:
+        emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    emu.seed(seed)
+    emu.instructions_per_frame = instructions_per_frame or round(emu.clock_hz / emu.instruction_hz)
+
+    frame_hashes = []
+    step_crcs = array('I')
+    trace = []          # (frame, step, pc, opcode) of the last frame, for reports
+    rolling = b''
+    error = None
+
+    memory = emu.memory
+    for frame in range(frames):
+        for key, pressed in input_events.get(frame, ()):
+            emu.set_key(key, pressed)
+        del trace[:]
+        try:
+            for step in range(emu.instructions_per_frame):
+                pc = emu.program_counter
+                opcode = (memory[pc] << 8) | memory[pc + 1]
+                trace.append((frame, step, pc, opcode))
+                emu.cycle()
+                step_crcs.append(step_crc(emu, opcode))
+            emu.cycle_count += emu.instructions_per_frame
+            emu.tick_timers()
+        except Exception as e:
+            error = f"frame {frame}: {type(e).__name__}: {e}"
+            break
+        rolling = hashlib.blake2b(rolling + machine_state(emu), digest_size=8).digest()
+        frame_hashes.append(rolling)
+
+    return emu, frame_hashes, step_crcs, trace, error
+
+
+def _encode_crcs(step_crcs):
+    return base64.b64encode(zlib.compress(step_crcs.tobytes(), 9)).decode('ascii')
+
+
+def _decode_crcs(text):
+    crcs = array('I')
+    crcs.frombytes(zlib.decompress(base64.b64decode(text)))
+    return crcs
+
+
+def golden_path(golden_dir, rom_name):
+    return os.path.join(golden_dir, rom_name.replace('/', '__') + GOLDEN_EXTENSION)
+
+
+def load_input(rom_path):
+    input_path = rom_path + INPUT_EXTENSION
+    if os.path.exists(input_path):
+        with open(input_path, 'r', encoding='utf-8') as script:
+            return script.read()
+    return ""
+
+
+def record(job):
+    rom_path, rom_name, golden_dir, frames = job
+    with open(rom_path, 'rb') as romfile:
+        rom = romfile.read()
+    script = load_input(rom_path)
+    emu, frame_hashes, step_crcs, trace, error = run_traced(rom, frames, parse_input_script(script))
+
+    golden = {
+        "rom": rom_name,
+        "sha1": hashlib.sha1(rom).hexdigest(),
+        "frames": len(frame_hashes),
+        "instructions_per_frame": emu.instructions_per_frame,
+        "seed": DEFAULT_SEED,
+        "input": script,
+        "error": error,
+        "frame_hashes": b''.join(frame_hashes).hex(),
+        "step_crcs": _encode_crcs(step_crcs),
+    }
+    with open(golden_path(golden_dir, rom_name), 'w', encoding='utf-8') as golden_file:
+        json.dump(golden, golden_file, indent=1)
+    return rom_name, True, f"recorded {len(frame_hashes)} frames" + (f" (stopped at {error})" if error else "")
+
+
+def check(job):
+    rom_path, rom_name, golden_dir, frames = job
+    path = golden_path(golden_dir, rom_name)
+    if not os.path.exists(path):
+        return rom_name, False, "no golden file, run 'record' first"
+    with open(path, 'r', encoding='utf-8') as golden_file:
+        golden = json.load(golden_file)
+    with open(rom_path, 'rb') as romfile:
+        rom = romfile.read()
+    if hashlib.sha1(rom).hexdigest() != golden["sha1"]:
+        return rom_name, False, "ROM changed since the golden file was recorded"
+
+    expected = bytes.fromhex(golden["frame_hashes"])
+    expected_frames = golden["frames"]
+    ipf = golden["instructions_per_frame"]
+    emu, frame_hashes, step_crcs, trace, error = run_traced(
+        rom, expected_frames, parse_input_script(golden["input"]), golden["seed"], ipf
+    )
+
+    actual = b''.join(frame_hashes)
+    if actual == expected and error == golden["error"]:
+        return rom_name, True, f"{expected_frames} frames match"
+
+    # First divergent frame, then the first divergent instruction inside it
+    compared = min(len(actual), len(expected)) // 8
+    frame = next((f for f in range(compared) if actual[f * 8:(f + 1) * 8] != expected[f * 8:(f + 1) * 8]),
+                 compared)
+    golden_crcs = _decode_crcs(golden["step_crcs"])
+    index = next((i for i in range(min(len(step_crcs), len(golden_crcs))) if step_crcs[i] != golden_crcs[i]),
+                 None)
+    if index is not None:
+        frame = min(frame, index // ipf)
+
+    # Re-run up to the divergent frame to report what executed there
+    _, _, _, trace, _ = run_traced(rom, frame + 1, parse_input_script(golden["input"]), golden["seed"], ipf, emu)
+    detail = f"first divergence at frame {frame}"
+    if index is not None and index // ipf == frame:
+        step = index % ipf
+        hits = [entry for entry in trace if entry[1] == step]
+        if hits:
+            _, _, pc, opcode = hits[0]
+            detail += f", instruction {step} (PC 0x{pc:03X}, opcode 0x{opcode:04X})"
+    else:
+        detail += " (registers match, RAM or framebuffer differ)"
+    if error != golden["error"]:
+        detail += f"; error now {error!r}, golden {golden['error']!r}"
+    return rom_name, False, detail
+
+
+def collect_roms(paths):
+    roms = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    if filename.lower().endswith(ROM_EXTENSIONS):
+                        full = os.path.join(root, filename)
+                        roms.append((full, os.path.relpath(full, path).replace(os.sep, '/')))
+        else:
+            roms.append((path, os.path.basename(path)))
+    return roms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden framebuffer regression harness")
+    parser.add_argument('mode', choices=('record', 'check'))
+    parser.add_argument('roms', nargs='+', help='ROM files or directories')
+    parser.add_argument('--golden', '-g', type=str, default='golden', help='Directory of golden files')
+    parser.add_argument('--frames', '-n', type=int, default=DEFAULT_FRAMES, help='Frames to record')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    os.makedirs(args.golden, exist_ok=True)
+    jobs = [(path, name, args.golden, args.frames) for path, name in collect_roms(args.roms)]
+    worker = record if args.mode == 'record' else check
+
+    # Imported here: multiprocessing costs more than the rest of the module for library users
+    from concurrent.futures import ProcessPoolExecutor
+
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for name, ok, message in pool.map(worker, jobs):
+            failures += not ok
+            print(f"[{'PASS' if ok else 'FAIL'}] {name}: {message}")
+    print(f"[INFO] {len(jobs)} ROMs, {failures} failures in {time.perf_counter() - start:.2f} s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
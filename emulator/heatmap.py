@@ -0,0 +1,113 @@
+import argparse
+import csv
+import json
+from array import array
+
+from emulator.emulator import Emulator
+from emulator.romlibrary import opcode_class
+
+MEMORY_SIZE = 4096
+KINDS = ("executions", "reads", "writes")
+
+
+class AccessHeatmap:
+    # Per-address counters over the 4 KB address space. The core bumps one slot per event:
+    # executions per PC, and RAM reads/writes made by Dxyn, Fx33, Fx55 and Fx65.
+
+    def __init__(self, size=MEMORY_SIZE):
+        self.size = size
+        self.executions = array('L', [0]) * size
+        self.reads = array('L', [0]) * size
+        self.writes = array('L', [0]) * size
+
+    def counters(self, kind):
+        if kind not in KINDS:
+            raise ValueError(f"unknown heatmap kind {kind!r}, expected one of {KINDS}")
+        return getattr(self, kind)
+
+    def reset(self):
+        zeros = array('L', [0]) * self.size
+        for kind in KINDS:
+            self.counters(kind)[:] = zeros
+
+    def total(self, kind):
+        return sum(self.counters(kind))
+
+    def hot_spots(self, kind="executions", count=16):
+        counters = self.counters(kind)
+        ranked = sorted((address for address in range(self.size) if counters[address]),
+                        key=counters.__getitem__, reverse=True)
+        return [(address, counters[address]) for address in ranked[:count]]
+
+    def rows(self):
+        # (address, executions, reads, writes) for every address that saw any activity
+        for address in range(self.size):
+            executions = self.executions[address]
+            reads = self.reads[address]
+            writes = self.writes[address]
+            if executions or reads or writes:
+                yield address, executions, reads, writes
+
+    def to_dict(self):
+        return {
+            "size": self.size,
+            "totals": {kind: self.total(kind) for kind in KINDS},
+            "addresses": {
+                f"0x{address:03X}": {"executions": executions, "reads": reads, "writes": writes}
+                for address, executions, reads, writes in self.rows()
+            },
+        }
+
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as out:
+            json.dump(self.to_dict(), out, indent=1)
+
+    def dump_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            writer.writerow(("address", "executions", "reads", "writes"))
+            for address, executions, reads, writes in self.rows():
+                writer.writerow((f"0x{address:03X}", executions, reads, writes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a ROM headless and dump per-address heatmaps")
+    parser.add_argument('rom', type=str, help='Path to the CHIP-8 ROM file')
+    parser.add_argument('--frames', '-n', type=int, default=600)
+    parser.add_argument('--json', type=str, default=None, help='Write the heatmap as JSON')
+    parser.add_argument('--csv', type=str, default=None, help='Write the heatmap as CSV')
+    parser.add_argument('--top', type=int, default=16, help='Hot addresses to list')
+    args = parser.parse_args()
+
+    emu = Emulator(verbose=False)
+    heatmap = emu.enable_heatmap()
+    emu.loadrom(args.rom)
+    emu.readrom()
+    emu.copytomem()
+    emu.load_fontset()
+    try:
+        for _ in range(args.frames):
+            emu.step_frame()
+    except Exception as e:
+        print(f"[ERROR] ROM stopped after {emu.cycle_count} cycles: {e}")
+
+    print(f"[INFO] {emu.cycle_count} cycles over {args.frames} frames")
+    for kind in KINDS:
+        total = heatmap.total(kind)
+        print(f"Hottest {kind} ({total} total):")
+        for address, count in heatmap.hot_spots(kind, args.top):
+            share = 100 * count / total
+            if kind == "executions":
+                opcode = (emu.memory[address] << 8) | emu.memory[(address + 1) & 0xFFF]
+                print(f"  0x{address:03X}  {count:>10}  {share:5.1f}%  {opcode:04X} {opcode_class(opcode)}")
+            else:
+                print(f"  0x{address:03X}  {count:>10}  {share:5.1f}%")
+
+    if args.json:
+        heatmap.dump_json(args.json)
+    if args.csv:
+        heatmap.dump_csv(args.csv)
+
+
+if __name__ == "__main__":
+    main()
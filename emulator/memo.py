@@ -0,0 +1,323 @@
+import argparse
+import hashlib
+import marshal
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from collections import OrderedDict
+
+from emulator.emulator import Emulator
+from emulator.golden import DEFAULT_SEED, collect_roms, load_input, machine_state, parse_input_script
+
+CACHE_MAGIC = b"C8MEMO1\n"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+CHUNK = 64                      # memory is diffed and patched in 64-byte chunks
+ENTRY_OVERHEAD = 200            # rough bytes per entry beyond its patches, for the size bound
+REGISTERS = struct.Struct("<HHBBBI")    # pc, I, sp, delay timer, sound timer, rng state
+
+
+def state_hash(emu):
+    # SHA-1 of everything a frame's result depends on except the keypad (SHA-1 because it has
+    # hardware support on most hosts and measured twice as fast as BLAKE2 here). cycle_count is
+    # left out so the same machine reached along different paths still hits.
+    digest = hashlib.sha1(emu.memory)
+    digest.update(b''.join(emu.display))
+    digest.update(REGISTERS.pack(emu.program_counter & 0xFFFF, emu.index_register & 0xFFFF,
+                                 emu.stack_pointer & 0xFF, emu.delay_timer, emu.sound_timer, emu.rng_state))
+    digest.update(bytes(emu.v))
+    digest.update(struct.pack(f"<{len(emu.stack)}H", *emu.stack))
+    return digest.digest()
+
+
+def changed_chunks(memory, before, start=0, end=None, out=None):
+    # Offsets of the CHUNK-sized blocks that differ, found by halving only the ranges that differ
+    if end is None:
+        end = len(memory)
+        out = []
+    if memory[start:end] != before[start:end]:
+        if end - start <= CHUNK:
+            out.append(start)
+        else:
+            middle = (start + end) // 2
+            changed_chunks(memory, before, start, middle, out)
+            changed_chunks(memory, before, middle, end, out)
+    return out
+
+
+def keypad_mask(keypad):
+    mask = 0
+    for key in range(16):
+        if keypad[key]:
+            mask |= 1 << key
+    return mask
+
+
+class FrameCache:
+    # Size-bounded LRU of frame results. Key: (pre-frame state hash, keypad mask, instructions per
+    # frame). Value: the post-frame delta, a tuple of
+    #   memory patches ((offset, bytes), ...), display rows ((y, bytes), ...), whether the frame drew,
+    #   V registers, pc, I, stack, sp, delay timer, sound timer, rng state, post-frame state hash
+    # Memory and rows are stored as their post-frame contents, so applying a delta to the exact
+    # pre-frame state it was recorded from reproduces the post-frame state.
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def entry_size(entry):
+        return (ENTRY_OVERHEAD + sum(len(chunk) for _, chunk in entry[0])
+                + sum(len(row) for _, row in entry[1]))
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= self.entry_size(old)
+        self.entries[key] = entry
+        self.bytes += self.entry_size(entry)
+        while self.bytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= self.entry_size(evicted)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def save(self, path):
+        # marshal keeps tuples of bytes and ints compact and fast; it is tied to the Python version,
+        # which load() checks before trusting a file
+        payload = zlib.compress(marshal.dumps(list(self.entries.items())), 1)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as cache_file:
+            cache_file.write(CACHE_MAGIC + struct.pack("<H", marshal.version) + payload)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        try:
+            with open(path, 'rb') as cache_file:
+                data = cache_file.read()
+        except FileNotFoundError:
+            return 0
+        header = len(CACHE_MAGIC) + 2
+        if data[:len(CACHE_MAGIC)] != CACHE_MAGIC or struct.unpack_from("<H", data, len(CACHE_MAGIC))[0] != marshal.version:
+            print(f"[WARN] Ignoring frame cache {path} from another version")
+            return 0
+        try:
+            items = marshal.loads(zlib.decompress(data[header:]))
+        except (ValueError, EOFError, TypeError, zlib.error) as e:
+            print(f"[WARN] Ignoring corrupt frame cache {path}: {e}")
+            return 0
+        for key, entry in items:
+            self.put(key, entry)
+        return len(items)
+
+
+class MemoizedCore:
+    # Steps an Emulator frame by frame through a FrameCache. A hit applies the stored delta without
+    # interpreting a single instruction; the post-frame hash comes with the entry, so a run of hits
+    # never hashes the state at all. Only a miss pays for a pre-frame copy, a diff and a hash.
+    #
+    # The core must own the emulator's state between frames: after changing it any other way than
+    # set_key (load_state, reset, memory pokes) call invalidate(). Heatmap counters and the beeper
+    # are not fed by hits, so an emulator with either attached always runs the real frame.
+    #
+    # verify > 0 re-simulates that share of hits and compares the whole delta with the entry; a
+    # mismatch counts as a bad entry, which is replaced by the simulated one.
+
+    def __init__(self, emu, cache=None, verify=0.0, seed=1):
+        self.emu = emu
+        self.cache = cache if cache is not None else FrameCache()
+        self.verify = verify
+        self.rng = random.Random(seed)
+        self.current_hash = None
+        self.hits = 0
+        self.misses = 0
+        self.verified = 0
+        self.bad_entries = 0
+
+    def invalidate(self):
+        self.current_hash = None
+
+    def set_key(self, key, pressed):
+        self.emu.set_key(key, pressed)
+
+    def step_frame(self):
+        emu = self.emu
+        with emu.lock:
+            if emu.heatmap is not None or emu.audio is not None:
+                self.current_hash = None
+                emu.step_frame()
+                return
+            if self.current_hash is None:
+                self.current_hash = state_hash(emu)
+            key = (self.current_hash, keypad_mask(emu.keypad), emu.instructions_per_frame)
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                self._simulate(key)
+            elif self.verify and self.rng.random() < self.verify:
+                self.verified += 1
+                if self._simulate(key) != entry:
+                    self.bad_entries += 1
+            else:
+                self.hits += 1
+                self._apply(entry)
+
+    def _simulate(self, key):
+        # Runs the real frame and stores (or replaces) its delta, which is returned
+        emu = self.emu
+        memory_before = bytes(emu.memory)
+        display_before = b''.join(emu.display)
+        generation = emu.display_generation
+        self.current_hash = None    # stays unknown if the frame raises partway through
+        emu.step_frame()
+
+        post_hash = state_hash(emu)
+        self.current_hash = post_hash
+        memory = emu.memory
+        patches = tuple((offset, bytes(memory[offset:offset + CHUNK]))
+                        for offset in changed_chunks(memory, memory_before))
+        drew = emu.display_generation != generation
+        rows = ()
+        if drew:
+            width = len(emu.display[0])
+            rows = tuple((y, bytes(row)) for y, row in enumerate(emu.display)
+                         if row != display_before[y * width:(y + 1) * width])
+        entry = (
+            patches, rows, drew, tuple(emu.v), emu.program_counter,
+            emu.index_register, tuple(emu.stack), emu.stack_pointer, emu.delay_timer, emu.sound_timer,
+            emu.rng_state, post_hash,
+        )
+        self.cache.put(key, entry)
+        return entry
+
+    def _apply(self, entry):
+        emu = self.emu
+        (patches, rows, drew, v, emu.program_counter, emu.index_register, stack, emu.stack_pointer,
+         emu.delay_timer, emu.sound_timer, emu.rng_state, post_hash) = entry
+        memory = emu.memory
+        for offset, chunk in patches:
+            memory[offset:offset + len(chunk)] = chunk
+        if rows:
+            if emu.display_shared:
+                emu.own_display()
+            display = emu.display
+            for y, row in rows:
+                display[y][:] = row
+        if drew:
+            emu.display_generation += 1
+        emu.v[:] = v
+        emu.stack[:] = stack
+        emu.cycle_count += emu.instructions_per_frame
+        if emu.metrics is not None:
+            emu.metrics.frame()
+        self.current_hash = post_hash
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.verified
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "verified": self.verified,
+            "bad_entries": self.bad_entries,
+            "hit_rate": (self.hits + self.verified) / lookups if lookups else 0.0,
+            "entries": len(self.cache),
+            "cache_bytes": self.cache.bytes,
+            "evictions": self.cache.evictions,
+        }
+
+
+def replay(rom, frames, input_events, core=None, seed=DEFAULT_SEED, instructions_per_frame=None):
+    # Runs a ROM with its input script, returning (emulator, seconds, error). With `core` given the
+    # frames go through its cache, otherwise through the plain interpreter.
+    emu = core.emu if core is not None else Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    emu.seed(seed)
+    emu.instructions_per_frame = instructions_per_frame or round(emu.clock_hz / emu.instruction_hz)
+    stepper = emu
+    if core is not None:
+        core.invalidate()
+        stepper = core
+    error = None
+    start = time.perf_counter()
+    for frame in range(frames):
+        for key, pressed in input_events.get(frame, ()):
+            emu.set_key(key, pressed)
+        try:
+            stepper.step_frame()
+        except Exception as e:
+            error = f"frame {frame}: {type(e).__name__}: {e}"
+            break
+    return emu, time.perf_counter() - start, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay ROMs through the frame memoization cache")
+    parser.add_argument('roms', nargs='+', help='ROM files or directories (with optional .input scripts)')
+    parser.add_argument('--frames', '-n', type=int, default=600)
+    parser.add_argument('--runs', type=int, default=3, help='Replays per ROM through the cache')
+    parser.add_argument('--ipf', type=int, default=None, help='Instructions per frame')
+    parser.add_argument('--cache', type=str, default=None, help='Load and save the cache at this path')
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / 2 ** 20, help='Cache size bound')
+    parser.add_argument('--verify', type=float, default=0.0, help='Share of hits to re-simulate and check')
+    args = parser.parse_args()
+
+    cache = FrameCache(int(args.max_mb * 2 ** 20))
+    if args.cache:
+        print(f"[INFO] Loaded {cache.load(args.cache)} cached frames from {args.cache}")
+    core = MemoizedCore(Emulator(verbose=False), cache, args.verify)
+
+    total_plain = total_memo = 0.0
+    failures = 0
+    print(f"{'rom':<28}{'plain s':>9}{'first s':>9}{'warm s':>9}{'speedup':>9}{'hit rate':>9}  result")
+    for path, name in collect_roms(args.roms):
+        with open(path, 'rb') as romfile:
+            rom = romfile.read()
+        events = parse_input_script(load_input(path))
+        plain, plain_time, plain_error = replay(rom, args.frames, events, None, instructions_per_frame=args.ipf)
+        expected = machine_state(plain)
+
+        hits_before = core.hits + core.verified
+        lookups_before = hits_before + core.misses
+        times = []
+        ok = True
+        for _ in range(args.runs):
+            emu, elapsed, error = replay(rom, args.frames, events, core, instructions_per_frame=args.ipf)
+            times.append(elapsed)
+            ok = ok and machine_state(emu) == expected and emu.cycle_count == plain.cycle_count \
+                and error == plain_error
+        hits = core.hits + core.verified - hits_before
+        lookups = hits + core.misses - (lookups_before - hits_before)
+        warm = min(times[1:]) if len(times) > 1 else times[0]
+        failures += not ok
+        total_plain += plain_time * args.runs
+        total_memo += sum(times)
+        print(f"{name[:27]:<28}{plain_time:>9.3f}{times[0]:>9.3f}{warm:>9.3f}{plain_time / warm:>8.1f}x"
+              f"{hits / lookups if lookups else 0:>9.1%}  {'identical' if ok else 'MISMATCH'}")
+
+    stats = core.stats()
+    print(f"[INFO] hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['verified']} verified, {stats['bad_entries']} bad), {stats['entries']} entries, "
+          f"{stats['cache_bytes'] / 2 ** 20:.1f} MiB, {stats['evictions']} evictions")
+    if total_memo:
+        print(f"[INFO] end to end: {total_plain:.2f} s plain vs {total_memo:.2f} s memoized "
+              f"({total_plain / total_memo:.1f}x over {args.runs} runs per ROM)")
+    if args.cache:
+        cache.save(args.cache)
+    return 1 if failures or stats['bad_entries'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
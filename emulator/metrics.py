@@ -0,0 +1,233 @@
+import bisect
+import json
+import sys
+import threading
+import time
+from array import array
+
+DEFAULT_PORT = 9108
+DEFAULT_LOG_INTERVAL = 10.0
+# Seconds; fine at the low end for lock waits and repaints, up to several frames for frame intervals
+TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.0167, 0.025, 0.05, 0.1, 0.25, 1.0)
+RATE_WINDOW = 1.0   # seconds between instructions-per-second samples
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, function=None):
+        self.name = name
+        self.help = help_text
+        self.function = function    # read at collection time instead of being incremented
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def get(self):
+        return self.function() if self.function is not None else self.value
+
+    def samples(self):
+        yield self.name, self.get()
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    # Fixed buckets, observe() only bumps one slot and the running sum
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(buckets)
+        self.counts = array('Q', [0]) * (len(self.bounds) + 1)    # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def count(self):
+        return sum(self.counts)
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound}"}}', cumulative
+        cumulative += self.counts[-1]
+        yield f'{self.name}_bucket{{le="+Inf"}}', cumulative
+        yield f"{self.name}_sum", self.sum
+        yield f"{self.name}_count", cumulative
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.metrics = {}
+        self.server = None
+        self.log_thread = None
+        self.logging = False
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, function=None):
+        return self._add(Counter(name, help_text, function))
+
+    def gauge(self, name, help_text, function=None):
+        return self._add(Gauge(name, help_text, function))
+
+    def histogram(self, name, help_text, buckets=TIME_BUCKETS):
+        return self._add(Histogram(name, help_text, buckets))
+
+    def render(self):
+        # Prometheus text exposition format
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, value in metric.samples():
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        data = {}
+        for metric in self.metrics.values():
+            if isinstance(metric, Histogram):
+                count = metric.count()
+                data[metric.name] = {
+                    "count": count,
+                    "sum": metric.sum,
+                    "mean": metric.sum / count if count else 0.0,
+                    "buckets": dict(zip([str(bound) for bound in metric.bounds] + ["+Inf"], metric.counts)),
+                }
+            else:
+                data[metric.name] = metric.get()
+        return data
+
+    def serve(self, port=DEFAULT_PORT, host="127.0.0.1"):
+        # /metrics answers Prometheus text, /metrics.json the same numbers as JSON. http.server is
+        # imported here as it triples the import time of this module.
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = registry.render().encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry.to_dict()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"[INFO] Metrics on http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server
+
+    def log_json(self, path="-", interval=DEFAULT_LOG_INTERVAL):
+        # One JSON object per line every `interval` seconds, to a file or '-' for stdout
+        def loop():
+            out = sys.stdout if path == "-" else open(path, 'a', encoding='utf-8')
+            try:
+                while self.logging:
+                    time.sleep(interval)
+                    out.write(json.dumps({"time": time.time(), **self.to_dict()}) + "\n")
+                    out.flush()
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+
+        self.logging = True
+        self.log_thread = threading.Thread(target=loop, daemon=True)
+        self.log_thread.start()
+        return self.log_thread
+
+    def close(self):
+        self.logging = False
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class EmulatorMetrics:
+    # The runtime metrics of one Emulator. The core calls frame() once per 60 Hz timer tick and
+    # lock_wait.observe() only when it had to wait for its lock; instruction counts are read
+    # from cycle_count, so nothing is recorded per instruction.
+
+    def __init__(self, emu, registry=None):
+        self.emu = emu
+        self.registry = registry if registry is not None else MetricsRegistry()
+        registry = self.registry
+
+        registry.counter("chip8_instructions_total", "Instructions executed", lambda: emu.cycle_count)
+        self.instructions_per_second = registry.gauge(
+            "chip8_instructions_per_second", f"Effective instruction rate over the last {RATE_WINDOW:g} s")
+        registry.gauge("chip8_target_instructions_per_second", "Configured instruction rate",
+                       lambda: round(1 / emu.instruction_hz, 3))
+        self.frames = registry.counter("chip8_frames_total", "60 Hz timer ticks")
+        self.frame_interval = registry.histogram("chip8_frame_interval_seconds", "Wall time between timer ticks")
+        self.timer_drift = registry.gauge(
+            "chip8_timer_drift_seconds", "Wall time minus emulated time, positive when the timers run late")
+        self.dropped_frames = registry.counter(
+            "chip8_dropped_frames_total", "Frames skipped because the core fell a whole frame behind")
+        self.lock_wait = registry.histogram(
+            "chip8_lock_wait_seconds", "Time spent waiting for the contended core lock")
+        self.repaint = registry.histogram("chip8_repaint_seconds", "GUI display repaint cost")
+
+        self.started = None
+        self.started_frames = 0     # frames counted before the current run started
+        self.last_frame = None
+        self.rate_time = None
+        self.rate_cycles = 0
+
+    def resume(self):
+        # Called when the emulator starts or resets: the pause before the next frame is not
+        # lateness, so intervals and drift are measured from that frame again
+        self.started = None
+        self.last_frame = None
+
+    def frame(self):
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = self.last_frame = self.rate_time = now
+            self.started_frames = self.frames.value
+            self.rate_cycles = self.emu.cycle_count
+        else:
+            interval = now - self.last_frame
+            self.last_frame = now
+            self.frame_interval.observe(interval)
+            late = int(interval / self.emu.clock_hz) - 1
+            if late > 0:
+                self.dropped_frames.inc(late)
+        self.frames.inc()
+        self.timer_drift.set(now - self.started - (self.frames.value - self.started_frames - 1) * self.emu.clock_hz)
+
+        if now - self.rate_time >= RATE_WINDOW:
+            cycles = self.emu.cycle_count
+            self.instructions_per_second.set(round((cycles - self.rate_cycles) / (now - self.rate_time), 1))
+            self.rate_time = now
+            self.rate_cycles = cycles
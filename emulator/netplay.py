@@ -0,0 +1,401 @@
+import argparse
+import random
+import socket
+import struct
+import time
+import zlib
+from collections import deque
+
+from emulator.emulator import Emulator
+
+# Wire format: HEADER followed by `count` u16 key masks for frames start .. start + count - 1.
+# Every packet repeats all local inputs the peer has not acknowledged yet, so a lost UDP
+# datagram costs nothing but a late correction.
+HEADER = struct.Struct("<IiIB")     # ROM crc32, ack (highest contiguous frame received, -1 none), start, count
+MASK = struct.Struct("<H")
+MAX_INPUTS_PER_PACKET = 255
+
+DEFAULT_PORT = 7000
+NETPLAY_SEED = 0x4E455450           # both sides seed the RNG with this so Cxkk agrees
+MAX_ROLLBACK = 8                    # frames a side may run ahead of the last confirmed remote input
+FRAME_RATE = 60
+
+
+class LoopbackTransport:
+    # In-process transport, pair() returns the two connected ends
+
+    def __init__(self):
+        self.inbox = deque()
+        self.peer = None
+
+    @classmethod
+    def pair(cls):
+        first, second = cls(), cls()
+        first.peer, second.peer = second, first
+        return first, second
+
+    def send(self, data):
+        self.peer.inbox.append(data)
+
+    def receive(self):
+        messages = []
+        while self.inbox:
+            messages.append(self.inbox.popleft())
+        return messages
+
+    def close(self):
+        pass
+
+
+class UdpTransport:
+    # Non-blocking UDP socket talking to one peer
+
+    def __init__(self, bind=("0.0.0.0", DEFAULT_PORT), peer=("127.0.0.1", DEFAULT_PORT)):
+        self.peer = (socket.gethostbyname(peer[0]), peer[1])
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(bind)
+        self.sock.setblocking(False)
+
+    def send(self, data):
+        try:
+            self.sock.sendto(data, self.peer)
+        except OSError:
+            pass    # e.g. ICMP port unreachable while the peer is not up yet; the next packet retries
+
+    def receive(self):
+        messages = []
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return messages
+            if address[0] == self.peer[0]:
+                messages.append(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class LatencySimulator:
+    # Wraps another transport and delays outgoing packets by latency +- jitter seconds, dropping a
+    # `loss` share of them. Packets can overtake each other under jitter, like on a real network.
+    # Delayed packets are handed to the wrapped transport whenever this end sends or receives.
+
+    def __init__(self, transport, latency=0.05, jitter=0.0, loss=0.0, seed=1, clock=time.perf_counter):
+        self.transport = transport
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.pending = []   # (due time, data)
+
+    def send(self, data):
+        if self.rng.random() < self.loss:
+            return
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        self.pending.append((self.clock() + delay, data))
+        self._deliver()
+
+    def _deliver(self):
+        now = self.clock()
+        due = [item for item in self.pending if item[0] <= now]
+        if due:
+            self.pending = [item for item in self.pending if item[0] > now]
+            for _, data in sorted(due, key=lambda item: item[0]):
+                self.transport.send(data)
+
+    def receive(self):
+        self._deliver()
+        return self.transport.receive()
+
+    def close(self):
+        self.transport.close()
+
+
+class RollbackSession:
+    # Two-player netplay over the shared 16-key keypad: the keypad for a frame is the OR of both
+    # players' key masks. The local side never waits for the network. Missing remote input is
+    # predicted (the remote keys stay as they were last seen); when the real input arrives and
+    # differs, the core is rolled back with load_state() to the first mispredicted frame and the
+    # frames since are re-simulated back to back inside the current frame.
+    #
+    # A side only stalls when it gets MAX_ROLLBACK frames ahead of the last confirmed remote input,
+    # which bounds both the saved states kept and the cost of the worst rollback.
+
+    def __init__(self, emu, transport, input_delay=0, max_rollback=MAX_ROLLBACK, clock=time.perf_counter):
+        self.emu = emu
+        self.transport = transport
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        self.clock = clock
+        self.rom_crc = zlib.crc32(emu.romdata or b"")
+
+        self.frame = 0              # next frame to simulate
+        self.local_keys = 0         # keys held right now, sampled once per frame
+        self.local_inputs = {frame: 0 for frame in range(input_delay)}    # frame -> mask
+        self.last_local = input_delay - 1   # newest frame with a recorded local input
+        self.remote_inputs = {}     # frame -> mask, as received
+        self.remote_confirmed = -1  # every remote input up to here is known
+        self.remote_acked = -1      # the peer has every local input up to here
+        self.predicted = {}         # frame -> remote mask the frame was simulated with
+        self.states = {}            # frame -> save_state() taken before simulating it
+
+        self.started = None
+        self.rollbacks = 0
+        self.resimulated_frames = 0
+        self.resimulation_time = 0.0
+        self.worst_rollback = 0.0
+        self.save_time = 0.0
+        self.stalls = 0
+        self.ignored_packets = 0
+
+    def set_key(self, key, pressed):
+        if 0 <= key <= 15:
+            if pressed:
+                self.local_keys |= 1 << key
+            else:
+                self.local_keys &= ~(1 << key)
+
+    def _receive(self):
+        # Returns the earliest simulated frame whose prediction turned out wrong, or None
+        earliest = None
+        for data in self.transport.receive():
+            if len(data) < HEADER.size:
+                self.ignored_packets += 1
+                continue
+            rom_crc, ack, start, count = HEADER.unpack_from(data)
+            if rom_crc != self.rom_crc or len(data) != HEADER.size + count * MASK.size:
+                self.ignored_packets += 1
+                continue
+            self.remote_acked = max(self.remote_acked, ack)
+            for index in range(count):
+                frame = start + index
+                if frame <= self.remote_confirmed or frame in self.remote_inputs:
+                    continue
+                mask = MASK.unpack_from(data, HEADER.size + index * MASK.size)[0]
+                self.remote_inputs[frame] = mask
+                if frame < self.frame and self.predicted.get(frame) != mask:
+                    earliest = frame if earliest is None else min(earliest, frame)
+        while self.remote_confirmed + 1 in self.remote_inputs:
+            self.remote_confirmed += 1
+        return earliest
+
+    def poll(self):
+        # Applies remote input that arrived, rolling back to the first mispredicted frame
+        with self.emu.lock:
+            mispredicted = self._receive()
+            if mispredicted is not None:
+                self._rollback(mispredicted)
+
+    def send_inputs(self):
+        first = self.remote_acked + 1
+        last = self.last_local
+        first = max(first, last - MAX_INPUTS_PER_PACKET + 1)
+        masks = [self.local_inputs.get(frame, 0) for frame in range(first, last + 1)]
+        self.transport.send(HEADER.pack(self.rom_crc, self.remote_confirmed, first, len(masks))
+                            + b"".join(MASK.pack(mask) for mask in masks))
+
+    def remote_mask(self, frame):
+        mask = self.remote_inputs.get(frame)
+        if mask is None:
+            mask = self.remote_inputs.get(self.remote_confirmed, 0)
+        return mask
+
+    def _simulate(self, frame):
+        # Saves the state before `frame`, then runs it with the local and (maybe predicted) remote keys
+        start = self.clock()
+        self.states[frame] = self.emu.save_state()
+        self.save_time += self.clock() - start
+        remote = self.remote_mask(frame)
+        self.predicted[frame] = remote
+        keys = self.local_inputs.get(frame, 0) | remote
+        keypad = self.emu.keypad
+        for key in range(16):
+            keypad[key] = (keys >> key) & 1
+        self.emu.step_frame()
+
+    def _rollback(self, frame):
+        start = self.clock()
+        self.emu.load_state(self.states[frame])
+        audio = self.emu.audio
+        self.emu.audio = None       # re-simulated frames were already heard
+        for replay in range(frame, self.frame):
+            self._simulate(replay)
+        self.emu.audio = audio
+        elapsed = self.clock() - start
+        self.rollbacks += 1
+        self.resimulated_frames += self.frame - frame
+        self.resimulation_time += elapsed
+        self.worst_rollback = max(self.worst_rollback, elapsed)
+
+    def _prune(self):
+        oldest = min(self.frame, self.remote_confirmed + 1) - 1
+        for table in (self.states, self.predicted):
+            for frame in [frame for frame in table if frame < oldest]:
+                del table[frame]
+        for frame in [frame for frame in self.remote_inputs if frame < self.remote_confirmed]:
+            del self.remote_inputs[frame]
+        for frame in [frame for frame in self.local_inputs if frame <= self.remote_acked]:
+            del self.local_inputs[frame]
+
+    def step_frame(self):
+        # One host frame: apply remote input (rolling back if needed), then advance unless too far
+        # ahead. Returns False when the frame was a stall.
+        if self.started is None:
+            self.started = self.clock()
+        with self.emu.lock:
+            self.poll()
+            if self.frame - self.remote_confirmed > self.max_rollback:
+                self.stalls += 1
+                self.send_inputs()
+                return False
+
+            self.last_local = self.frame + self.input_delay
+            self.local_inputs[self.last_local] = self.local_keys
+            self.send_inputs()
+            self._simulate(self.frame)
+            self.frame += 1
+            self._prune()
+            return True
+
+    def checksum(self):
+        # Cheap fingerprint of the live state, for comparing both sides after a test run
+        return zlib.crc32(repr(self.emu.save_state()).encode())
+
+    def stats(self):
+        elapsed = max(self.clock() - self.started, 1e-9) if self.started is not None else 1e-9
+        return {
+            "frames": self.frame,
+            "rollbacks": self.rollbacks,
+            "rollbacks_per_second": self.rollbacks / elapsed,
+            "average_rollback_frames": self.resimulated_frames / self.rollbacks if self.rollbacks else 0.0,
+            "resimulated_frames": self.resimulated_frames,
+            "resimulation_us_per_frame": self.resimulation_time * 1e6 / self.resimulated_frames
+            if self.resimulated_frames else 0.0,
+            "worst_rollback_ms": self.worst_rollback * 1000,
+            "save_state_us": self.save_time * 1e6 / max(self.frame + self.resimulated_frames, 1),
+            "stalls": self.stalls,
+            "ignored_packets": self.ignored_packets,
+        }
+
+
+def create_session(rom, transport, input_delay=0, instructions_per_frame=None):
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    emu.seed(NETPLAY_SEED)
+    if instructions_per_frame:
+        emu.instructions_per_frame = instructions_per_frame
+    return RollbackSession(emu, transport, input_delay)
+
+
+def run_loopback(rom, seconds, latency, jitter, loss, input_delay=0, seed=1, realtime=True):
+    # Two sessions in one process with random key bots, then both are run until every input is
+    # confirmed and their states compared. Returns the stats of both sides over the timed run and
+    # whether the final states are identical.
+    first_end, second_end = LoopbackTransport.pair()
+    sessions = [
+        create_session(rom, LatencySimulator(first_end, latency, jitter, loss, seed), input_delay),
+        create_session(rom, LatencySimulator(second_end, latency, jitter, loss, seed + 1), input_delay),
+    ]
+    bots = [random.Random(seed + 10), random.Random(seed + 20)]
+    frames = int(seconds * FRAME_RATE)
+    next_frame = time.perf_counter()
+    for frame in range(frames):
+        for session, bot in zip(sessions, bots):
+            if bot.random() < 0.1:
+                session.set_key(bot.randrange(16), bot.random() < 0.5)
+            session.step_frame()
+        if realtime:
+            next_frame += 1 / FRAME_RATE
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    stats = [session.stats() for session in sessions]
+
+    # Keys up and let the last inputs arrive so both sides settle on the same confirmed frame
+    for session in sessions:
+        session.local_keys = 0
+    target = max(session.frame for session in sessions) + 2 * MAX_ROLLBACK
+    deadline = time.perf_counter() + 5 + 4 * latency
+    while time.perf_counter() < deadline and any(
+            session.frame < target or session.remote_confirmed < target - 1 for session in sessions):
+        for session in sessions:
+            if session.frame < target:
+                session.step_frame()
+            else:
+                session.poll()
+                session.send_inputs()
+        time.sleep(0.001)
+    identical = sessions[0].checksum() == sessions[1].checksum()
+    return stats, identical
+
+
+def play_udp(rom, bind, peer, seconds, input_delay=0):
+    # Headless UDP session with a random key bot, for checking a link between two machines
+    session = create_session(rom, UdpTransport(bind, peer), input_delay)
+    bot = random.Random()
+    next_frame = time.perf_counter()
+    end = next_frame + seconds
+    try:
+        while time.perf_counter() < end:
+            if bot.random() < 0.1:
+                session.set_key(bot.randrange(16), bot.random() < 0.5)
+            session.step_frame()
+            next_frame += 1 / FRAME_RATE
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()
+    finally:
+        session.transport.close()
+    return session
+
+
+def print_stats(name, stats):
+    print(f"{name}: {stats['frames']} frames, {stats['rollbacks']} rollbacks "
+          f"({stats['rollbacks_per_second']:.1f}/s, {stats['average_rollback_frames']:.1f} frames each), "
+          f"re-simulation {stats['resimulation_us_per_frame']:.0f} us/frame, "
+          f"worst rollback {stats['worst_rollback_ms']:.2f} ms, save_state {stats['save_state_us']:.1f} us, "
+          f"{stats['stalls']} stalls")
+
+
+def parse_address(text, default_host):
+    host, _, port = text.rpartition(":")
+    return (host or default_host, int(port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollback netplay over the shared CHIP-8 keypad")
+    parser.add_argument('mode', choices=('loopback', 'udp'))
+    parser.add_argument('rom', type=str, help='Path to the CHIP-8 ROM file (same on both sides)')
+    parser.add_argument('--seconds', '-s', type=float, default=10.0)
+    parser.add_argument('--latency', type=float, default=0.05, help='Loopback one-way latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Loopback latency jitter in seconds')
+    parser.add_argument('--loss', type=float, default=0.0, help='Loopback packet loss share')
+    parser.add_argument('--input-delay', type=int, default=0, help='Frames local input is delayed by')
+    parser.add_argument('--bind', type=str, default=f":{DEFAULT_PORT}", help='UDP [host]:port to listen on')
+    parser.add_argument('--peer', type=str, default=f"127.0.0.1:{DEFAULT_PORT + 1}", help='UDP host:port of the peer')
+    args = parser.parse_args()
+
+    with open(args.rom, 'rb') as romfile:
+        rom = romfile.read()
+
+    if args.mode == 'loopback':
+        stats, identical = run_loopback(rom, args.seconds, args.latency, args.jitter, args.loss, args.input_delay)
+        print_stats("player 1", stats[0])
+        print_stats("player 2", stats[1])
+        print(f"final states {'match' if identical else 'DIFFER'}")
+        return 0 if identical else 1
+
+    session = play_udp(rom, parse_address(args.bind, "0.0.0.0"), parse_address(args.peer, "127.0.0.1"),
+                       args.seconds, args.input_delay)
+    print_stats("local", session.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
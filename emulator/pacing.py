@@ -0,0 +1,181 @@
+import threading
+import time
+
+from emulator.framebuffer import pack_display
+
+FRAME_RATE = 60
+SMOOTHING = 0.1     # weight of the newest sample in the cost averages
+HEADROOM = 0.85     # share of the frame budget the host may use before the next level kicks in
+RELAX = 0.6         # projected load below which a level is given back
+RELAX_FRAMES = 60   # frames the projection has to stay below RELAX before each step back
+LATE_FRAMES = 2     # a frame started this many periods late counts as overloaded whatever the costs say
+MIN_SPEED = 0.25    # emulation never drops below a quarter of full speed
+
+# (present every Nth frame, refresh the debug panels every Nth GUI refresh, label)
+LEVELS = (
+    (1, 1, "full speed"),
+    (2, 1, "presenting 1/2 frames"),
+    (3, 1, "presenting 1/3 frames"),
+    (3, 4, "presenting 1/3 frames, panels 1/4"),
+    (3, 4, "emulation slowed"),
+)
+SLOWED = len(LEVELS) - 1
+
+
+class FramePacer:
+    # Frame-paced driver for the GUI that adapts to the host instead of simply running slow.
+    # It keeps smoothed costs for the three things sharing each 1/60 s frame: emulating it
+    # (measured here), painting a presented frame and refreshing the debug panels (both reported
+    # by the GUI). When they no longer fit in HEADROOM of the budget it degrades in LEVELS order:
+    # first fewer frames are presented, then the panels refresh less often, and only at the last
+    # level is the emulation itself slowed, just enough to fit.
+    #
+    # Levels are chosen from the projected load of each level, so a sudden spike can skip straight
+    # to the level that fits; giving a level back needs RELAX_FRAMES calm frames so it does not flap.
+
+    def __init__(self, emu, runahead=None, fps=FRAME_RATE):
+        self.emu = emu
+        self.runahead = runahead    # when set, frames are stepped and presented through run-ahead
+        self.frame_period = 1 / fps
+        self.level = 0
+        self.speed = 1.0            # emulation speed, below 1 only at the SLOWED level
+        self.instruction_carry = 0.0    # fraction of an instruction owed to the next frame
+        self.calm_frames = 0
+
+        self.emulation_cost = 0.0   # smoothed seconds per emulated frame
+        self.render_cost = 0.0      # smoothed seconds per presented frame
+        self.panel_cost = 0.0       # smoothed seconds per debug-panel refresh
+
+        self.presented = pack_display(emu.display)
+        self.presented_generation = 0   # bumped whenever a new frame is presented
+        self.frame_count = 0
+        self.frames_presented = 0
+        self.frames_skipped = 0
+        self.panel_refreshes = 0
+        self.running = False
+        self.thread = None
+
+    def present_interval(self):
+        return LEVELS[self.level][0]
+
+    def panel_interval(self):
+        return LEVELS[self.level][1]
+
+    def status(self):
+        return LEVELS[self.level][2] if self.level < SLOWED else f"emulation slowed to {self.speed:.0%}"
+
+    def load(self, level=None):
+        # Share of one frame period used at `level` (default: the current one)
+        present_every, panel_every, _ = LEVELS[self.level if level is None else level]
+        cost = self.emulation_cost + self.render_cost / present_every + self.panel_cost / panel_every
+        return cost / self.frame_period
+
+    def report_render(self, seconds):
+        self.render_cost += SMOOTHING * (seconds - self.render_cost)
+
+    def report_panels(self, seconds):
+        self.panel_cost += SMOOTHING * (seconds - self.panel_cost)
+
+    def panel_refresh_due(self):
+        # Called by the GUI on every refresh timer tick
+        self.panel_refreshes += 1
+        return self.panel_refreshes % self.panel_interval() == 0
+
+    def adapt(self, late=False):
+        # Picks the level for the next frame from the smoothed costs
+        target = SLOWED
+        for level in range(SLOWED):
+            if self.load(level) <= HEADROOM:
+                target = level
+                break
+        if late and target <= self.level:
+            target = min(self.level + 1, SLOWED)
+
+        if target > self.level:
+            self.level = target
+            self.calm_frames = 0
+        elif target < self.level and self.load(self.level - 1) < RELAX:
+            self.calm_frames += 1
+            if self.calm_frames >= RELAX_FRAMES:
+                self.calm_frames = 0
+                self.level -= 1
+        else:
+            self.calm_frames = 0
+
+        if self.level == SLOWED:
+            # Panel refreshes follow the GUI timer, only emulating and presenting scale with speed
+            present_every, panel_every, _ = LEVELS[SLOWED]
+            per_frame = self.emulation_cost + self.render_cost / present_every
+            spare = HEADROOM * self.frame_period - self.panel_cost / panel_every
+            self.speed = max(MIN_SPEED, min(1.0, spare / per_frame if per_frame > 0 else 1.0))
+        else:
+            self.speed = 1.0
+
+    def frame_instructions(self):
+        # Matches the threaded core's 1/instruction_hz instructions per second: 500 Hz is 8.33
+        # per frame, so frames run 8 or 9 and carry the remainder instead of rounding down to 8
+        owed = self.emu.clock_hz / self.emu.instruction_hz + self.instruction_carry
+        count = int(owed)
+        self.instruction_carry = owed - count
+        return count
+
+    def step_frame(self):
+        # Holds the core lock for the whole frame so a stop() followed by reset() never races a
+        # frame in progress; returns False without stepping if stopped while waiting for the lock
+        with self.emu.lock:
+            if not (self.running and self.emu.running):
+                return False
+            instructions = self.frame_instructions()
+            start = time.perf_counter()
+            if self.runahead is not None:
+                self.runahead.step_frame(instructions)
+            else:
+                self.emu.step_frame(instructions)
+            self.emulation_cost += SMOOTHING * (time.perf_counter() - start - self.emulation_cost)
+            self.frame_count += 1
+
+            if self.frame_count % self.present_interval() == 0:
+                self.present()
+                self.frames_presented += 1
+            else:
+                self.frames_skipped += 1
+        return True
+
+    def present(self):
+        # Hands the current frame to the GUI, also used after a reset while stopped
+        self.presented = self.runahead.presented if self.runahead is not None else pack_display(self.emu.display)
+        self.presented_generation += 1
+
+    def run(self, max_cycles=None):
+        # Replaces the emulator's instruction-level threads with one thread paced per frame
+        emu = self.emu
+        next_frame = time.perf_counter()
+        while self.running and emu.running:
+            if not self.step_frame():
+                break
+            if max_cycles and emu.cycle_count > max_cycles:
+                emu.running = False
+            next_frame += emu.clock_hz / self.speed
+            delay = next_frame - time.perf_counter()
+            self.adapt(late=-delay > LATE_FRAMES * self.frame_period)
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()
+        self.running = False
+
+    def start(self, max_cycles=None):
+        self.stop()     # never two pacer threads stepping the same core
+        self.emu.running = True
+        self.running = True
+        if self.emu.metrics is not None:
+            self.emu.metrics.resume()
+        self.thread = threading.Thread(target=self.run, args=(max_cycles,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.thread = None
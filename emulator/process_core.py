@@ -0,0 +1,353 @@
+import multiprocessing
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+from emulator.emulator import Emulator
+
+# Shared memory layout, written only by the core process:
+#   header | V0-VF | framebuffer (1 byte per pixel, row-major) | RAM | stack
+HEADER = struct.Struct("<QQQHHBBBBBBxx")    # seq, cycles, frames, pc, I, sp, dt, st, running, stack depth, error
+V_OFFSET = HEADER.size
+DISPLAY_OFFSET = V_OFFSET + 16
+MEMORY_OFFSET = DISPLAY_OFFSET + 64 * 32
+STACK_OFFSET = MEMORY_OFFSET + 4096
+STACK = struct.Struct("<16H")
+SHM_SIZE = STACK_OFFSET + STACK.size
+CLOSED_HEADER = (0,) * 11   # what a closed core reads as
+
+IDLE_POLL = 0.05    # seconds the stopped core blocks waiting for a control message
+MAX_BACKLOG = 0.25  # seconds of frames the core may fall behind before it resyncs its clock
+
+
+def _attach(name):
+    # The creating process owns the segment, so the core must not register it for cleanup
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:   # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _publish(buf, emu, frames, error=None):
+    # Seqlock write: the sequence number is odd while the block is being updated
+    seq = HEADER.unpack_from(buf, 0)[0] + 1
+    struct.pack_into("<Q", buf, 0, seq)
+    HEADER.pack_into(
+        buf, 0, seq, emu.cycle_count, frames,
+        emu.program_counter & 0xFFFF, emu.index_register & 0xFFFF,
+        emu.stack_pointer & 0xFF, emu.delay_timer & 0xFF, emu.sound_timer & 0xFF,
+        emu.running, len(emu.stack), error is not None,
+    )
+    buf[V_OFFSET:V_OFFSET + 16] = bytes(emu.v)
+    for y, row in enumerate(emu.display):
+        offset = DISPLAY_OFFSET + y * 64
+        buf[offset:offset + 64] = row
+    buf[MEMORY_OFFSET:STACK_OFFSET] = emu.memory
+    stack = emu.stack[-16:] + [0] * (16 - len(emu.stack[-16:]))
+    STACK.pack_into(buf, STACK_OFFSET, *(address & 0xFFFF for address in stack))
+    struct.pack_into("<Q", buf, 0, seq + 1)
+
+
+def core_main(shm_name, conn, throttled=True):
+    # Entry point of the core process: steps whole frames and publishes each one to shared memory
+    shm = _attach(shm_name)
+    buf = shm.buf
+    emu = Emulator(verbose=False)
+    frames = 0
+    late_frames = 0
+    max_cycles = None
+    error = None        # why the last run stopped on its own, kept until the next start/load/reset
+    started = None
+    next_frame = time.perf_counter()
+
+    try:
+        while True:
+            while conn.poll(0 if emu.running else IDLE_POLL):
+                message = conn.recv()
+                command = message[0]
+                if command == "key":
+                    emu.set_key(message[1], message[2])
+                elif command == "start":
+                    error = None
+                    max_cycles = message[1]
+                    emu.running = True
+                    started = time.perf_counter()
+                    next_frame = started
+                elif command == "stop":
+                    emu.running = False
+                elif command == "load":
+                    error = None
+                    emu.load_rom_bytes(message[1], message[2])
+                    emu.copytomem()
+                    emu.load_fontset()
+                elif command == "reset":
+                    emu.reset(message[1])
+                    error = None
+                    frames = 0
+                elif command == "speed":
+                    emu.instructions_per_frame = message[1]
+                elif command == "snapshot":
+                    conn.send({
+                        "state": emu.snapshot(),
+                        "memory": bytes(emu.memory),
+                        "stack": list(emu.stack),
+                        "display": [bytes(row) for row in emu.display],
+                    })
+                elif command == "stats":
+                    elapsed = time.perf_counter() - started if started else 0.0
+                    conn.send({
+                        "frames": frames,
+                        "late_frames": late_frames,
+                        "cycles": emu.cycle_count,
+                        "elapsed": elapsed,
+                        "error": error,
+                    })
+                elif command == "error":
+                    conn.send(error)
+                elif command == "quit":
+                    return
+                _publish(buf, emu, frames, error)
+
+            if not emu.running:
+                continue
+
+            try:
+                emu.step_frame()
+            except Exception as e:
+                # A crashing ROM stops the run, the core keeps serving commands
+                emu.running = False
+                error = f"{type(e).__name__}: {e}"
+                print(f"[ERROR] Core stopped at PC 0x{emu.program_counter:03X}: {error}")
+            frames += 1
+            if max_cycles and emu.cycle_count > max_cycles:
+                emu.running = False
+            _publish(buf, emu, frames, error)
+
+            if throttled:
+                next_frame += emu.clock_hz
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -MAX_BACKLOG:
+                    # Too far behind to catch up by running frames back to back
+                    late_frames += 1
+                    next_frame = time.perf_counter()
+    finally:
+        del buf
+        shm.close()
+
+
+class ProcessEmulator:
+    # Drop-in stand-in for Emulator whose core runs in a separate process.
+    # State is read zero-copy from shared memory; control messages go over a pipe.
+
+    def __init__(self, throttled=True):
+        self.shm = shared_memory.SharedMemory(create=True, size=SHM_SIZE)
+        self.buf = self.shm.buf
+        self.buf[:SHM_SIZE] = bytes(SHM_SIZE)
+
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=core_main, args=(self.shm.name, child_conn, throttled), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        # Zero-copy views into the core's published state
+        self.v = self.buf[V_OFFSET:V_OFFSET + 16]
+        self.memory = self.buf[MEMORY_OFFSET:STACK_OFFSET]
+        self.display = [
+            self.buf[DISPLAY_OFFSET + y * 64:DISPLAY_OFFSET + (y + 1) * 64] for y in range(32)
+        ]
+
+        # Mirrors the attributes the GUI and ROM library touch on Emulator
+        self.lock = threading.RLock()
+        self.rompath = None
+        self.romdata = None
+        self.clock_hz = 1/60
+        self.instruction_hz = 1/500
+        self._instructions_per_frame = round(self.clock_hz / self.instruction_hz)
+        self._conn_lock = threading.Lock()
+        self.closed = False
+        self.failure = None     # set once the core process is found gone
+
+        print("[INFO] CHIP-8 Emulator core process started")
+
+    def _lost(self, e):
+        # The pipe broke: the core process died. Reported once, the GUI keeps running on the last state
+        if self.failure is None:
+            self.failure = f"core process exited ({type(e).__name__})"
+            print(f"[ERROR] {self.failure}")
+
+    def _send(self, *message):
+        if self.closed or self.failure is not None:
+            return
+        with self._conn_lock:
+            try:
+                self.conn.send(message)
+            except (BrokenPipeError, EOFError, OSError) as e:
+                self._lost(e)
+
+    def _request(self, *message):
+        # Returns None once the core is closed or gone
+        if self.closed or self.failure is not None:
+            return None
+        with self._conn_lock:
+            try:
+                self.conn.send(message)
+                return self.conn.recv()
+            except (BrokenPipeError, EOFError, OSError) as e:
+                self._lost(e)
+                return None
+
+    def _header(self):
+        # Seqlock read: retry until the header was not being written while we read it
+        if self.closed:
+            return CLOSED_HEADER
+        while True:
+            header = HEADER.unpack_from(self.buf, 0)
+            if header[0] & 1 == 0 and struct.unpack_from("<Q", self.buf, 0)[0] == header[0]:
+                return header
+
+    @property
+    def cycle_count(self):
+        return self._header()[1]
+
+    @property
+    def display_generation(self):
+        return self._header()[2]
+
+    @property
+    def program_counter(self):
+        return self._header()[3]
+
+    @property
+    def index_register(self):
+        return self._header()[4]
+
+    @property
+    def stack_pointer(self):
+        return self._header()[5]
+
+    @property
+    def delay_timer(self):
+        return self._header()[6]
+
+    @property
+    def sound_timer(self):
+        return self._header()[7]
+
+    @property
+    def stack(self):
+        if self.closed:
+            return []
+        depth = self._header()[9]
+        return list(STACK.unpack_from(self.buf, STACK_OFFSET)[:depth])
+
+    @property
+    def running(self):
+        return bool(self._header()[8]) and self.failure is None
+
+    @property
+    def error(self):
+        # Why the core stopped on its own, or None
+        if self.failure is not None:
+            return self.failure
+        if self._header()[10]:
+            return self._request("error")
+        return None
+
+    @running.setter
+    def running(self, value):
+        if value:
+            self._send("start", None)
+        else:
+            self._send("stop")
+
+    @property
+    def instructions_per_frame(self):
+        return self._instructions_per_frame
+
+    @instructions_per_frame.setter
+    def instructions_per_frame(self, value):
+        self._instructions_per_frame = value
+        self._send("speed", value)
+
+    def snapshot(self):
+        if self.closed:
+            return ((0,) * 16, 0, 0, 0, 0, 0, 0, 0)
+        while True:
+            header = self._header()
+            v = tuple(self.v)
+            if struct.unpack_from("<Q", self.buf, 0)[0] == header[0]:
+                seq, cycles, frames, pc, index, sp, dt, st, running, depth, error = header
+                return (v, pc, index, cycles, dt, st, sp, frames)
+
+    def full_snapshot(self):
+        return self._request("snapshot")
+
+    def stats(self):
+        return self._request("stats")
+
+    def loadrom(self, path):
+        self.rompath = path
+        print("[INFO] ROM path set")
+
+    def readrom(self):
+        try:
+            with open(self.rompath, 'rb') as romfile:
+                self.romdata = romfile.read()
+                print("[INFO] ROM data read")
+        except Exception as e:
+            print(f"[ERROR] Failed to read ROM: {e}")
+
+    def load_rom_bytes(self, data, path=None):
+        self.rompath = path
+        self.romdata = bytes(data)
+
+    def copytomem(self, start=0x200):
+        if self.romdata:
+            self._send("load", self.romdata, self.rompath)
+        else:
+            print("[ERROR] No Data in ROM to copy")
+
+    def load_fontset(self):
+        pass    # the core process loads the font together with the ROM
+
+    def reset(self, keep_rom=True):
+        if not keep_rom:
+            self.rompath = None
+            self.romdata = None
+        self._send("reset", keep_rom)
+
+    def set_key(self, key, ispressed):
+        if 0 <= key <= 15:
+            self._send("key", key, ispressed)
+        else:
+            print("[ERROR] keypad exception : Key out of bound")
+
+    def start(self, cycles=None):
+        self._send("start", cycles)
+        print("[INFO] Core process started emulation")
+
+    def close(self):
+        if self.closed:
+            return
+        if self.process.is_alive():
+            try:
+                self._send("quit")
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.conn.close()
+        self.closed = True      # from here on every read returns a zeroed state
+
+        for view in (self.v, self.memory, *self.display):
+            view.release()
+        self.buf.release()
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,301 @@
+import argparse
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import HEIGHT, WIDTH, pack_display
+
+FRAME_RATE = 60
+PNG_CACHE_SIZE = 1024
+OFF_COLOR = (0x00, 0x11, 0x00)
+ON_COLOR = (0x00, 0xFF, 0x41)   # Matrix green, same as the GUI
+
+
+def _scaled_rows(packed, scale):
+    # Yields the framebuffer rows as bit strings (MSB first) scaled horizontally and vertically
+    if scale == 1:
+        for y in range(HEIGHT):
+            yield packed[y * 8:(y + 1) * 8]
+        return
+    spread = [int(''.join(c * scale for c in f"{byte:08b}"), 2) for byte in range(256)]
+    width = 8 * scale
+    for y in range(HEIGHT):
+        value = 0
+        for byte in packed[y * 8:(y + 1) * 8]:
+            value = (value << width) | spread[byte]
+        row = value.to_bytes(WIDTH * scale // 8, 'big')
+        for _ in range(scale):
+            yield row
+
+
+class RawEncoder:
+    # Raw 1-bit video: "CH8V" magic, width, height, fps, then (duration u16, 256 packed bytes) per frame
+
+    def __init__(self, path, fps=FRAME_RATE):
+        self.file = open(path, 'wb')
+        self.file.write(b"CH8V" + struct.pack("<HHH", WIDTH, HEIGHT, fps))
+
+    def add_frame(self, packed, duration):
+        while duration > 0:
+            chunk = min(duration, 0xFFFF)
+            self.file.write(struct.pack("<H", chunk) + packed)
+            duration -= chunk
+
+    def close(self):
+        self.file.close()
+
+
+class PngSequenceEncoder:
+    # One 1-bit PNG per distinct frame plus durations.txt listing how long each one is shown
+
+    def __init__(self, directory, scale=4, fps=FRAME_RATE):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.scale = scale
+        self.fps = fps
+        self.index = 0
+        self.durations = open(os.path.join(directory, "durations.txt"), 'w')
+        self.palette = bytes(OFF_COLOR + ON_COLOR)
+        self.cache = {}     # packed frame -> encoded PNG, games flip between a few screens a lot
+
+    def _chunk(self, kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def encode(self, packed):
+        width = WIDTH * self.scale
+        height = HEIGHT * self.scale
+        raw = b''.join(b'\x00' + row for row in _scaled_rows(packed, self.scale))
+        return (b"\x89PNG\r\n\x1a\n"
+                + self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 1, 3, 0, 0, 0))
+                + self._chunk(b"PLTE", self.palette)
+                + self._chunk(b"IDAT", zlib.compress(raw, 6))
+                + self._chunk(b"IEND", b""))
+
+    def add_frame(self, packed, duration):
+        data = self.cache.get(packed)
+        if data is None:
+            if len(self.cache) >= PNG_CACHE_SIZE:
+                self.cache.clear()
+            data = self.cache[packed] = self.encode(packed)
+        name = f"frame_{self.index:06d}.png"
+        with open(os.path.join(self.directory, name), 'wb') as png:
+            png.write(data)
+        self.durations.write(f"{name} {duration * 1000 / self.fps:.1f}\n")
+        self.index += 1
+
+    def close(self):
+        self.durations.close()
+
+
+def lzw_encode(pixels, min_code_size=2):
+    # GIF flavoured LZW over a bytes object of palette indices
+    clear = 1 << min_code_size
+    end = clear + 1
+    out = bytearray()
+    bits = 0
+    bit_count = 0
+
+    table = {}
+    next_code = end + 1
+    code_size = min_code_size + 1
+
+    bits |= clear << bit_count
+    bit_count += code_size
+
+    prefix = pixels[0]
+    for pixel in pixels[1:]:
+        key = (prefix << 8) | pixel
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        bits |= prefix << bit_count
+        bit_count += code_size
+        while bit_count >= 8:
+            out.append(bits & 0xFF)
+            bits >>= 8
+            bit_count -= 8
+
+        if next_code < 4096:
+            table[key] = next_code
+            next_code += 1
+            if next_code > (1 << code_size) and code_size < 12:
+                code_size += 1
+        else:
+            bits |= clear << bit_count
+            bit_count += code_size
+            table.clear()
+            next_code = end + 1
+            code_size = min_code_size + 1
+        prefix = pixel
+
+    for code in (prefix, end):
+        bits |= code << bit_count
+        bit_count += code_size
+        if code == prefix and next_code == (1 << code_size) and code_size < 12:
+            code_size += 1
+    while bit_count > 0:
+        out.append(bits & 0xFF)
+        bits >>= 8
+        bit_count -= 8
+    return bytes(out)
+
+
+class GifEncoder:
+    # Animated GIF; each frame only stores the bounding box that changed since the previous one
+
+    def __init__(self, path, scale=4, fps=FRAME_RATE):
+        self.file = open(path, 'wb')
+        self.scale = scale
+        self.fps = fps
+        self.previous = None
+        # One packed byte -> 8 * scale palette indices
+        self.expand = [
+            bytes((byte >> (7 - bit)) & 1 for bit in range(8) for _ in range(scale))
+            for byte in range(256)
+        ]
+        self.elapsed_cs = 0.0   # running time in centiseconds, so rounding never accumulates
+        self.written_cs = 0
+
+        width = WIDTH * scale
+        height = HEIGHT * scale
+        self.file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0x80, 0, 0))
+        self.file.write(bytes(OFF_COLOR + ON_COLOR))
+        # Loop forever
+        self.file.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def _changed_box(self, packed):
+        if self.previous is None:
+            return 0, 0, 8, HEIGHT
+        rows = [y for y in range(HEIGHT) if packed[y * 8:(y + 1) * 8] != self.previous[y * 8:(y + 1) * 8]]
+        if not rows:
+            return 0, 0, 1, 1
+        columns = [x for x in range(8) if any(packed[y * 8 + x] != self.previous[y * 8 + x] for y in rows)]
+        return columns[0], rows[0], columns[-1] + 1, rows[-1] + 1
+
+    def _write_image(self, packed, delay):
+        left, top, right, bottom = self._changed_box(packed)
+        scale = self.scale
+        expand = self.expand
+        pixels = bytearray()
+        for y in range(top, bottom):
+            row = b''.join(expand[byte] for byte in packed[y * 8 + left:y * 8 + right])
+            pixels += row * scale
+
+        data = lzw_encode(bytes(pixels))
+        self.file.write(b"\x21\xF9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00")
+        self.file.write(b"\x2C" + struct.pack("<HHHHB", left * 8 * scale, top * scale,
+                                               (right - left) * 8 * scale, (bottom - top) * scale, 0))
+        self.file.write(b"\x02")
+        for offset in range(0, len(data), 255):
+            block = data[offset:offset + 255]
+            self.file.write(bytes((len(block),)) + block)
+        self.file.write(b"\x00")
+        self.previous = packed
+
+    def add_frame(self, packed, duration):
+        self.elapsed_cs += duration * 100 / self.fps
+        delay = round(self.elapsed_cs) - self.written_cs
+        if delay <= 0:
+            # Shorter than the GIF's 10 ms resolution, fold it into the next frame
+            return
+        self.written_cs += delay
+        self._write_image(packed, delay)
+
+    def close(self):
+        self.file.write(b"\x3B")
+        self.file.close()
+
+
+class FrameRecorder:
+    # Captures the framebuffer at frame boundaries; identical consecutive frames are merged into
+    # one longer frame, and encoding happens on a background thread.
+
+    def __init__(self, encoder):
+        self.encoder = encoder
+        self.queue = queue.SimpleQueue()
+        self.last = None
+        self.duration = 0
+        self.frames_captured = 0
+        self.frames_encoded = 0
+        self.worker = threading.Thread(target=self._encode_loop, daemon=True)
+        self.worker.start()
+
+    def capture(self, display):
+        self.capture_packed(pack_display(display))
+
+    def capture_packed(self, packed):
+        self.frames_captured += 1
+        if packed == self.last:
+            self.duration += 1
+            return
+        if self.last is not None:
+            self.queue.put((self.last, self.duration))
+        self.last = packed
+        self.duration = 1
+
+    def _encode_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            self.encoder.add_frame(*item)
+            self.frames_encoded += 1
+
+    def close(self):
+        if self.last is not None:
+            self.queue.put((self.last, self.duration))
+            self.last = None
+        self.queue.put(None)
+        self.worker.join()
+        self.encoder.close()
+
+
+def make_encoder(output, fmt=None, scale=4, fps=FRAME_RATE):
+    fmt = fmt or {".gif": "gif", ".raw": "raw", ".ch8v": "raw"}.get(os.path.splitext(output)[1].lower(), "png")
+    if fmt == "gif":
+        return GifEncoder(output, scale, fps)
+    if fmt == "raw":
+        return RawEncoder(output, fps)
+    return PngSequenceEncoder(output, scale, fps)
+
+
+def record_rom(rom_path, output, frames, fmt=None, scale=4):
+    emu = Emulator(verbose=False)
+    emu.loadrom(rom_path)
+    emu.readrom()
+    emu.copytomem()
+    emu.load_fontset()
+
+    recorder = FrameRecorder(make_encoder(output, fmt, scale))
+    start = time.perf_counter()
+    for _ in range(frames):
+        emu.step_frame()
+        recorder.capture(emu.display)
+    emulated = time.perf_counter() - start
+    recorder.close()
+    total = time.perf_counter() - start
+    print(f"[INFO] Recorded {frames} frames ({frames / FRAME_RATE:.1f} s of gameplay) as "
+          f"{recorder.frames_encoded} distinct frames in {total:.2f} s (emulation {emulated:.2f} s)")
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless CHIP-8 frame recorder")
+    parser.add_argument('rom', type=str, help='Path to the CHIP-8 ROM file')
+    parser.add_argument('output', type=str, help='.gif, .raw or a directory for a PNG sequence')
+    parser.add_argument('--format', '-f', choices=('png', 'gif', 'raw'), default=None)
+    parser.add_argument('--frames', '-n', type=int, default=600, help='Frames to emulate (60 per second)')
+    parser.add_argument('--scale', '-s', type=int, default=4)
+    args = parser.parse_args()
+    record_rom(args.rom, args.output, args.frames, args.format, args.scale)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import time
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import pack_display, unpack_display
+
+INDEX_FILENAME = ".romindex.json"
+INDEX_VERSION = 1
+ROM_EXTENSIONS = (".ch8", ".rom", ".c8", ".sc8", ".xo8")
+THUMBNAIL_FRAMES = 120
+CALIBRATION_FRAMES = 180
+CALIBRATION_SPEEDS = (4, 6, 8, 10, 12, 15, 20, 30, 50, 100, 200)
+WAIT_SHARE = 0.2        # share of instructions spent waiting on the delay timer that means "fast enough"
+HOST_SHARE = 0.5        # calibrated speeds never use more than this much of a frame on this host
+
+# Default instructions per 60 Hz frame for each detected platform
+PLATFORM_SPEEDS = {
+    "chip-8": 8,
+    "schip": 30,
+    "xo-chip": 100,
+}
+
+# Opcodes that only exist in the SUPER-CHIP / XO-CHIP extensions
+SCHIP_OPCODES = {0x00FB, 0x00FC, 0x00FD, 0x00FE, 0x00FF}
+SCHIP_MASKED = ((0xFFF0, 0x00C0), (0xF00F, 0xD000), (0xF0FF, 0xF030), (0xF0FF, 0xF075), (0xF0FF, 0xF085))
+XOCHIP_MASKED = ((0xFFF0, 0x00D0), (0xF00F, 0x5002), (0xF00F, 0x5003), (0xFFFF, 0xF000),
+                 (0xFFFF, 0xF002), (0xF0FF, 0xF001), (0xF0FF, 0xF03A))
+
+
+def opcode_class(opcode):
+    # Groups an opcode under its mnemonic pattern, e.g. 0x6A05 -> "6xkk"
+    p1 = opcode >> 12
+    if p1 == 0x0:
+        if opcode == 0x00E0 or opcode == 0x00EE:
+            return f"{opcode:04X}"
+        return "0nnn"
+    if p1 in (0x1, 0x2, 0xA, 0xB):
+        return f"{p1:X}nnn"
+    if p1 in (0x3, 0x4, 0x6, 0x7, 0xC):
+        return f"{p1:X}xkk"
+    if p1 == 0xD:
+        return "Dxyn"
+    if p1 in (0x5, 0x9):
+        return f"{p1:X}xy0" if opcode & 0xF == 0 else "????"
+    if p1 == 0x8:
+        n = opcode & 0xF
+        return f"8xy{n:X}" if n in (0, 1, 2, 3, 4, 5, 6, 7, 0xE) else "????"
+    low = opcode & 0xFF
+    if p1 == 0xE and low in (0x9E, 0xA1):
+        return f"Ex{low:02X}"
+    if p1 == 0xF and low in (0x07, 0x0A, 0x15, 0x18, 0x1E, 0x29, 0x33, 0x55, 0x65):
+        return f"Fx{low:02X}"
+    return "????"
+
+
+def opcode_histogram(data):
+    # Static histogram over the 2-byte aligned words of the ROM image
+    histogram = {}
+    for offset in range(0, len(data) - 1, 2):
+        name = opcode_class((data[offset] << 8) | data[offset + 1])
+        histogram[name] = histogram.get(name, 0) + 1
+    return histogram
+
+
+def detect_platform(data, filename=""):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".xo8":
+        return "xo-chip"
+    if extension == ".sc8":
+        return "schip"
+
+    schip_hits = set()
+    xochip_hits = set()
+    for offset in range(0, len(data) - 1, 2):
+        opcode = (data[offset] << 8) | data[offset + 1]
+        if opcode in SCHIP_OPCODES:
+            schip_hits.add(opcode)
+        for mask, value in SCHIP_MASKED:
+            if opcode & mask == value:
+                schip_hits.add(value)
+        for mask, value in XOCHIP_MASKED:
+            if opcode & mask == value:
+                xochip_hits.add(value)
+
+    # Data bytes can look like anything, so require more than one distinct extension opcode
+    if len(xochip_hits) >= 2:
+        return "xo-chip"
+    if len(schip_hits) >= 2:
+        return "schip"
+    return "chip-8"
+
+
+def render_thumbnail(data, frames=THUMBNAIL_FRAMES):
+    # Runs the ROM headless for a short while and returns the packed 64x32 framebuffer
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(data)
+    emu.copytomem()
+    emu.load_fontset()
+    try:
+        for _ in range(frames):
+            emu.step_frame()
+    except Exception:
+        pass    # Broken ROMs still get whatever they drew before failing
+    return pack_display(emu.display)
+
+
+def calibrate_instructions_per_frame(data, platform="chip-8", frames=CALIBRATION_FRAMES):
+    # Games pace themselves with delay timer loops (Fx07 then a skip and a jump back). The
+    # calibrated speed is the lowest one at which the game spends WAIT_SHARE of its instructions
+    # in such loops, i.e. it finishes each frame's work with time to spare. Games that never wait
+    # keep their platform default. Either way the result is capped at what this host can run
+    # in HOST_SHARE of a 60 Hz frame.
+    chosen = PLATFORM_SPEEDS[platform]
+    host_rate = None
+    for instructions_per_frame in CALIBRATION_SPEEDS:
+        emu = Emulator(verbose=False)
+        emu.load_rom_bytes(data)
+        emu.reset()
+        emu.seed(0)
+        heatmap = emu.enable_heatmap()
+        start = time.perf_counter()
+        try:
+            for _ in range(frames):
+                emu.step_frame(instructions_per_frame)
+        except Exception:
+            pass    # a crash at this speed just ends the sample early
+        elapsed = time.perf_counter() - start
+        executed = heatmap.total("executions")
+        if executed and elapsed > 0:
+            host_rate = executed / elapsed
+        if not executed:
+            continue
+        memory = emu.memory
+        waits = sum(
+            count for address, count in enumerate(heatmap.executions)
+            if count and address + 1 < len(memory)
+            and memory[address] & 0xF0 == 0xF0 and memory[address + 1] == 0x07
+        )
+        if 3 * waits / executed >= WAIT_SHARE:
+            chosen = instructions_per_frame
+            break
+    if host_rate:
+        chosen = min(chosen, max(1, int(host_rate * HOST_SHARE / 60)))
+    return chosen
+
+
+def read_rom(path):
+    # ROMs are at most a few KiB, a plain read is the cheapest way to get them
+    with open(path, "rb") as romfile:
+        return romfile.read()
+
+
+class RomEntry:
+
+    def __init__(self, name, size, mtime_ns, sha1, platform, histogram, instructions_per_frame, thumbnail):
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sha1 = sha1
+        self.platform = platform
+        self.histogram = histogram
+        self.instructions_per_frame = instructions_per_frame
+        self.thumbnail = thumbnail  # packed framebuffer, see emulator.framebuffer
+
+        # Lower-cased text the library search matches against
+        self.search_key = f"{name} {platform} {sha1}".lower()
+
+    def thumbnail_display(self):
+        return unpack_display(self.thumbnail)
+
+    def to_dict(self):
+        return {
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "sha1": self.sha1,
+            "platform": self.platform,
+            "histogram": self.histogram,
+            "instructions_per_frame": self.instructions_per_frame,
+            "thumbnail": self.thumbnail.hex(),
+        }
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(
+            name,
+            data["size"],
+            data["mtime_ns"],
+            data["sha1"],
+            data["platform"],
+            data["histogram"],
+            data["instructions_per_frame"],
+            bytes.fromhex(data["thumbnail"]),
+        )
+
+
+class RomLibrary:
+
+    def __init__(self, directory="roms"):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self.entries = {}       # relative name -> RomEntry
+        self._rom_cache = {}    # sha1 -> ROM bytes
+        self._dirty = False
+        self.load_index()
+
+    def load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)
+            if index.get("version") != INDEX_VERSION:
+                print("[WARN] ROM index version mismatch, rebuilding")
+                return
+            self.entries = {
+                name: RomEntry.from_dict(name, data)
+                for name, data in index["entries"].items()
+            }
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            print(f"[WARN] Ignoring corrupt ROM index: {e}")
+
+    def save_index(self):
+        index = {
+            "version": INDEX_VERSION,
+            "entries": {name: entry.to_dict() for name, entry in self.entries.items()},
+        }
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def scan(self):
+        # Yields (relative name, full path, stat) for every ROM file under the library directory
+        for root, dirs, files in os.walk(self.directory):
+            dirs.sort()
+            for filename in sorted(files):
+                if not filename.lower().endswith(ROM_EXTENSIONS):
+                    continue
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                yield name, path, os.stat(path)
+
+    def refresh(self, on_entry=None):
+        # Incremental refresh: only files whose size or mtime changed are re-read and re-analysed.
+        # on_entry(entry) is called for each of those as soon as it is indexed.
+        if not os.path.isdir(self.directory):
+            return self.entries
+
+        by_sha1 = {entry.sha1: entry for entry in self.entries.values()}
+        seen = set()
+        for name, path, stat in self.scan():
+            seen.add(name)
+            entry = self.entries.get(name)
+            if entry and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                continue
+
+            data = read_rom(path)
+            if not data:
+                continue
+            sha1 = hashlib.sha1(data).hexdigest()
+            self._rom_cache[sha1] = data
+
+            known = by_sha1.get(sha1)
+            if known:
+                # Renamed or touched file with identical content, reuse the analysis
+                entry = RomEntry(name, stat.st_size, stat.st_mtime_ns, sha1, known.platform,
+                                 known.histogram, known.instructions_per_frame, known.thumbnail)
+            else:
+                platform = detect_platform(data, name)
+                entry = RomEntry(name, stat.st_size, stat.st_mtime_ns, sha1, platform,
+                                 opcode_histogram(data), PLATFORM_SPEEDS[platform],
+                                 render_thumbnail(data))
+                print(f"[INFO] Indexed ROM {name} ({platform}, {stat.st_size} bytes)")
+            self.entries[name] = entry
+            by_sha1[sha1] = entry
+            self._dirty = True
+            if on_entry is not None:
+                on_entry(entry)
+
+        for name in list(self.entries):
+            if name not in seen:
+                del self.entries[name]
+                self._dirty = True
+
+        if self._dirty:
+            self.save_index()
+        return self.entries
+
+    def search(self, query=""):
+        query = query.lower().strip()
+        return [
+            entry for name, entry in sorted(self.entries.items())
+            if query in entry.search_key
+        ]
+
+    def find_by_sha1(self, sha1):
+        for entry in self.entries.values():
+            if entry.sha1 == sha1:
+                return entry
+        return None
+
+    def path_of(self, entry):
+        return os.path.join(self.directory, *entry.name.split("/"))
+
+    def read_bytes(self, entry):
+        data = self._rom_cache.get(entry.sha1)
+        if data is None:
+            data = read_rom(self.path_of(entry))
+            if hashlib.sha1(data).hexdigest() != entry.sha1:
+                raise ValueError(f"{entry.name} changed on disk, refresh the library")
+            self._rom_cache[entry.sha1] = data
+        return data
+
+    def set_instructions_per_frame(self, entry, instructions_per_frame):
+        entry.instructions_per_frame = instructions_per_frame
+        self.save_index()
+
+    def calibrate(self, entry):
+        instructions_per_frame = calibrate_instructions_per_frame(self.read_bytes(entry), entry.platform)
+        self.set_instructions_per_frame(entry, instructions_per_frame)
+        return instructions_per_frame
+
+    def load_into(self, emu, entry):
+        # Power-on state for the new ROM: no tail of a longer previous ROM, registers or timers
+        emu.load_rom_bytes(self.read_bytes(entry), self.path_of(entry))
+        emu.copytomem()
+        emu.load_fontset()
+        emu.reset(keep_rom=True)
+        emu.instructions_per_frame = entry.instructions_per_frame
+        emu.instruction_hz = emu.clock_hz / entry.instructions_per_frame
@@ -0,0 +1,159 @@
+import argparse
+import threading
+import time
+from collections import deque
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import pack_display
+
+LATENCY_SAMPLES = 64
+LATENCY_TIMEOUT = 30    # frames after which a key press with no visible effect stops being timed
+
+
+class RunAhead:
+    # Hides a game's built-in input lag. After every real frame the core runs `frames` more frames
+    # with the current keys, keeps that framebuffer for display, then rolls back to the real state
+    # with save_state()/load_state(). Games that show a key press N frames after reading it then
+    # show it on the very next host frame.
+    #
+    # Latency is measured end to end: from a key press to the first presented frame that differs
+    # from the one on screen when the key went down, in frames and wall-clock milliseconds.
+    # Releases are not timed, most games do not draw anything for them.
+
+    def __init__(self, emu, frames=1):
+        self.emu = emu
+        self.frames = frames
+        self.presented = pack_display(emu.display)
+        self.presented_generation = 0   # bumped whenever the presented frame changes
+        self.frame_count = 0
+        self.pending_input = None       # (frame, perf_counter) of a key press not yet visible
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.running = False
+        self.thread = None
+
+    def set_key(self, key, pressed):
+        with self.emu.lock:
+            if pressed and self.pending_input is None and 0 <= key <= 15 and not self.emu.keypad[key]:
+                self.pending_input = (self.frame_count, time.perf_counter())
+            self.emu.set_key(key, pressed)
+
+    def step_frame(self, instructions=None):
+        emu = self.emu
+        with emu.lock:
+            emu.step_frame(instructions)
+            if self.frames > 0:
+                state = emu.save_state()
+                # Speculative frames are not real ticks or real executions
+                metrics, audio, heatmap = emu.metrics, emu.audio, emu.heatmap
+                emu.metrics = emu.audio = emu.heatmap = None
+                try:
+                    for _ in range(self.frames):
+                        emu.step_frame(instructions)
+                    presented = pack_display(emu.display)
+                finally:
+                    emu.load_state(state)
+                    emu.metrics, emu.audio, emu.heatmap = metrics, audio, heatmap
+            else:
+                presented = pack_display(emu.display)
+            self.frame_count += 1
+
+            pending = self.pending_input
+            if pending is not None and self.frame_count - pending[0] > LATENCY_TIMEOUT:
+                self.pending_input = None
+            if presented != self.presented:
+                self.presented = presented
+                self.presented_generation += 1
+                if self.pending_input is not None:
+                    frame, pressed_at = self.pending_input
+                    self.latencies.append((self.frame_count - frame, (time.perf_counter() - pressed_at) * 1000))
+                    self.pending_input = None
+        return presented
+
+    def latency(self):
+        # (average frames, average ms, samples) over the last LATENCY_SAMPLES key changes
+        if not self.latencies:
+            return None
+        frames = sum(sample[0] for sample in self.latencies) / len(self.latencies)
+        ms = sum(sample[1] for sample in self.latencies) / len(self.latencies)
+        return frames, ms, len(self.latencies)
+
+    def run(self, max_cycles=None):
+        # Frame-paced loop for the GUI, replaces the emulator's instruction-level threads
+        emu = self.emu
+        next_frame = time.perf_counter()
+        while self.running and emu.running:
+            self.step_frame()
+            if max_cycles and emu.cycle_count > max_cycles:
+                emu.running = False
+            next_frame += emu.clock_hz
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()
+        self.running = False
+
+    def start(self, max_cycles=None):
+        self.stop()     # never two run-ahead threads stepping the same core
+        self.emu.running = True
+        self.running = True
+        if self.emu.metrics is not None:
+            self.emu.metrics.resume()
+        self.thread = threading.Thread(target=self.run, args=(max_cycles,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.thread = None
+
+
+def measure(rom, frames_ahead, presses, key, instructions_per_frame=None, seed=1):
+    # Headless latency check: taps `key` every few frames and averages the frames until it shows
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    emu.seed(seed)
+    if instructions_per_frame:
+        emu.instructions_per_frame = instructions_per_frame
+    runahead = RunAhead(emu, frames_ahead)
+    for _ in range(30):
+        runahead.step_frame()
+
+    warmup_frames = runahead.frame_count
+    start = time.perf_counter()
+    for press in range(presses):
+        runahead.set_key(key, 1)
+        for _ in range(4):
+            runahead.step_frame()
+        runahead.set_key(key, 0)
+        for _ in range(4 + press % 3):
+            runahead.step_frame()
+    elapsed = time.perf_counter() - start
+    return runahead, elapsed / (runahead.frame_count - warmup_frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure input-to-display latency with run-ahead")
+    parser.add_argument('rom', type=str, help='Path to the CHIP-8 ROM file')
+    parser.add_argument('--key', '-k', type=lambda value: int(value, 16), default=5, help='Key to tap (hex)')
+    parser.add_argument('--presses', '-n', type=int, default=50)
+    parser.add_argument('--max-ahead', type=int, default=3)
+    parser.add_argument('--ipf', type=int, default=None, help='Instructions per frame')
+    args = parser.parse_args()
+
+    with open(args.rom, 'rb') as romfile:
+        rom = romfile.read()
+
+    print(f"{'run-ahead':>9}{'latency frames':>16}{'samples':>9}{'host ms/frame':>15}")
+    for frames_ahead in range(args.max_ahead + 1):
+        runahead, frame_time = measure(rom, frames_ahead, args.presses, args.key, args.ipf)
+        latency = runahead.latency()
+        shown = f"{latency[0]:>16.2f}{latency[2]:>9}" if latency else f"{'-':>16}{0:>9}"
+        print(f"{frames_ahead:>9}{shown}{frame_time * 1000:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import math
+import time
+
+from emulator.emulator import Emulator
+
+FRAME_RATE = 60
+MAX_BACKLOG_FRAMES = 15      # frames per session the wall may owe before the debt is dropped
+MAX_THUMBNAIL_INTERVAL = 12  # at most every 12th tick repaints, i.e. thumbnails at 5 fps
+SMOOTHING = 0.1              # weight of the newest sample in the cost averages
+HEADROOM = 0.85              # share of the frame budget the wall aims to use
+RELAX = 0.6                  # load below which the thumbnail rate is raised again
+RELAX_TICKS = 30             # ticks the wall has to stay below RELAX before each step back up
+
+
+class WallSession:
+    # One emulator on the wall and how much it got to run
+
+    def __init__(self, emu, name=""):
+        self.emu = emu
+        self.name = name
+        self.frames = 0
+        self.cpu_time = 0.0
+        self.error = None
+
+
+class WallScheduler:
+    # Steps many emulators from one thread. Every tick owes each session a number of 60 Hz frames;
+    # frames are handed out one session at a time in round-robin order starting where the last
+    # tick stopped, so when the budget runs out mid-round nobody is starved.
+    #
+    # Under load the thumbnail refresh is degraded first (repaint every Nth tick, up to
+    # MAX_THUMBNAIL_INTERVAL); only when emulation alone exceeds the frame budget does the
+    # owed-frame debt get dropped, which slows every session down by the same amount.
+
+    def __init__(self, fps=FRAME_RATE, clock=time.perf_counter):
+        self.fps = fps
+        self.frame_period = 1 / fps
+        self.clock = clock
+        self.sessions = []
+        self.cursor = 0
+        self.owed = 0.0                 # session-frames still to run, carried between ticks
+        self.last_tick = None
+
+        self.thumbnail_interval = 1     # ticks per repaint
+        self.ticks_since_paint = 0
+        self.calm_ticks = 0
+        self.emulation_cost = 0.0       # smoothed seconds of emulation per tick
+        self.paint_cost = 0.0           # smoothed seconds per repaint, reported by the view
+        self.ticks = 0
+        self.frames_run = 0
+        self.frames_dropped = 0
+
+    def add(self, emu, name=""):
+        session = WallSession(emu, name)
+        self.sessions.append(session)
+        return session
+
+    def add_rom(self, data, name=""):
+        emu = Emulator(verbose=False)
+        emu.load_rom_bytes(data, name)
+        emu.copytomem()
+        emu.load_fontset()
+        return self.add(emu, name)
+
+    def remove(self, session):
+        index = self.sessions.index(session)
+        del self.sessions[index]
+        if index < self.cursor:
+            self.cursor -= 1
+        if self.cursor >= len(self.sessions):
+            self.cursor = 0
+
+    def _run_one(self, session):
+        start = self.clock()
+        try:
+            session.emu.step_frame()
+        except Exception as e:
+            # A crashed ROM stays on the wall with its last frame, it just stops getting slices
+            session.error = f"{type(e).__name__}: {e}"
+        session.cpu_time += self.clock() - start
+        session.frames += 1
+
+    def tick(self):
+        # Runs the frames owed since the last tick; returns True when the thumbnails should repaint
+        now = self.clock()
+        if self.last_tick is None:
+            self.last_tick = now - self.frame_period
+        elapsed_frames = (now - self.last_tick) * self.fps
+        self.last_tick = now
+        self.ticks += 1
+
+        active = [session for session in self.sessions if session.error is None]
+        if not active:
+            self.owed = 0.0
+            return self._paint_due(False)
+
+        self.owed += elapsed_frames * len(active)
+        limit = MAX_BACKLOG_FRAMES * len(active)
+        if self.owed > limit:
+            self.frames_dropped += int(self.owed - limit)
+            self.owed = limit
+
+        # Leave room for the paint this tick is expected to pay for
+        repaint_share = self.paint_cost / self.thumbnail_interval
+        deadline = now + max(self.frame_period * HEADROOM - repaint_share, self.frame_period * 0.25)
+
+        start = now
+        sessions = self.sessions
+        skipped = 0     # errored sessions passed in a row; a full round of them means none is left
+        while self.owed >= 1:
+            if self.cursor >= len(sessions):
+                self.cursor = 0
+            session = sessions[self.cursor]
+            self.cursor += 1
+            if session.error is not None:
+                skipped += 1
+                if skipped >= len(sessions):
+                    self.owed = 0.0
+                    break
+                if self.clock() >= deadline:
+                    break
+                continue
+            skipped = 0
+            self._run_one(session)
+            self.owed -= 1
+            self.frames_run += 1
+            if self.clock() >= deadline:
+                break
+        spent = self.clock() - start
+        behind = self.owed >= len(active)
+        if behind and self.thumbnail_interval >= MAX_THUMBNAIL_INTERVAL:
+            # Behind even with thumbnails fully degraded: drop the debt, emulation slows down
+            dropped = int(self.owed) - len(active) + 1
+            self.frames_dropped += dropped
+            self.owed -= dropped
+
+        self.emulation_cost += SMOOTHING * (spent - self.emulation_cost)
+        return self._paint_due(behind)
+
+    def _paint_due(self, behind):
+        # Thumbnails degrade one step per tick while emulation falls behind, and recover one step
+        # per RELAX_TICKS calm ticks so the rate does not oscillate
+        load = self.load()
+        if behind or load > HEADROOM:
+            self.calm_ticks = 0
+            if self.thumbnail_interval < MAX_THUMBNAIL_INTERVAL:
+                self.thumbnail_interval += 1
+        elif load < RELAX and self.thumbnail_interval > 1:
+            self.calm_ticks += 1
+            if self.calm_ticks >= RELAX_TICKS:
+                self.calm_ticks = 0
+                self.thumbnail_interval -= 1
+
+        self.ticks_since_paint += 1
+        if self.ticks_since_paint >= self.thumbnail_interval:
+            self.ticks_since_paint = 0
+            return True
+        return False
+
+    def report_paint(self, seconds):
+        self.paint_cost += SMOOTHING * (seconds - self.paint_cost)
+
+    def load(self):
+        return (self.emulation_cost + self.paint_cost / self.thumbnail_interval) / self.frame_period
+
+    def thumbnail_fps(self):
+        return self.fps / self.thumbnail_interval
+
+    def emulation_speed(self):
+        # Share of real time the sessions run at, 1.0 = full speed
+        total = self.frames_run + self.frames_dropped
+        return self.frames_run / total if total else 1.0
+
+    def fairness(self):
+        # Smallest over largest frame count among live sessions, 1.0 = perfectly even
+        frames = [session.frames for session in self.sessions if session.error is None]
+        if not frames or not max(frames):
+            return 1.0
+        return min(frames) / max(frames)
+
+    def grid(self):
+        # (columns, rows) of a near-square grid of thumbnails
+        count = max(1, len(self.sessions))
+        columns = max(1, math.ceil(math.sqrt(count)))
+        return columns, math.ceil(count / columns)
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import struct
+import threading
+import time
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import PACKED_SIZE, pack_display, unpack_display
+
+# Wire format: every message is HEADER followed by `length` payload bytes.
+#   KEYFRAME payload: the 256 byte packed framebuffer (see emulator.framebuffer)
+#   DELTA payload:    runs of (skip u8, count u8, count bytes) XORed into the previous frame
+HEADER = struct.Struct("<BIH")   # message type, frame number, payload length
+KEYFRAME = 1
+DELTA = 2
+
+DEFAULT_PORT = 8765
+MAX_CLIENT_BUFFER = 16 * 1024   # bytes queued for one client before it is skipped
+
+
+def encode_delta(previous, current):
+    # Run-length encodes the XOR of two packed frames, skipping unchanged bytes
+    out = bytearray()
+    position = 0
+    while position < PACKED_SIZE:
+        skip = 0
+        while position < PACKED_SIZE and previous[position] == current[position] and skip < 255:
+            skip += 1
+            position += 1
+        start = position
+        while (position < PACKED_SIZE and previous[position] != current[position]
+               and position - start < 255):
+            position += 1
+        if position == start and position == PACKED_SIZE:
+            break
+        out.append(skip)
+        out.append(position - start)
+        out.extend(previous[i] ^ current[i] for i in range(start, position))
+    return bytes(out)
+
+
+def apply_delta(frame, payload):
+    # XORs a DELTA payload into a packed frame bytearray in place
+    position = 0
+    offset = 0
+    while offset < len(payload):
+        position += payload[offset]
+        count = payload[offset + 1]
+        offset += 2
+        for i in range(count):
+            frame[position + i] ^= payload[offset + i]
+        position += count
+        offset += count
+
+
+class _ClientProtocol(asyncio.Protocol):
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.transport = None
+        self.needs_keyframe = True
+        self.skipped = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.broadcaster.clients.add(self)
+        self.broadcaster.send_keyframe(self)
+
+    def connection_lost(self, exc):
+        self.broadcaster.clients.discard(self)
+
+    def data_received(self, data):
+        pass    # spectators are read-only
+
+
+class FrameBroadcaster:
+    # Streams framebuffer updates to any number of TCP spectators. Runs its own event loop in a
+    # daemon thread; publish() only hands the packed frame over, so clients never stall the core.
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, max_client_buffer=MAX_CLIENT_BUFFER):
+        self.host = host
+        self.port = port
+        self.max_client_buffer = max_client_buffer
+        self.clients = set()
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+        self.frame_number = 0
+        self.current = bytes(PACKED_SIZE)
+
+        # Stats
+        self.frames_published = 0
+        self.frames_unchanged = 0
+        self.bytes_sent = 0
+        self.keyframes_sent = 0
+        self.deltas_sent = 0
+        self.fanout_cpu = 0.0
+
+    def start(self):
+        ready = threading.Event()
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(
+                self.loop.create_server(lambda: _ClientProtocol(self), self.host, self.port, backlog=1024)
+            )
+            self.port = self.server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        ready.wait()
+        print(f"[INFO] Frame stream listening on {self.host}:{self.port}")
+
+    def stop(self):
+        if self.loop is None:
+            return
+
+        def shutdown():
+            self.server.close()
+            for client in list(self.clients):
+                client.transport.close()
+            self.loop.stop()
+
+        self.loop.call_soon_threadsafe(shutdown)
+        self.thread.join(timeout=2)
+
+    def publish(self, display):
+        # Called at a frame boundary from the emulation thread
+        packed = pack_display(display)
+        self.publish_packed(packed)
+
+    def publish_packed(self, packed):
+        if packed == self.current:
+            self.frames_unchanged += 1
+            return
+        loop = self.loop
+        if loop is None:
+            # Not serving yet: keep the latest frame, it becomes the first client's keyframe
+            self.current = packed
+            return
+        loop.call_soon_threadsafe(self._broadcast, packed)
+
+    def _message(self, kind, payload):
+        return HEADER.pack(kind, self.frame_number, len(payload)) + payload
+
+    def send_keyframe(self, client):
+        message = self._message(KEYFRAME, self.current)
+        client.transport.write(message)
+        client.needs_keyframe = False
+        self.keyframes_sent += 1
+        self.bytes_sent += len(message)
+
+    def _broadcast(self, packed):
+        if packed == self.current:
+            self.frames_unchanged += 1
+            return
+        start = time.thread_time()
+        previous = self.current
+        self.current = packed
+        self.frame_number += 1
+        self.frames_published += 1
+
+        payload = encode_delta(previous, packed)
+        delta = self._message(DELTA, payload) if len(payload) < PACKED_SIZE else None
+
+        for client in self.clients:
+            if client.transport.get_write_buffer_size() > self.max_client_buffer:
+                # Slow reader: drop its deltas and resync with a keyframe once it drains
+                client.needs_keyframe = True
+                client.skipped += 1
+            elif client.needs_keyframe or delta is None:
+                self.send_keyframe(client)
+            else:
+                client.transport.write(delta)
+                self.deltas_sent += 1
+                self.bytes_sent += len(delta)
+        self.fanout_cpu += time.thread_time() - start
+
+    def watch(self, emu, fps=60):
+        # Samples a threaded Emulator's framebuffer from the stream thread at a fixed rate
+        async def poll():
+            generation = None
+            while True:
+                if emu.display_generation != generation:
+                    generation = emu.display_generation
+                    self._broadcast(pack_display(emu.display))
+                await asyncio.sleep(1 / fps)
+
+        return asyncio.run_coroutine_threadsafe(poll(), self.loop)
+
+
+class FrameClient:
+    # Reference headless spectator: keeps a local copy of the streamed framebuffer
+
+    def __init__(self):
+        self.frame = bytearray(PACKED_SIZE)
+        self.frame_number = 0
+        self.frames_received = 0
+        self.keyframes_received = 0
+        self.bytes_received = 0
+
+    async def run(self, host="127.0.0.1", port=DEFAULT_PORT, on_frame=None, limit=None):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while limit is None or self.frames_received < limit:
+                header = await reader.readexactly(HEADER.size)
+                kind, frame_number, length = HEADER.unpack(header)
+                payload = await reader.readexactly(length)
+                if kind == KEYFRAME:
+                    self.frame[:] = payload
+                    self.keyframes_received += 1
+                else:
+                    apply_delta(self.frame, payload)
+                self.frame_number = frame_number
+                self.frames_received += 1
+                self.bytes_received += HEADER.size + length
+                if on_frame:
+                    on_frame(self)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    def display(self):
+        return unpack_display(self.frame)
+
+
+def serve_rom(path, host, port, fps):
+    emu = Emulator(verbose=False)
+    emu.loadrom(path)
+    emu.readrom()
+    emu.copytomem()
+    emu.load_fontset()
+
+    broadcaster = FrameBroadcaster(host, port)
+    broadcaster.start()
+    next_frame = time.perf_counter()
+    try:
+        while True:
+            emu.step_frame()
+            broadcaster.publish(emu.display)
+            next_frame += 1 / fps
+            time.sleep(max(0, next_frame - time.perf_counter()))
+    except KeyboardInterrupt:
+        broadcaster.stop()
+
+
+def watch_stream(host, port):
+    def show(client):
+        rows = client.display()
+        lines = [''.join('█' if pixel else ' ' for pixel in row) for row in rows]
+        print("\x1b[H" + "\n".join(lines), flush=True)
+
+    print("\x1b[2J", end="")
+    asyncio.run(FrameClient().run(host, port, on_frame=show))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CHIP-8 spectator frame stream")
+    parser.add_argument('mode', choices=('serve', 'watch'))
+    parser.add_argument('--rom', '-r', type=str, help='ROM to run when serving')
+    parser.add_argument('--host', type=str, default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--fps', type=int, default=60)
+    args = parser.parse_args()
+
+    if args.mode == 'serve':
+        serve_rom(args.rom, args.host, args.port, args.fps)
+    else:
+        watch_stream(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
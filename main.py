@@ -20,10 +20,92 @@ def parse_arguments():
         help='Number of CPU instructions to execute (default: infinite)'
     )
     
+    parser.add_argument(
+        '--process', '-p',
+        action='store_true',
+        help='Run the emulator core in a separate process with a shared-memory framebuffer'
+    )
+    
+    parser.add_argument(
+        '--terminal', '-t',
+        action='store_true',
+        help='Play in the terminal (ANSI half-block renderer, no PyQt6 needed)'
+    )
+    
+    parser.add_argument(
+        '--netplay',
+        type=str,
+        default=None,
+        metavar='HOST:PORT',
+        help='Play a two-player ROM against a peer over UDP rollback netplay (terminal frontend)'
+    )
+    
+    parser.add_argument(
+        '--netplay-port',
+        type=int,
+        default=7000,
+        metavar='PORT',
+        help='Local UDP port for --netplay'
+    )
+    
+    parser.add_argument(
+        '--wav',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Record the beeper to a WAV file (terminal frontend)'
+    )
+    
+    parser.add_argument(
+        '--run-ahead',
+        type=int,
+        default=0,
+        metavar='FRAMES',
+        help='Emulate FRAMES frames ahead each frame and show that result to hide input lag'
+    )
+    
+    parser.add_argument(
+        '--fixed-pacing',
+        action='store_true',
+        help='Pace per instruction and never skip frames instead of adapting to a slow host'
+    )
+    
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=None,
+        metavar='PORT',
+        help='Serve runtime metrics as Prometheus text on http://127.0.0.1:PORT/metrics'
+    )
+    
+    parser.add_argument(
+        '--metrics-log',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help="Append the runtime metrics as JSON lines to PATH ('-' for stdout) every 10 s"
+    )
+    
+    parser.add_argument(
+        '--wall', '-w',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Show every ROM in DIR as live thumbnails on one ROM wall'
+    )
+    
+    parser.add_argument(
+        '--wall-size',
+        type=int,
+        default=None,
+        help='Number of wall instances, ROMs repeat to fill it (default: one per ROM)'
+    )
+    
     return parser.parse_args()
 
 
-def run_development_gui(rom_path, max_cycles):
+def run_development_gui(rom_path, max_cycles, out_of_process=False, run_ahead=0,
+                        metrics_port=None, metrics_log=None, adaptive_pacing=True):
     try:
         from PyQt6.QtWidgets import QApplication
         from runtime.dev_mode import DevModeGUI
@@ -31,7 +113,11 @@ def run_development_gui(rom_path, max_cycles):
         print("Launching CHIP-8 Development GUI...")
         
         app = QApplication(sys.argv)
-        window = DevModeGUI()
+        if out_of_process:
+            from emulator.process_core import ProcessEmulator
+            window = DevModeGUI(emulator_factory=ProcessEmulator, run_ahead=run_ahead)
+        else:
+            window = DevModeGUI(run_ahead=run_ahead, adaptive_pacing=adaptive_pacing)
         
         # Load ROM if specified
         if rom_path:
@@ -48,6 +134,16 @@ def run_development_gui(rom_path, max_cycles):
                 print(f"Error loading ROM: {e}")
                 window.rom_path_label.setText(f"Error: {str(e)}")
         
+        if metrics_port or metrics_log:
+            if hasattr(window.emu, "enable_metrics"):
+                registry = window.emu.enable_metrics().registry
+                if metrics_port:
+                    registry.serve(metrics_port)
+                if metrics_log:
+                    registry.log_json(metrics_log)
+            else:
+                print("Metrics need the in-process core, ignoring them")
+        
         # Set max cycles if specified
         if max_cycles:
             window.max_cycles = max_cycles
@@ -63,17 +159,71 @@ def run_development_gui(rom_path, max_cycles):
         return 1
 
 
+def run_rom_wall(directory, size=None):
+    try:
+        from PyQt6.QtWidgets import QApplication
+        from emulator.emulator import Emulator
+        from emulator.romlibrary import RomLibrary
+        from runtime.rom_wall import RomWall
+    except ImportError as e:
+        print("ImportError"+ str(e)+"\n\nTry running 'uv sync'")
+        return 1
+
+    library = RomLibrary(directory)
+    library.refresh()
+    entries = library.search()
+    if not entries:
+        print(f"No ROMs found in {directory}")
+        return 1
+
+    app = QApplication(sys.argv)
+    wall = RomWall()
+    for index in range(size or len(entries)):
+        entry = entries[index % len(entries)]
+        emu = Emulator(verbose=False)
+        library.load_into(emu, entry)
+        wall.scheduler.add(emu, entry.name)
+    wall.resize_to_grid()
+    print(f"ROM wall: {len(wall.scheduler.sessions)} instances from {len(entries)} ROMs")
+
+    wall.show()
+    wall.start()
+    return app.exec()
+
+
 def main():
     print("CHIP-8 Emulator v1.0")
     print("=" * 30)
     
     args = parse_arguments()
     
+    if args.wall:
+        return run_rom_wall(args.wall, args.wall_size)
+    
+    if args.wav and not (args.terminal or args.netplay):
+        print("--wav records from the terminal frontend, add --terminal")
+        return 1
+    
+    if args.terminal or args.netplay:
+        if not args.rom:
+            print("--terminal and --netplay need a ROM (--rom)")
+            return 1
+        from runtime.terminal import run_terminal
+        netplay = None
+        if args.netplay:
+            from emulator.netplay import UdpTransport, parse_address
+            netplay = UdpTransport(("0.0.0.0", args.netplay_port), parse_address(args.netplay, "127.0.0.1"))
+        return run_terminal(args.rom, max_cycles=args.cycles, netplay=netplay, wav=args.wav)
+    
     print(f"ROM: {args.rom or 'None'}")
     print(f"Max cycles: {args.cycles or 'Infinite'}")
+    print(f"Core: {'separate process' if args.process else 'in-process threads'}")
+    print(f"Run-ahead: {args.run_ahead or 'Off'}")
+    print(f"Pacing: {'fixed' if args.fixed_pacing or args.process else 'adaptive'}")
     print()
     
-    return run_development_gui(args.rom, args.cycles)
+    return run_development_gui(args.rom, args.cycles, args.process, args.run_ahead,
+                               args.metrics_port, args.metrics_log, not args.fixed_pacing)
 
 
 if __name__ == "__main__":
@@ -1,27 +1,97 @@
+import math
 import os
 import sys
+import threading
 import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from emulator.emulator import Emulator
+from emulator.framebuffer import pack_display
+from emulator.pacing import FramePacer
+from emulator.romlibrary import RomLibrary
+from emulator.runahead import RunAhead
+from runtime.keymap import KEY_MAP, KEYPAD_ROWS
 
 import sys
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout,
-    QHBoxLayout, QGridLayout, QDialog, QTableWidget,
-    QTableWidgetItem, QFileDialog, QFrame, QGroupBox,
-    QScrollArea, QSizePolicy, QListWidget, QListWidgetItem
+    QHBoxLayout, QGridLayout, QDialog, QTableView,
+    QFileDialog, QGroupBox,
+    QListWidget, QListWidgetItem, QLineEdit, QComboBox
 )
-from PyQt6.QtGui import QFont, QPainter, QColor, QKeyEvent, QPalette, QLinearGradient
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect, pyqtSignal
+from PyQt6.QtGui import QFont, QPainter, QColor, QKeyEvent, QImage, QPixmap, QIcon
+from PyQt6.QtCore import Qt, QTimer, QRect, QRectF, QSize, QAbstractTableModel, QModelIndex, pyqtSignal
+
+class MemoryTableModel(QAbstractTableModel):
+    # Serves the 4096 rows on demand, so the view only ever formats the rows it is showing
+    HEADERS = ("Address", "Value (Hex)", "Count")
+
+    def __init__(self, memory, heat_color, parent=None):
+        super().__init__(parent)
+        self.memory = memory
+        self.heat_color = heat_color
+        self.shown = bytes(memory)
+        self.counters = None
+        self.scale = 1.0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.memory)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = index.row()
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return f"0x{row:03X}"
+            if column == 1:
+                return f"0x{self.memory[row]:02X}"
+            return str(self.counters[row]) if self.counters is not None else ""
+        if role == Qt.ItemDataRole.BackgroundRole and column and self.counters is not None and self.counters[row]:
+            return self.heat_color(math.log1p(self.counters[row]) / self.scale)
+        return None
+
+    def refresh(self, counters):
+        # Signals only the span of rows whose value changed; with an overlay the counts move
+        # everywhere, so then the whole value/count block is invalidated (still only visible
+        # rows get re-read)
+        current = bytes(self.memory)
+        if counters is not None or self.counters is not None:
+            self.counters = counters
+            self.scale = (math.log1p(max(counters)) or 1.0) if counters is not None else 1.0
+            first, last = 0, len(current) - 1
+        elif current != self.shown:
+            # Big-endian XOR: the highest set bit is the first changed byte, the lowest the last
+            diff = int.from_bytes(current, 'big') ^ int.from_bytes(self.shown, 'big')
+            first = len(current) - (diff.bit_length() + 7) // 8
+            last = len(current) - 1 - ((diff & -diff).bit_length() - 1) // 8
+        else:
+            return
+        self.shown = current
+        self.dataChanged.emit(self.index(first, 1), self.index(last, 2))
+
 
 class MemoryViewer(QDialog):
-    def __init__(self, memory, parent=None):
+    OVERLAYS = ["No overlay", "Executions", "Reads", "Writes"]
+    HEAT_COLORS = [QColor("#2c3e50"), QColor("#8e44ad"), QColor("#e74c3c"), QColor("#f1c40f")]
+
+    def __init__(self, memory, parent=None, emulator=None):
         super().__init__(parent)
         self.setWindowTitle("Memory Viewer")
         self.resize(600, 700)
         self.memory = memory
+        self.emulator = emulator
         
         # Modern styling
         self.setStyleSheet("""
@@ -30,7 +100,7 @@ class MemoryViewer(QDialog):
                     stop:0 #2c3e50, stop:1 #34495e);
                 color: #ecf0f1;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #34495e;
                 alternate-background-color: #2c3e50;
                 color: #ecf0f1;
@@ -47,37 +117,90 @@ class MemoryViewer(QDialog):
             }
         """)
         
-        self.table = QTableWidget(4096, 2)
-        self.table.setHorizontalHeaderLabels(["Address", "Value (Hex)"])
+        self.model = MemoryTableModel(memory, self.heat_color, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(True)
 
+        # Heatmap overlay controls, only for cores that support profiling counters
+        self.overlay_box = QComboBox()
+        self.overlay_box.addItems(self.OVERLAYS)
+        self.overlay_box.currentIndexChanged.connect(self.set_overlay)
+        self.export_json_btn = ModernButton("Export JSON", "#3498db")
+        self.export_csv_btn = ModernButton("Export CSV", "#3498db")
+        self.export_json_btn.clicked.connect(lambda: self.export_heatmap("json"))
+        self.export_csv_btn.clicked.connect(lambda: self.export_heatmap("csv"))
+        has_heatmap = emulator is not None and hasattr(emulator, "enable_heatmap")
+        for widget in (self.overlay_box, self.export_json_btn, self.export_csv_btn):
+            widget.setEnabled(has_heatmap)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.overlay_box)
+        controls.addWidget(self.export_json_btn)
+        controls.addWidget(self.export_csv_btn)
+
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
+        layout.addLayout(controls)
         layout.addWidget(self.table)
         self.setLayout(layout)
 
-        self.update_table()
-
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_table)
-        self.timer.start(500)
+
+    def set_overlay(self, index):
+        if index and self.emulator is not None:
+            self.emulator.enable_heatmap()
+        self.update_table()
+
+    def heat_color(self, level):
+        # level in [0, 1] mapped along HEAT_COLORS
+        position = level * (len(self.HEAT_COLORS) - 1)
+        low = min(int(position), len(self.HEAT_COLORS) - 2)
+        t = position - low
+        a = self.HEAT_COLORS[low]
+        b = self.HEAT_COLORS[low + 1]
+        return QColor(
+            round(a.red() + (b.red() - a.red()) * t),
+            round(a.green() + (b.green() - a.green()) * t),
+            round(a.blue() + (b.blue() - a.blue()) * t),
+        )
+
+    def export_heatmap(self, kind):
+        heatmap = self.emulator.enable_heatmap()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Heatmap", f"heatmap.{kind}", f"{kind.upper()} Files (*.{kind})"
+        )
+        if path and kind == "json":
+            heatmap.dump_json(path)
+        elif path:
+            heatmap.dump_csv(path)
 
     def update_table(self):
-        for i in range(4096):
-            addr_item = QTableWidgetItem(f"0x{i:03X}")
-            val_item = QTableWidgetItem(f"0x{self.memory[i]:02X}")
-            addr_item.setFlags(Qt.ItemFlag.ItemIsEnabled)
-            val_item.setFlags(Qt.ItemFlag.ItemIsEnabled)
-            self.table.setItem(i, 0, addr_item)
-            self.table.setItem(i, 1, val_item)
+        overlay = self.overlay_box.currentIndex()
+        counters = None
+        if overlay and self.emulator is not None and self.emulator.heatmap is not None:
+            counters = self.emulator.heatmap.counters(self.OVERLAYS[overlay].lower())
+        self.model.refresh(counters)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_table()
+        self.timer.start(500)
+
+    def hideEvent(self, event):
+        # Built once and reused, so a closed viewer must not keep polling
+        self.timer.stop()
+        super().hideEvent(event)
 
 class StackViewer(QDialog):
-    def __init__(self, stack, stack_pointer, parent=None):
+    # Built once and reused like MemoryViewer; reads the stack from the emulator on every refresh
+    def __init__(self, emulator, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Stack Viewer")
         self.resize(400, 500)
-        self.stack = stack
-        self.stack_pointer = stack_pointer
+        self.emulator = emulator
+        self.shown = None       # (stack, stack pointer) last drawn
         
         # Modern styling
         self.setStyleSheet("""
@@ -105,30 +228,181 @@ class StackViewer(QDialog):
 
         self.list_widget = QListWidget()
         
-        sp_label = QLabel(f"Stack Pointer: {self.stack_pointer}")
-        sp_label.setFont(QFont("Consolas", 12, QFont.Weight.Bold))
-        sp_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.sp_label = QLabel()
+        self.sp_label.setFont(QFont("Consolas", 12, QFont.Weight.Bold))
+        self.sp_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
-        layout.addWidget(sp_label)
+        layout.addWidget(self.sp_label)
         layout.addWidget(self.list_widget)
         self.setLayout(layout)
 
-        self.update_stack()
-
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_stack)
-        self.timer.start(500)
 
     def update_stack(self):
+        emulator = self.emulator
+        state = (list(emulator.stack), emulator.stack_pointer)
+        if state == self.shown:
+            return
+        self.shown = state
+        stack, stack_pointer = state
+        self.sp_label.setText(f"Stack Pointer: {stack_pointer}")
         self.list_widget.clear()
-        for i, addr in enumerate(self.stack):
+        for i, addr in enumerate(stack):
             item = QListWidgetItem(f"[{i}] 0x{addr:03X}")
-            if i == len(self.stack) - 1:  # Highlight current stack top
+            if i == len(stack) - 1:  # Highlight current stack top
                 item.setBackground(QColor("#e74c3c"))
             self.list_widget.addItem(item)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_stack()
+        self.timer.start(500)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+class RomLibraryDialog(QDialog):
+    romSelected = pyqtSignal(object)
+    entryIndexed = pyqtSignal(object)   # emitted from the refresh thread, delivered on the GUI thread
+    refreshFinished = pyqtSignal()
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("ROM Library")
+        self.resize(520, 640)
+        self.library = library
+        self.items = {}             # entry name -> list item
+        self.refreshing = False
+        self.entryIndexed.connect(self.show_entry)
+        self.refreshFinished.connect(self.finish_refresh)
+
+        self.setStyleSheet("""
+            QDialog {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #2c3e50, stop:1 #34495e);
+                color: #ecf0f1;
+            }
+            QLineEdit {
+                background-color: #34495e;
+                color: #ecf0f1;
+                border: 2px solid #3498db;
+                border-radius: 8px;
+                padding: 6px;
+            }
+            QListWidget {
+                background-color: #34495e;
+                color: #ecf0f1;
+                border: 2px solid #3498db;
+                border-radius: 8px;
+                font-family: 'Consolas';
+                font-size: 12px;
+            }
+            QListWidget::item {
+                padding: 4px;
+                border-bottom: 1px solid #7f8c8d;
+            }
+            QListWidget::item:selected {
+                background-color: #3498db;
+            }
+        """)
+
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search by name, platform or SHA-1...")
+        self.search_box.textChanged.connect(self.apply_filter)
+
+        self.list_widget = QListWidget()
+        self.list_widget.setIconSize(QSize(128, 64))
+        self.list_widget.itemDoubleClicked.connect(self.select_item)
+
+        self.load_btn = ModernButton("Load", "#2ecc71")
+        self.load_btn.clicked.connect(lambda: self.select_item(self.list_widget.currentItem()))
+        self.calibrate_btn = ModernButton("Calibrate Speed", "#f39c12")
+        self.calibrate_btn.clicked.connect(lambda: self.calibrate_item(self.list_widget.currentItem()))
+
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.calibrate_btn)
+        button_layout.addWidget(self.load_btn)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.addWidget(self.search_box)
+        layout.addWidget(self.list_widget)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.populate()
+
+    def populate(self):
+        # Shows the cached index at once, then hashes and renders new or changed ROMs on a worker
+        # thread; their rows appear as they are indexed so a large directory never blocks the GUI
+        if self.refreshing:
+            return
+        self.list_widget.clear()
+        self.items = {}
+        for entry in self.library.search():
+            self.show_entry(entry)
+        self.refreshing = True
+        self.calibrate_btn.setEnabled(False)    # calibration saves the index the worker is updating
+
+        def refresh():
+            try:
+                self.library.refresh(self.entryIndexed.emit)
+            finally:
+                self.refreshFinished.emit()
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def show_entry(self, entry):
+        item = self.items.get(entry.name)
+        if item is None:
+            item = QListWidgetItem()
+            self.items[entry.name] = item
+            self.list_widget.addItem(item)
+        item.setText(self.item_text(entry))
+        item.setIcon(QIcon(QPixmap.fromImage(self.thumbnail_image(entry.thumbnail))))
+        item.setData(Qt.ItemDataRole.UserRole, entry)
+        query = self.search_box.text().lower().strip()
+        item.setHidden(query not in entry.search_key)
+
+    def finish_refresh(self):
+        # Drops rows of ROMs deleted from disk and restores the library order
+        for name in [name for name in self.items if name not in self.library.entries]:
+            self.list_widget.takeItem(self.list_widget.row(self.items.pop(name)))
+        self.list_widget.sortItems()
+        self.refreshing = False
+        self.calibrate_btn.setEnabled(True)
+
+    def item_text(self, entry):
+        return f"{entry.name}\n{entry.size} bytes | {entry.platform} | {entry.instructions_per_frame} ipf"
+
+    def calibrate_item(self, item):
+        # Re-runs the ROM headless at increasing speeds, see calibrate_instructions_per_frame
+        if item is not None:
+            entry = item.data(Qt.ItemDataRole.UserRole)
+            self.library.calibrate(entry)
+            item.setText(self.item_text(entry))
+
+    def thumbnail_image(self, packed):
+        image = QImage(packed, 64, 32, 8, QImage.Format.Format_Mono).copy()
+        image.setColorTable([QColor("#001100").rgb(), QColor("#00ff41").rgb()])
+        return image.scaled(128, 64)
+
+    def apply_filter(self, text):
+        # Hides non-matching rows instead of rebuilding the list on every keystroke
+        query = text.lower().strip()
+        for row in range(self.list_widget.count()):
+            item = self.list_widget.item(row)
+            entry = item.data(Qt.ItemDataRole.UserRole)
+            item.setHidden(query not in entry.search_key)
+
+    def select_item(self, item):
+        if item is not None:
+            self.romSelected.emit(item.data(Qt.ItemDataRole.UserRole))
+            self.accept()
+
 class ModernButton(QPushButton):
     def __init__(self, text, color="#3498db", parent=None):
         super().__init__(text, parent)
@@ -248,12 +522,17 @@ class KeypadButton(QPushButton):
             self.keyReleased.emit(self.key_value)
 
 class RegisterLabel(QLabel):
+    BASE_COLOR = QColor("#34495e")
+    HIGHLIGHT_COLOR = QColor("#2ecc71")
+    HIGHLIGHT_MS = 1000
+
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
         self.setFont(QFont("Consolas", 11, QFont.Weight.Bold))
+        # Background is painted in paintEvent so highlights never touch the stylesheet
         self.setStyleSheet("""
             QLabel {
-                background-color: #34495e;
+                background-color: transparent;
                 color: #ecf0f1;
                 border: 1px solid #7f8c8d;
                 border-radius: 4px;
@@ -261,37 +540,44 @@ class RegisterLabel(QLabel):
                 margin: 1px;
             }
         """)
-        self.animation = QPropertyAnimation(self, b"styleSheet")
-        self.animation.setDuration(1000)
-        
+        self.highlight_level = 0.0
+
+    def set_value_text(self, text):
+        if text != self.text():
+            self.setText(text)
+
     def highlight_change(self):
-        # Green highlight animation for changed values
-        self.animation.setStartValue("""
-            QLabel {
-                background-color: #2ecc71;
-                color: white;
-                border: 1px solid #27ae60;
-                border-radius: 4px;
-                padding: 4px 8px;
-                margin: 1px;
-            }
-        """)
-        self.animation.setEndValue("""
-            QLabel {
-                background-color: #34495e;
-                color: #ecf0f1;
-                border: 1px solid #7f8c8d;
-                border-radius: 4px;
-                padding: 4px 8px;
-                margin: 1px;
-            }
-        """)
-        self.animation.start()
+        # Green highlight for changed values, faded out by fade_highlight
+        self.highlight_level = 1.0
+        self.update()
+
+    def fade_highlight(self, elapsed_ms):
+        self.highlight_level = max(0.0, self.highlight_level - elapsed_ms / self.HIGHLIGHT_MS)
+        self.update()
+        return self.highlight_level > 0.0
+
+    def paintEvent(self, event):
+        level = self.highlight_level
+        base = self.BASE_COLOR
+        highlight = self.HIGHLIGHT_COLOR
+        color = QColor(
+            round(base.red() + (highlight.red() - base.red()) * level),
+            round(base.green() + (highlight.green() - base.green()) * level),
+            round(base.blue() + (highlight.blue() - base.blue()) * level),
+        )
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(color)
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(1, 1, -1, -1), 4, 4)
+        painter.end()
+        super().paintEvent(event)
 
 class DisplayWidget(QWidget):
-    def __init__(self, emulator, scale=12, parent=None):
+    def __init__(self, emulator, scale=12, parent=None, source=None):
         super().__init__(parent)
         self.emulator = emulator
+        self.source = source    # run-ahead or pacer; when set, paints its presented frame instead of the live one
         self.scale = scale
         self.setFixedSize(64 * scale + 4, 32 * scale + 4)
         self.setStyleSheet("""
@@ -301,28 +587,33 @@ class DisplayWidget(QWidget):
                 border-radius: 8px;
             }
         """)
+        self.color_table = [QColor("#001100").rgb(), QColor("#00ff41").rgb()]  # Matrix green theme
 
     def paintEvent(self, event):
+        start = time.perf_counter()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
         # Draw border
         painter.fillRect(0, 0, self.width(), self.height(), QColor("#2c3e50"))
-        
-        for y in range(32):
-            for x in range(64):
-                pixel = self.emulator.display[y][x]
-                color = QColor("#00ff41") if pixel else QColor("#001100")  # Matrix green theme
-                painter.fillRect(
-                    x * self.scale + 2,
-                    y * self.scale + 2,
-                    self.scale,
-                    self.scale,
-                    color
-                )
+
+        # One packed 1-bit image scaled in a single draw instead of 2048 fillRect calls
+        packed = self.source.presented if self.source is not None else pack_display(self.emulator.display)
+        image = QImage(packed, 64, 32, 8, QImage.Format.Format_Mono)
+        image.setColorTable(self.color_table)
+        painter.drawImage(QRect(2, 2, 64 * self.scale, 32 * self.scale), image)
+        painter.end()
+
+        elapsed = time.perf_counter() - start
+        metrics = getattr(self.emulator, "metrics", None)
+        if metrics is not None:
+            metrics.repaint.observe(elapsed)
+        if isinstance(self.source, FramePacer):
+            self.source.report_render(elapsed)
 
 class DevModeGUI(QWidget):
-    def __init__(self):
+    MIN_REFRESH_MS = 16     # never refresh the panels faster than ~60 Hz
+
+    def __init__(self, emulator_factory=Emulator, run_ahead=0, adaptive_pacing=True):
         super().__init__()
         self.setWindowTitle("CHIP-8 Emulator - Development Mode")
         self.setGeometry(100, 100, 1400, 900)
@@ -350,16 +641,29 @@ class DevModeGUI(QWidget):
             }
         """)
 
-        self.emu = Emulator()
-        self.previous_registers = [0] * 16  # Track previous register values for highlighting
+        self.emu = emulator_factory()
+        self.runahead = None
+        if run_ahead:
+            if hasattr(self.emu, "save_state"):
+                self.runahead = RunAhead(self.emu, run_ahead)
+            else:
+                print("[WARN] Run-ahead needs the in-process core, ignoring it")
+        # Frame-paced driver that skips presented frames and panel refreshes before slowing down
+        self.pacer = None
+        if adaptive_pacing and hasattr(self.emu, "save_state"):
+            self.pacer = FramePacer(self.emu, self.runahead)
+        self.shown_latency = None
+        self.shown_pacing = None
+        self.shown_generation = None
+        self.rom_library = None        # scanned on first use of the library
+        self.library_dialog = None
+        self.memory_viewer = None
+        self.stack_viewer = None
+        self.previous_state = None     # Last snapshot shown, used to update only changed widgets
+        self.highlighted_labels = set()
         
-        # Keyboard mapping for CHIP-8
-        self.key_map = {
-            Qt.Key.Key_1: 0x1, Qt.Key.Key_2: 0x2, Qt.Key.Key_3: 0x3, Qt.Key.Key_4: 0xC,
-            Qt.Key.Key_Q: 0x4, Qt.Key.Key_W: 0x5, Qt.Key.Key_E: 0x6, Qt.Key.Key_R: 0xD,
-            Qt.Key.Key_A: 0x7, Qt.Key.Key_S: 0x8, Qt.Key.Key_D: 0x9, Qt.Key.Key_F: 0xE,
-            Qt.Key.Key_Z: 0xA, Qt.Key.Key_X: 0x0, Qt.Key.Key_C: 0xB, Qt.Key.Key_V: 0xF
-        }
+        # Keyboard mapping for CHIP-8, shared with the terminal frontend
+        self.key_map = {getattr(Qt.Key, f"Key_{char}"): value for char, value in KEY_MAP.items()}
         
         # Reverse mapping for visual keypad
         self.reverse_key_map = {v: k for k, v in self.key_map.items()}
@@ -386,11 +690,13 @@ class DevModeGUI(QWidget):
         button_layout.setSpacing(10)
         
         self.load_rom_btn = ModernButton("Load ROM", "#3498db")
+        self.library_btn = ModernButton("Library", "#9b59b6")
         self.start_btn = ModernButton("Start", "#2ecc71")
         self.stop_btn = ModernButton("Stop", "#e74c3c")
         self.reset_btn = ModernButton("Reset", "#f39c12")
         
         self.load_rom_btn.clicked.connect(self.load_rom)
+        self.library_btn.clicked.connect(self.open_rom_library)
         self.start_btn.clicked.connect(self.start_emulator)
         self.stop_btn.clicked.connect(self.stop_emulator)
         self.reset_btn.clicked.connect(self.reset_emulator)
@@ -398,6 +704,7 @@ class DevModeGUI(QWidget):
         self.stop_btn.setEnabled(False)
         
         button_layout.addWidget(self.load_rom_btn)
+        button_layout.addWidget(self.library_btn)
         button_layout.addWidget(self.start_btn)
         button_layout.addWidget(self.stop_btn)
         button_layout.addWidget(self.reset_btn)
@@ -405,7 +712,7 @@ class DevModeGUI(QWidget):
         # Display
         display_group = QGroupBox("Display (64x32)")
         display_layout = QVBoxLayout()
-        self.display_widget = DisplayWidget(self.emu, scale=12)
+        self.display_widget = DisplayWidget(self.emu, scale=12, source=self.pacer or self.runahead)
         display_layout.addWidget(self.display_widget, alignment=Qt.AlignmentFlag.AlignCenter)
         display_group.setLayout(display_layout)
 
@@ -415,24 +722,10 @@ class DevModeGUI(QWidget):
         keypad_layout.setSpacing(5)
         
         # CHIP-8 keypad layout
-        keypad_layout_map = [
-            ['1', '2', '3', 'C'],
-            ['4', '5', '6', 'D'],
-            ['7', '8', '9', 'E'],
-            ['A', '0', 'B', 'F']
-        ]
-        
-        keypad_values = [
-            [0x1, 0x2, 0x3, 0xC],
-            [0x4, 0x5, 0x6, 0xD],
-            [0x7, 0x8, 0x9, 0xE],
-            [0xA, 0x0, 0xB, 0xF]
-        ]
-        
         for row in range(4):
             for col in range(4):
-                key_value = keypad_values[row][col]
-                key_label = keypad_layout_map[row][col]
+                key_value = KEYPAD_ROWS[row][col]
+                key_label = f"{key_value:X}"
                 button = KeypadButton(key_value, key_label)
                 button.keyPressed.connect(self.on_keypad_press)
                 button.keyReleased.connect(self.on_keypad_release)
@@ -473,6 +766,8 @@ class DevModeGUI(QWidget):
         self.delay_timer_label = RegisterLabel("Delay Timer: 0")
         self.sound_timer_label = RegisterLabel("Sound Timer: 0")
         self.stack_pointer_label = RegisterLabel("Stack Pointer: 0")
+        self.latency_label = RegisterLabel(self.latency_text())
+        self.pacing_label = RegisterLabel(self.pacing_text())
         
         system_layout.addWidget(self.pc_label)
         system_layout.addWidget(self.index_label)
@@ -480,6 +775,8 @@ class DevModeGUI(QWidget):
         system_layout.addWidget(self.delay_timer_label)
         system_layout.addWidget(self.sound_timer_label)
         system_layout.addWidget(self.stack_pointer_label)
+        system_layout.addWidget(self.latency_label)
+        system_layout.addWidget(self.pacing_label)
         
         system_group.setLayout(system_layout)
 
@@ -521,10 +818,12 @@ class DevModeGUI(QWidget):
         
         self.setLayout(main_layout)
 
-        # Update timer
+        # Update timer, retuned to the screen's refresh rate once the window is shown
         self.update_timer = QTimer(self)
+        self.update_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.update_timer.timeout.connect(self.update_state)
-        self.update_timer.start(50)  # 20 FPS update rate
+        self.update_timer.start(self.MIN_REFRESH_MS)
+        self.tracking_screen = False    # screenChanged is connected on the first show only
 
     def load_rom(self):
         file_dialog = QFileDialog()
@@ -535,11 +834,13 @@ class DevModeGUI(QWidget):
             "CHIP-8 ROMs (*.ch8 *.rom);;All Files (*)"
         )
         if rom_path:
+            self.stop_emulator()
             try:
                 self.emu.loadrom(rom_path)
                 self.emu.readrom()
                 self.emu.copytomem()
                 self.emu.load_fontset()
+                self.reset_emulator()
                 self.rom_path_label.setText(f"Loaded: {os.path.basename(rom_path)}")
                 self.rom_path_label.setStyleSheet("color: #2ecc71; font-weight: bold;")
                 self.start_btn.setEnabled(True)
@@ -547,11 +848,40 @@ class DevModeGUI(QWidget):
                 self.rom_path_label.setText(f"Error loading ROM: {str(e)}")
                 self.rom_path_label.setStyleSheet("color: #e74c3c; font-weight: bold;")
 
+    def open_rom_library(self):
+        # Built on first use; later openings only run the incremental index refresh
+        if self.library_dialog is None:
+            self.rom_library = RomLibrary("roms")
+            self.library_dialog = RomLibraryDialog(self.rom_library, self)
+            self.library_dialog.romSelected.connect(self.load_library_rom)
+        else:
+            self.library_dialog.populate()
+        self.library_dialog.show()
+
+    def load_library_rom(self, entry):
+        self.stop_emulator()
+        try:
+            self.rom_library.load_into(self.emu, entry)
+            self.reset_emulator()
+            self.rom_path_label.setText(f"Loaded: {entry.name} ({entry.platform}, {entry.sha1[:8]})")
+            self.rom_path_label.setStyleSheet("color: #2ecc71; font-weight: bold;")
+            self.start_btn.setEnabled(True)
+        except Exception as e:
+            self.rom_path_label.setText(f"Error loading ROM: {str(e)}")
+            self.rom_path_label.setStyleSheet("color: #e74c3c; font-weight: bold;")
+
     def start_emulator(self):
         if not self.emu.running:
             # Use max_cycles if set, otherwise run indefinitely
             max_cycles = getattr(self, 'max_cycles', None)
-            if max_cycles:
+            if self.pacer is not None:
+                self.pacer.start(max_cycles)
+                ahead = f", {self.runahead.frames} frame(s) of run-ahead" if self.runahead is not None else ""
+                print(f"[INFO] Emulator started with adaptive pacing{ahead}")
+            elif self.runahead is not None:
+                self.runahead.start(max_cycles)
+                print(f"[INFO] Emulator started with {self.runahead.frames} frame(s) of run-ahead")
+            elif max_cycles:
                 self.emu.start(max_cycles)
                 print(f"[INFO] Emulator started with max cycles: {max_cycles}")
             else:
@@ -563,66 +893,173 @@ class DevModeGUI(QWidget):
     def stop_emulator(self):
         if self.emu.running:
             self.emu.running = False
+            if self.pacer is not None:
+                self.pacer.stop()
+            if self.runahead is not None:
+                self.runahead.stop()
             self.start_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
 
     def reset_emulator(self):
+        # In place, so the display widget and open memory/stack viewers keep valid references
         self.stop_emulator()
-        self.emu = Emulator()
-        self.rom_path_label.setText("No ROM loaded")
-        self.rom_path_label.setStyleSheet("color: #bdc3c7; font-style: italic;")
-        self.start_btn.setEnabled(False)
+        self.emu.reset(keep_rom=True)
+        self.previous_state = None
+        if self.pacer is not None and self.runahead is None:
+            self.pacer.present()
+        if not self.emu.romdata:
+            self.rom_path_label.setText("No ROM loaded")
+            self.rom_path_label.setStyleSheet("color: #bdc3c7; font-style: italic;")
+            self.start_btn.setEnabled(False)
+
+    def close_core(self):
+        # Out-of-process cores own a child process and a shared memory block
+        if hasattr(self.emu, "close"):
+            self.emu.close()
+
+    def closeEvent(self, event):
+        self.stop_emulator()
+        # Nothing may poll the core once close_core() has released its shared memory
+        self.update_timer.stop()
+        for viewer in (self.memory_viewer, self.stack_viewer):
+            if viewer is not None:
+                viewer.timer.stop()
+                viewer.close()
+        self.close_core()
+        super().closeEvent(event)
 
     def open_memory_viewer(self):
-        self.memory_viewer = MemoryViewer(self.emu.memory, self)
+        # Built on first use and kept; the core's memory buffer is stable across resets
+        if self.memory_viewer is None:
+            self.memory_viewer = MemoryViewer(self.emu.memory, self, emulator=self.emu)
         self.memory_viewer.show()
+        self.memory_viewer.raise_()
 
     def open_stack_viewer(self):
-        self.stack_viewer = StackViewer(self.emu.stack, self.emu.stack_pointer, self)
+        # Built on first use and kept, like the memory viewer
+        if self.stack_viewer is None:
+            self.stack_viewer = StackViewer(self.emu, self)
         self.stack_viewer.show()
+        self.stack_viewer.raise_()
+
+    def set_key(self, key_value, pressed):
+        # Run-ahead wraps set_key to time the key change until it shows on screen
+        if self.runahead is not None:
+            self.runahead.set_key(key_value, pressed)
+        else:
+            self.emu.set_key(key_value, pressed)
+
+    def latency_text(self):
+        if self.runahead is None:
+            return "Input Latency: run-ahead off"
+        latency = self.runahead.latency()
+        if latency is None:
+            return f"Input Latency: - (run-ahead {self.runahead.frames})"
+        frames, ms, _ = latency
+        return f"Input Latency: {frames:.1f} frames / {ms:.0f} ms (run-ahead {self.runahead.frames})"
+
+    def pacing_text(self):
+        if self.pacer is None:
+            return "Pacing: fixed"
+        return f"Pacing: level {self.pacer.level}, {self.pacer.status()}"
 
     def on_keypad_press(self, key_value):
-        self.emu.set_key(key_value, 1)
+        self.set_key(key_value, 1)
         self.keypad_buttons[key_value].set_pressed(True)
 
     def on_keypad_release(self, key_value):
-        self.emu.set_key(key_value, 0)
+        self.set_key(key_value, 0)
         self.keypad_buttons[key_value].set_pressed(False)
 
+    def refresh_interval(self):
+        # One panel refresh per vsync, capped at MIN_REFRESH_MS for high refresh rate screens
+        screen = self.screen()
+        refresh_rate = screen.refreshRate() if screen else 0
+        if refresh_rate <= 0:
+            return self.MIN_REFRESH_MS
+        return max(self.MIN_REFRESH_MS, round(1000 / refresh_rate))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_timer.setInterval(self.refresh_interval())
+        if not self.tracking_screen:
+            self.tracking_screen = True
+            self.windowHandle().screenChanged.connect(
+                lambda screen: self.update_timer.setInterval(self.refresh_interval())
+            )
+
     def update_state(self):
+        # Fade highlights from earlier refreshes
+        elapsed = self.update_timer.interval()
+        for label in list(self.highlighted_labels):
+            if not label.fade_highlight(elapsed):
+                self.highlighted_labels.discard(label)
+
+        if self.runahead is not None:
+            latency = self.runahead.latency()
+            if latency != self.shown_latency:
+                self.shown_latency = latency
+                self.latency_label.set_value_text(self.latency_text())
+
+        # Run-ahead and the pacer hand over finished frames, repaint only when a new one arrived
+        source = self.display_widget.source
+        if source is not None and source.presented_generation != self.shown_generation:
+            self.shown_generation = source.presented_generation
+            self.display_widget.update()
+
+        pacer = self.pacer
+        if pacer is None:
+            self.update_panels()
+            return
+        pacing = self.pacing_text()
+        if pacing != self.shown_pacing:
+            self.shown_pacing = pacing
+            self.pacing_label.set_value_text(pacing)
+        if pacer.panel_refresh_due():
+            start = time.perf_counter()
+            self.update_panels()
+            pacer.report_panels(time.perf_counter() - start)
+
+    def update_panels(self):
+        state = self.emu.snapshot()
+        previous = self.previous_state
+        if state == previous:
+            return
+        self.previous_state = state
+        v, pc, index, cycles, delay_timer, sound_timer, stack_pointer, generation = state
+
         # Update registers with change highlighting
         for i in range(16):
-            current_value = self.emu.v[i]
-            if current_value != self.previous_registers[i]:
-                self.register_labels[i].highlight_change()
-                self.previous_registers[i] = current_value
-            self.register_labels[i].setText(f"V{i:X}: 0x{current_value:02X}")
-        
+            if previous is None or v[i] != previous[0][i]:
+                label = self.register_labels[i]
+                label.set_value_text(f"V{i:X}: 0x{v[i]:02X}")
+                if previous is not None:
+                    label.highlight_change()
+                    self.highlighted_labels.add(label)
+
         # Update system state
-        self.pc_label.setText(f"PC: 0x{self.emu.program_counter:03X}")
-        self.index_label.setText(f"I: 0x{self.emu.index_register:03X}")
-        
-        with self.emu.lock:
-            self.cycles_label.setText(f"Cycles: {self.emu.cycle_count}")
-            self.delay_timer_label.setText(f"Delay Timer: {self.emu.delay_timer}")
-            self.sound_timer_label.setText(f"Sound Timer: {self.emu.sound_timer}")
-        
-        self.stack_pointer_label.setText(f"Stack Pointer: {self.emu.stack_pointer}")
-        
+        self.pc_label.set_value_text(f"PC: 0x{pc:03X}")
+        self.index_label.set_value_text(f"I: 0x{index:03X}")
+        self.cycles_label.set_value_text(f"Cycles: {cycles}")
+        self.delay_timer_label.set_value_text(f"Delay Timer: {delay_timer}")
+        self.sound_timer_label.set_value_text(f"Sound Timer: {sound_timer}")
+        self.stack_pointer_label.set_value_text(f"Stack Pointer: {stack_pointer}")
+
         # Update display
-        self.display_widget.update()
+        if self.display_widget.source is None and (previous is None or generation != previous[7]):
+            self.display_widget.update()
 
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() in self.key_map:
             key_value = self.key_map[event.key()]
-            self.emu.set_key(key_value, 1)
+            self.set_key(key_value, 1)
             if key_value in self.keypad_buttons:
                 self.keypad_buttons[key_value].set_pressed(True)
 
     def keyReleaseEvent(self, event: QKeyEvent):
         if event.key() in self.key_map:
             key_value = self.key_map[event.key()]
-            self.emu.set_key(key_value, 0)
+            self.set_key(key_value, 0)
             if key_value in self.keypad_buttons:
                 self.keypad_buttons[key_value].set_pressed(False)
 
@@ -0,0 +1,21 @@
+# Host keyboard layout shared by the Qt and terminal frontends (no Qt imports here): the 4x4
+# block under 1-4 on a QWERTY keyboard maps onto the CHIP-8 hex keypad in the same shape.
+KEY_MAP = {
+    "1": 0x1, "2": 0x2, "3": 0x3, "4": 0xC,
+    "Q": 0x4, "W": 0x5, "E": 0x6, "R": 0xD,
+    "A": 0x7, "S": 0x8, "D": 0x9, "F": 0xE,
+    "Z": 0xA, "X": 0x0, "C": 0xB, "V": 0xF,
+}
+
+# The CHIP-8 keypad as it is drawn, row by row
+KEYPAD_ROWS = (
+    (0x1, 0x2, 0x3, 0xC),
+    (0x4, 0x5, 0x6, 0xD),
+    (0x7, 0x8, 0x9, 0xE),
+    (0xA, 0x0, 0xB, 0xF),
+)
+
+
+def key_for_char(char):
+    # CHIP-8 key for a typed character, case-insensitive, or None
+    return KEY_MAP.get(char.upper())
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.framebuffer import pack_display
+from emulator.scheduler import WallScheduler
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter, QColor, QImage
+from PyQt6.QtCore import Qt, QTimer, QRect
+
+
+class RomWall(QWidget):
+    # Grid of live thumbnails for many emulators. One QTimer drives the shared scheduler and one
+    # paintEvent draws every thumbnail, so the wall costs no threads per ROM.
+
+    def __init__(self, scheduler=None, scale=2, gap=6, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler if scheduler is not None else WallScheduler()
+        self.scale = scale
+        self.gap = gap
+        self.color_table = [QColor("#001100").rgb(), QColor("#00ff41").rgb()]  # Matrix green theme
+        self.images = {}    # session -> (display_generation, QImage)
+        self.setWindowTitle("CHIP-8 Emulator - ROM Wall")
+        self.setStyleSheet("background-color: #2c3e50;")
+        self.resize_to_grid()
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.status_time = time.perf_counter()
+
+    def resize_to_grid(self):
+        columns, rows = self.scheduler.grid()
+        self.resize(columns * (64 * self.scale + self.gap) + self.gap,
+                    rows * (32 * self.scale + self.gap) + self.gap)
+
+    def add_rom(self, data, name=""):
+        session = self.scheduler.add_rom(data, name)
+        self.resize_to_grid()
+        return session
+
+    def start(self):
+        self.timer.start(round(self.scheduler.frame_period * 1000))
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self):
+        if self.scheduler.tick():
+            self.update()
+
+        now = time.perf_counter()
+        if now - self.status_time >= 1.0:
+            self.status_time = now
+            self.setWindowTitle(
+                f"CHIP-8 Emulator - ROM Wall ({len(self.scheduler.sessions)} ROMs, "
+                f"load {self.scheduler.load():.0%}, thumbnails {self.scheduler.thumbnail_fps():.0f} fps, "
+                f"speed {self.scheduler.emulation_speed():.0%})"
+            )
+
+    def thumbnail(self, session):
+        # Re-packs a framebuffer only when the core reports it may have changed
+        generation = session.emu.display_generation
+        cached = self.images.get(session)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        image = QImage(pack_display(session.emu.display), 64, 32, 8, QImage.Format.Format_Mono)
+        image.setColorTable(self.color_table)
+        self.images[session] = (generation, image)
+        return image
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        painter = QPainter(self)
+        columns, _ = self.scheduler.grid()
+        width = 64 * self.scale
+        height = 32 * self.scale
+        for index, session in enumerate(self.scheduler.sessions):
+            x = self.gap + (index % columns) * (width + self.gap)
+            y = self.gap + (index // columns) * (height + self.gap)
+            painter.drawImage(QRect(x, y, width, height), self.thumbnail(session))
+            if session.error is not None:
+                painter.setPen(QColor("#e74c3c"))
+                painter.drawRect(x - 1, y - 1, width + 1, height + 1)
+        painter.end()
+        self.scheduler.report_paint(time.perf_counter() - start)
+
+    def closeEvent(self, event):
+        self.stop()
+        super().closeEvent(event)
@@ -0,0 +1,282 @@
+import argparse
+import os
+import select
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import HEIGHT, WIDTH, pack_display
+from runtime.keymap import key_for_char
+
+DEFAULT_FPS = 30        # terminal refresh cap, independent of the 60 Hz emulation
+KEY_HOLD = 0.15         # terminals send no key-up; a key stays down this long after its last repeat
+MERGE_GAP = 4           # unchanged cells bridged instead of starting a new cursor jump
+ROWS = HEIGHT // 2      # one character cell shows two pixel rows
+
+# Cell code = top pixel + 2 * bottom pixel, mapped straight to the half-block characters
+CELL_CHARS = str.maketrans({"\x00": " ", "\x01": "▀", "\x02": "▄", "\x03": "█"})
+_BIT_VALUES = bytes.maketrans(b'01', b'\x00\x01')
+
+ON_COLOR = "\x1b[38;5;46m"      # bright green, close to the GUI's Matrix green
+OFF_COLOR = "\x1b[48;5;232m"    # near-black background
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+RESET = "\x1b[0m"
+
+
+def _pixels(packed_row):
+    # 8 packed bytes -> 64 bytes of 0/1
+    return f"{int.from_bytes(packed_row, 'big'):064b}".encode().translate(_BIT_VALUES)
+
+
+def cell_rows(packed):
+    # Packed 256-byte frame -> ROWS byte strings of WIDTH cell codes (0-3)
+    rows = []
+    for y in range(0, HEIGHT, 2):
+        top = int.from_bytes(_pixels(packed[y * 8:(y + 1) * 8]), 'big')
+        bottom = int.from_bytes(_pixels(packed[(y + 1) * 8:(y + 2) * 8]), 'big')
+        # One byte per pixel, so adding the doubled bottom row never carries into a neighbour
+        rows.append((top + 2 * bottom).to_bytes(WIDTH, 'big'))
+    return rows
+
+
+def diff_row(previous, current):
+    # Yields (start, end) column spans that changed, merging spans separated by small gaps
+    start = None
+    last = None
+    for x in range(WIDTH):
+        if previous is not None and previous[x] == current[x]:
+            continue
+        if start is None:
+            start = x
+        elif x - last > MERGE_GAP:
+            yield start, last + 1
+            start = x
+        last = x
+    if start is not None:
+        yield start, last + 1
+
+
+class TerminalRenderer:
+    # Half-block ANSI renderer. The emulation side only calls submit(), which swaps in the newest
+    # frame and returns; a render thread redraws changed cells at most `fps` times a second, so a
+    # slow terminal or SSH link drops frames instead of stalling the core.
+
+    def __init__(self, out=None, fps=DEFAULT_FPS, status=""):
+        self.out = out if out is not None else sys.stdout.buffer
+        self.frame_period = 1 / fps
+        self.status = status
+        self.previous = [None] * ROWS
+        self.latest = None
+        self.generation = 0
+        self.drawn_generation = 0
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.frames_drawn = 0
+        self.bytes_written = 0
+
+    def submit(self, packed):
+        with self.condition:
+            self.latest = packed
+            self.generation += 1
+            self.condition.notify()
+
+    def render(self, packed):
+        # Escape sequence that brings the terminal from the last drawn frame to this one
+        parts = []
+        for y, codes in enumerate(cell_rows(packed)):
+            previous = self.previous[y]
+            if codes == previous:
+                continue
+            for start, end in diff_row(previous, codes):
+                parts.append(f"\x1b[{y + 1};{start + 1}H")
+                parts.append(codes[start:end].decode('latin-1').translate(CELL_CHARS))
+            self.previous[y] = codes
+        return "".join(parts).encode('utf-8')
+
+    def _write(self, data):
+        self.out.write(data)
+        self.out.flush()
+        self.bytes_written += len(data)
+
+    def _loop(self):
+        next_draw = time.perf_counter()
+        while True:
+            with self.condition:
+                while self.running and self.generation == self.drawn_generation:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                packed = self.latest
+                self.drawn_generation = self.generation
+            data = self.render(packed)
+            if data:
+                self._write(data)
+                self.frames_drawn += 1
+            next_draw += self.frame_period
+            delay = next_draw - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_draw = time.perf_counter()
+
+    def start(self):
+        self._write((HIDE_CURSOR + ON_COLOR + OFF_COLOR + "\x1b[2J"
+                     + f"\x1b[{ROWS + 2};1H{RESET}{self.status}" + ON_COLOR + OFF_COLOR).encode('utf-8'))
+        self.previous = [None] * ROWS
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+        self._write(f"{RESET}\x1b[{ROWS + 3};1H{SHOW_CURSOR}".encode('utf-8'))
+
+
+class TerminalKeys:
+    # Raw-mode keyboard on a tty. Key presses come from typed characters; as terminals report no
+    # releases, a key is released KEY_HOLD seconds after its last (auto-repeated) character.
+
+    def __init__(self, fd=None):
+        self.fd = sys.stdin.fileno() if fd is None else fd
+        self.saved = None
+        self.held = {}      # CHIP-8 key -> release deadline
+        self.quit = False
+
+    def __enter__(self):
+        import termios
+        import tty
+        self.saved = termios.tcgetattr(self.fd)
+        tty.setraw(self.fd)
+        return self
+
+    def __exit__(self, *exc):
+        import termios
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+
+    def poll(self, emu):
+        # Applies pending key presses and expired holds to the emulator, never blocks
+        now = time.perf_counter()
+        while select.select([self.fd], [], [], 0)[0]:
+            data = os.read(self.fd, 64)
+            if not data:
+                self.quit = True
+                break
+            for char in data.decode('utf-8', 'ignore'):
+                if char in ("\x03", "\x04", "\x1b"):     # Ctrl-C, Ctrl-D, Esc
+                    self.quit = True
+                    continue
+                key = key_for_char(char)
+                if key is not None:
+                    if key not in self.held:
+                        emu.set_key(key, 1)
+                    self.held[key] = now + KEY_HOLD
+        for key, deadline in list(self.held.items()):
+            if deadline <= now:
+                emu.set_key(key, 0)
+                del self.held[key]
+
+
+def run_terminal(rom_path, fps=DEFAULT_FPS, max_cycles=None, instructions_per_frame=None, netplay=None,
+                 wav=None):
+    # `netplay` is an emulator.netplay transport; the local keys then become one player of a
+    # rollback session and the peer's keys are merged into the same keypad. `wav` records the
+    # beeper to that file as it plays.
+    emu = Emulator(verbose=False)
+    emu.loadrom(rom_path)
+    emu.readrom()
+    if not emu.romdata:
+        print(f"Could not read ROM {rom_path}")
+        return 1
+    emu.reset()
+    if instructions_per_frame:
+        emu.instructions_per_frame = instructions_per_frame
+    # Keys and frames go through the rollback session when playing over the network
+    player = emu
+    if netplay is not None:
+        from emulator.netplay import NETPLAY_SEED, RollbackSession
+        emu.seed(NETPLAY_SEED)
+        player = RollbackSession(emu, netplay)
+    audio = None
+    if wav:
+        from emulator.audio import AudioPlayer, WavSink
+        audio = AudioPlayer(emu.enable_audio(), WavSink(wav))
+        audio.start()
+
+    status = f"{os.path.basename(rom_path)} | keys 1234 QWER ASDF ZXCV | Esc or Ctrl-C quits"
+    if netplay is not None:
+        status += " | netplay"
+    renderer = TerminalRenderer(fps=fps, status=status)
+    generation = None
+    try:
+        with TerminalKeys() as keys:
+            renderer.start()
+            next_frame = time.perf_counter()
+            while not keys.quit:
+                keys.poll(player)
+                try:
+                    player.step_frame()
+                except Exception as e:
+                    renderer.stop()
+                    print(f"[ERROR] ROM stopped after {emu.cycle_count} cycles: {e}\r")
+                    return 1
+                if emu.display_generation != generation:
+                    generation = emu.display_generation
+                    renderer.submit(pack_display(emu.display))
+                if max_cycles and emu.cycle_count > max_cycles:
+                    break
+                next_frame += emu.clock_hz
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame = time.perf_counter()
+            renderer.stop()
+    finally:
+        if renderer.running:
+            renderer.stop()
+        if netplay is not None:
+            netplay.close()
+        if audio is not None:
+            audio.stop()
+            audio.sink.close()
+    print(f"{emu.cycle_count} cycles, {renderer.frames_drawn} redraws, {renderer.bytes_written / 1024:.0f} KiB sent")
+    if netplay is not None:
+        stats = player.stats()
+        print(f"netplay: {stats['rollbacks_per_second']:.1f} rollbacks/s, "
+              f"{stats['average_rollback_frames']:.1f} frames each, "
+              f"re-simulation {stats['resimulation_us_per_frame']:.0f} us/frame, {stats['stalls']} stalls")
+    if audio is not None:
+        stats = emu.audio.stats()
+        print(f"audio: {stats['underruns']} underruns, {stats['dropped']} dropped frames, "
+              f"timer change to sample output {stats['average_latency_ms']:.1f} ms average")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CHIP-8 in the terminal (ANSI half-block renderer)")
+    parser.add_argument('rom', type=str, help='Path to the CHIP-8 ROM file')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS, help='Terminal refresh cap')
+    parser.add_argument('--cycles', '-c', type=int, default=None, help='Stop after this many instructions')
+    parser.add_argument('--ipf', type=int, default=None, help='Instructions per frame')
+    parser.add_argument('--peer', type=str, default=None, help='Play against host:port over UDP netplay')
+    parser.add_argument('--bind', type=int, default=7000, help='Local UDP port for netplay')
+    parser.add_argument('--wav', type=str, default=None, help='Record the beeper to this WAV file')
+    args = parser.parse_args()
+    netplay = None
+    if args.peer:
+        from emulator.netplay import UdpTransport, parse_address
+        netplay = UdpTransport(("0.0.0.0", args.bind), parse_address(args.peer, "127.0.0.1"))
+    return run_terminal(args.rom, args.fps, args.cycles, args.ipf, netplay, args.wav)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from emulator.netplay import MAX_ROLLBACK, LatencySimulator, LoopbackTransport, create_session
+
+# Draws a digit for every held key, so any misapplied input changes the framebuffer
+KEYS_ROM = bytes.fromhex("a0506100e19e120c7201d1257101311012041202")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_pair(clock, latency, jitter, loss):
+    first_end, second_end = LoopbackTransport.pair()
+    sessions = []
+    for seed, end in ((1, first_end), (2, second_end)):
+        session = create_session(KEYS_ROM, LatencySimulator(end, latency, jitter, loss, seed, clock))
+        session.clock = clock
+        sessions.append(session)
+    return sessions
+
+
+class RollbackSessionTest(unittest.TestCase):
+    def run_pair(self, latency, jitter, loss, frames=240):
+        # Both sides play random keys one 1/60 s tick at a time on a simulated clock, then release
+        # them and run until every input is confirmed
+        clock = FakeClock()
+        sessions = make_pair(clock, latency, jitter, loss)
+        bots = [random.Random(10), random.Random(20)]
+        for _ in range(frames):
+            for session, bot in zip(sessions, bots):
+                if bot.random() < 0.2:
+                    session.set_key(bot.randrange(16), bot.random() < 0.5)
+                session.step_frame()
+            clock.now += 1 / 60
+
+        for session in sessions:
+            session.local_keys = 0
+        target = max(session.frame for session in sessions) + 2 * MAX_ROLLBACK
+        for _ in range(10000):
+            if all(session.frame >= target and session.remote_confirmed >= target - 1 for session in sessions):
+                break
+            for session in sessions:
+                if session.frame < target:
+                    session.step_frame()
+                else:
+                    session.poll()
+                    session.send_inputs()
+            clock.now += 1 / 60
+        return sessions
+
+    def test_converges_under_latency_jitter_and_loss(self):
+        sessions = self.run_pair(latency=0.05, jitter=0.02, loss=0.1)
+        self.assertGreater(sum(session.rollbacks for session in sessions), 0)
+        self.assertEqual(sessions[0].frame, sessions[1].frame)
+        self.assertEqual(sessions[0].checksum(), sessions[1].checksum())
+
+    def test_converges_without_rollbacks_on_a_perfect_link(self):
+        sessions = self.run_pair(latency=0.0, jitter=0.0, loss=0.0)
+        self.assertEqual(sessions[0].checksum(), sessions[1].checksum())
+
+    def test_rejects_a_different_rom(self):
+        clock = FakeClock()
+        first_end, second_end = LoopbackTransport.pair()
+        ours = create_session(KEYS_ROM, first_end)
+        theirs = create_session(KEYS_ROM + b"\x00\xe0", second_end)
+        for session in (ours, theirs):
+            session.clock = clock
+        for _ in range(3):
+            theirs.step_frame()
+            ours.poll()
+        self.assertEqual(ours.remote_confirmed, -1)
+        self.assertGreater(ours.ignored_packets, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from emulator.emulator import Emulator
+
+# Draws a random sprite at a random position every frame
+RANDOM_SPRITES_ROM = bytes.fromhex("c03fc11fa050d0151200")
+
+
+class ResetTest(unittest.TestCase):
+    def setUp(self):
+        self.emu = Emulator(verbose=False)
+        self.emu.load_rom_bytes(RANDOM_SPRITES_ROM)
+        self.emu.reset()
+        self.emu.seed(7)
+
+    def run_frames(self, frames=30):
+        for _ in range(frames):
+            self.emu.step_frame()
+        return self.emu.save_state()
+
+    def test_runs_after_reset_replay_exactly(self):
+        first = self.run_frames()
+        self.emu.reset()
+        self.assertEqual(self.run_frames(), first)
+
+    def test_reset_matches_a_fresh_emulator(self):
+        self.run_frames()
+        self.emu.reset()
+        fresh = Emulator(verbose=False)
+        fresh.load_rom_bytes(RANDOM_SPRITES_ROM)
+        fresh.reset()
+        fresh.seed(7)
+        self.assertEqual(self.emu.save_state(), fresh.save_state())
+
+    def test_reset_clears_the_display_in_place(self):
+        display = self.emu.display
+        rows = list(display)
+        self.run_frames()
+        self.assertTrue(any(any(row) for row in display))
+        generation = self.emu.display_generation
+        self.emu.reset()
+        self.assertFalse(any(any(row) for row in display))
+        self.assertGreater(self.emu.display_generation, generation)
+        self.assertIs(self.emu.display, display)
+        self.assertTrue(all(a is b for a, b in zip(rows, display)))
+
+    def test_loading_a_shorter_rom_leaves_no_tail(self):
+        self.emu.load_rom_bytes(b"\x12\x00")
+        self.emu.reset()
+        self.assertEqual(bytes(self.emu.memory[0x202:0x20A]), bytes(8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from emulator.emulator import Emulator
+from emulator.runahead import RunAhead
+
+# Counts V0 to 0x20, then stores V0..V4 at I = 0xFFF, which runs off the end of memory a few
+# frames in
+CRASH_ROM = bytes.fromhex("700130201200affff455")
+# Counts on screen with a delay timer wait loop
+COUNTER_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+def make_emulator(rom):
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(rom)
+    emu.reset()
+    emu.seed(1)
+    return emu
+
+
+class RunAheadTest(unittest.TestCase):
+    def test_state_and_attachments_restored_when_speculation_raises(self):
+        plain = make_emulator(CRASH_ROM)
+        plain.step_frame()
+
+        emu = make_emulator(CRASH_ROM)
+        metrics = emu.enable_metrics()
+        audio = emu.enable_audio()
+        heatmap = emu.enable_heatmap()
+        runahead = RunAhead(emu, 30)
+        with self.assertRaises(IndexError):
+            runahead.step_frame()
+        self.assertEqual(emu.save_state(), plain.save_state())
+        self.assertIs(emu.metrics, metrics)
+        self.assertIs(emu.audio, audio)
+        self.assertIs(emu.heatmap, heatmap)
+
+    def test_matches_plain_emulation(self):
+        plain = make_emulator(COUNTER_ROM)
+        emu = make_emulator(COUNTER_ROM)
+        heatmap = emu.enable_heatmap()
+        runahead = RunAhead(emu, 3)
+        for _ in range(120):
+            plain.step_frame()
+            runahead.step_frame()
+        self.assertEqual(emu.save_state(), plain.save_state())
+        # Speculative frames are not counted as executions
+        self.assertEqual(heatmap.total("executions"), plain.cycle_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from emulator.scheduler import WallScheduler
+
+# Counts V0 to 0x20, then stores V0..V4 at I = 0xFFF, which runs off the end of memory a few
+# frames in
+CRASH_ROM = bytes.fromhex("700130201200affff455")
+# Counts on screen with a delay timer wait loop
+COUNTER_ROM = bytes.fromhex("60006a056b0500e0f029dab5a300f033f2657001630"
+                            "2f315f40734001218e19e6c01c1ff1206")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class WallSchedulerTest(unittest.TestCase):
+    def test_tick_returns_when_every_session_errors(self):
+        clock = FakeClock()
+        scheduler = WallScheduler(clock=clock)
+        for index in range(3):
+            scheduler.add_rom(CRASH_ROM, f"crash{index}")
+        scheduler.tick()
+        self.assertFalse(any(session.error for session in scheduler.sessions))
+        clock.now += 1.0    # a backlog of frames owed to every session, more than it takes to crash
+        scheduler.tick()
+        self.assertTrue(all(session.error for session in scheduler.sessions))
+        self.assertEqual(scheduler.owed, 0.0)
+
+    def test_live_sessions_keep_running_beside_errored_ones(self):
+        clock = FakeClock()
+        scheduler = WallScheduler(clock=clock)
+        scheduler.add_rom(CRASH_ROM, "crash")
+        live = scheduler.add_rom(COUNTER_ROM, "counter")
+        for _ in range(10):
+            clock.now += 1 / 60
+            scheduler.tick()
+        self.assertIsNone(live.error)
+        self.assertGreater(live.frames, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
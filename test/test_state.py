@@ -0,0 +1,90 @@
+import unittest
+
+from emulator.emulator import Emulator
+
+# Draws a random sprite at a random position every frame
+RANDOM_SPRITES_ROM = bytes.fromhex("c03fc11fa050d0151200")
+
+
+def make_emulator():
+    emu = Emulator(verbose=False)
+    emu.load_rom_bytes(RANDOM_SPRITES_ROM)
+    emu.reset()
+    emu.seed(1)
+    return emu
+
+
+def run(emu, frames):
+    for _ in range(frames):
+        emu.step_frame()
+
+
+class SaveStateTest(unittest.TestCase):
+    def test_load_state_restores_everything(self):
+        emu = make_emulator()
+        run(emu, 20)
+        state = emu.save_state()
+        run(emu, 20)
+        self.assertNotEqual(emu.save_state(), state)
+        emu.load_state(state)
+        self.assertEqual(emu.save_state(), state)
+
+    def test_load_state_keeps_buffer_identity(self):
+        emu = make_emulator()
+        buffers = (emu.memory, emu.display, emu.v, emu.stack)
+        rows = list(emu.display)
+        state = emu.save_state()
+        run(emu, 20)
+        emu.load_state(state)
+        for before, after in zip(buffers, (emu.memory, emu.display, emu.v, emu.stack)):
+            self.assertIs(before, after)
+        self.assertTrue(all(a is b for a, b in zip(rows, emu.display)))
+
+    def test_replay_from_a_state_is_deterministic(self):
+        emu = make_emulator()
+        run(emu, 10)
+        state = emu.save_state()
+        run(emu, 30)
+        expected = emu.save_state()
+        emu.load_state(state)
+        run(emu, 30)
+        self.assertEqual(emu.save_state(), expected)
+
+
+class ForkTest(unittest.TestCase):
+    def test_fork_equals_parent(self):
+        emu = make_emulator()
+        run(emu, 15)
+        self.assertEqual(emu.fork().save_state(), emu.save_state())
+
+    def test_fork_and_parent_diverge_independently(self):
+        emu = make_emulator()
+        run(emu, 15)
+        state = emu.save_state()
+        clone = emu.fork()
+        run(emu, 15)
+        self.assertEqual(clone.save_state(), state)
+        after_parent = emu.save_state()
+        clone.seed(99)
+        run(clone, 15)
+        self.assertEqual(emu.save_state(), after_parent)
+
+    def test_fork_steps_like_its_parent(self):
+        emu = make_emulator()
+        run(emu, 15)
+        clone = emu.fork()
+        run(emu, 30)
+        run(clone, 30)
+        self.assertEqual(clone.save_state(), emu.save_state())
+
+    def test_held_display_stays_live_after_fork(self):
+        emu = make_emulator()
+        display = emu.display
+        emu.fork()
+        run(emu, 10)
+        self.assertIs(emu.display, display)
+        self.assertEqual(b''.join(display), emu.save_state()[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import random
+import threading
+import time
+import unittest
+
+from emulator.emulator import Emulator
+from emulator.framebuffer import PACKED_SIZE, pack_display
+from emulator.streaming import FrameBroadcaster, FrameClient, apply_delta, encode_delta
+
+# Draws a random sprite at a random position every frame
+RANDOM_SPRITES_ROM = bytes.fromhex("c03fc11fa050d0151200")
+
+
+def round_trip(previous, current):
+    frame = bytearray(previous)
+    apply_delta(frame, encode_delta(previous, current))
+    return bytes(frame)
+
+
+class DeltaTest(unittest.TestCase):
+    def test_identical_frames(self):
+        frame = bytes(range(PACKED_SIZE))
+        self.assertLessEqual(len(encode_delta(frame, frame)), 2)     # at most one empty run
+        self.assertEqual(round_trip(frame, frame), frame)
+
+    def test_edge_cases(self):
+        blank = bytes(PACKED_SIZE)
+        cases = (
+            bytes([0xFF]) * PACKED_SIZE,                # every byte changed
+            blank[:-1] + b"\x01",                       # only the last byte, after a 255-byte skip
+            b"\x80" + blank[1:],                        # only the first byte
+            bytes([0xFF]) * 255 + b"\x00",              # a run capped at 255 bytes
+        )
+        for current in cases:
+            self.assertEqual(round_trip(blank, current), current)
+            self.assertEqual(round_trip(current, blank), blank)
+
+    def test_random_frames(self):
+        rng = random.Random(1)
+        previous = bytes(PACKED_SIZE)
+        for _ in range(200):
+            current = bytearray(previous)
+            for _ in range(rng.randrange(0, 64)):
+                current[rng.randrange(PACKED_SIZE)] = rng.getrandbits(8)
+            current = bytes(current)
+            self.assertEqual(round_trip(previous, current), current)
+            previous = current
+
+
+class StreamTest(unittest.TestCase):
+    def test_client_ends_on_the_published_frame(self):
+        broadcaster = FrameBroadcaster(port=0)
+        broadcaster.start()
+        client = FrameClient()
+        emu = Emulator(verbose=False)
+        emu.load_rom_bytes(RANDOM_SPRITES_ROM)
+        emu.reset()
+        emu.seed(1)
+        emu.instructions_per_frame = 4
+
+        def produce():
+            # Publishes frames once the client is connected, then waits for the last to go out
+            while not broadcaster.clients:
+                time.sleep(0.01)
+            for _ in range(120):
+                emu.step_frame()
+                broadcaster.publish(emu.display)
+                time.sleep(0.001)
+            broadcaster.publish_packed(bytes(PACKED_SIZE))     # end marker: a blank screen
+
+        received = []
+
+        def stop_at_end_marker(client):
+            if client.frames_received > 1 and client.frame == bytes(PACKED_SIZE):
+                raise asyncio.IncompleteReadError(b"", None)
+            received.append(bytes(client.frame))
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            asyncio.run(asyncio.wait_for(
+                client.run(port=broadcaster.port, on_frame=stop_at_end_marker), timeout=10))
+        finally:
+            producer.join(timeout=5)
+            broadcaster.stop()
+        self.assertEqual(bytes(client.frame), bytes(PACKED_SIZE))
+        self.assertEqual(received[-1], pack_display(emu.display))
+        self.assertGreater(client.frames_received, 60)
+        self.assertEqual(client.frame_number, broadcaster.frame_number)
+
+
+if __name__ == "__main__":
+    unittest.main()